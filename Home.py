@@ -15,7 +15,7 @@ st.markdown(
 	Este dashboard foi construído com o objetivo de ter uma visão melhor sobre as métricas do negócio.
 	### Como utilizar esse Dashboard?
 	- Visão Geral:
-		- Métricas gerais do negócio. Geolocalização dos restaurantes e principais números.
+		- Métricas gerais do negócio. Geolocalização dos restaurantes, cobertura de entrega e principais números.
 	- Visão Países:
 		- Métricas relacionadas aos países, como: quantidade de avaliações por país, quantidade de restaurantes que fazem entrega por país, etc.
 	- Visão Cidades:
@@ -23,7 +23,13 @@ st.markdown(
 	- Visão Restaurantes:
 		- Insights sobre restaurantes que realizam entrega e o número de avaliação, média das notas e que fazem entrega. Top 10 dos restaurantes mais avaliados.
 	- Visão Tipos Culinários:
-		- Indicadores dos melhores e piores restaurantes para alguns tipos de culinária.
+		- Ranking dos melhores e piores restaurantes de cada tipo de culinária escolhido (top 1 a top 10, com um número mínimo de avaliações).
+	- Visão Custos:
+		- Distribuição do custo médio para dois (mediana e quantis) por país, categoria de preço, tipo de culinária e cidade, convertida para uma única moeda.
+	- Visão Proximidade:
+		- Restaurantes a até um raio de um ponto, os mais próximos (com ou sem entrega online), a cobertura de uma lista de pontos de entrega e o centro de cada cidade.
+	- Busca:
+		- Busca de restaurantes pelo nome, endereço ou localidade, ordenada pela relevância, pela nota e pelo número de avaliações.
 	### Ask for help
 	- linkedin/camiladuol
 	""")
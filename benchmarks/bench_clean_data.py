@@ -0,0 +1,152 @@
+"""
+Benchmark da limpeza dos dados: compara a versão original de 'clean_data' (com map/apply linha a linha) com a versão vetorizada de 'fome_zero.data'.
+
+O arquivo zomato.csv é replicado 1x, 10x e 100x, com IDs de restaurante deslocados em cada cópia para que as linhas não sejam removidas como duplicadas.
+
+Uso: python benchmarks/bench_clean_data.py [--sizes 1 10 100] [--repeat 3]
+"""
+# Importando as bibliotecas necessárias
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fome_zero.data import DATASET_PATH, CUISINE_SEPARATOR, rename_columns, derive_columns, clean_data
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def legacy_derive_columns(df):
+	"""
+	Esta função é a implementação original das colunas derivadas de 'clean_data' (map/apply linha a linha), mantida aqui apenas como referência para o benchmark.
+
+	Input: dataframe renomeado
+	Output: dataframe modificado
+	"""
+	def country_name(country_id):
+		COUNTRIES={
+		1: "India",
+		14: "Australia",
+		30: "Brazil",
+		37: "Canada",
+		94: "Indonesia",
+		148: "New Zeland",
+		162: "Philippines",
+		166: "Qatar",
+		184: "Singapure",
+		189: "South Africa",
+		191: "Sri Lanka",
+		208: "Turkey",
+		214: "United Arab Emirates",
+		215: "England",
+		216: "United States of America",
+		}
+		return COUNTRIES[country_id]
+
+	def create_price_type(price_range):
+		if price_range==1:
+			return 'cheap'
+		elif price_range==2:
+			return 'normal'
+		elif price_range==3:
+			return 'expensive'
+		else:
+			return 'gourmet'
+
+	def color_name(color_code):
+		COLORS = {
+		"3F7E00": "darkgreen",
+		"5BA829": "green",
+		"9ACD32": "lightgreen",
+		"CDD614": "orange",
+		"FFBA00": "red",
+		"CBCBC8": "darkred",
+		"FF7800": "darkred",
+		}
+		return COLORS[color_code]
+
+	df['country_name']=list(map(country_name,df['country_code']))
+	df['price_type']=list(map(create_price_type,df['price_range']))
+	df['rating_color']=list(map(color_name,df['rating_color']))
+	# Lista completa das culinárias (coluna adicionada junto com o índice de culinárias), calculada linha a linha
+	df['cuisine_list']=df.loc[:,'cuisines'].apply(lambda x: CUISINE_SEPARATOR.join(dict.fromkeys(label.strip() for label in x.split(',') if label.strip())))
+	df['cuisines']=df.loc[:,'cuisines'].apply(lambda x: x.split(',')[0])
+	return df
+
+def legacy_clean_data(df):
+	"""
+	Esta função é a implementação original de 'clean_data', mantida aqui apenas como referência para o benchmark.
+
+	Input: dataframe
+	Output: dataframe modificado
+	"""
+	df=rename_columns(df)
+	df=df.dropna()
+	df=df.drop_duplicates(ignore_index=True)
+	df=legacy_derive_columns(df)
+	df=df.sort_values('restaurant_id',ascending=1).reset_index(drop=True)
+	return df
+
+def replicate(df_raw,factor):
+	"""
+	Esta função replica o dataframe bruto 'factor' vezes, deslocando os IDs dos restaurantes em cada cópia.
+
+	Input: dataframe bruto, fator de replicação
+	Output: dataframe replicado
+	"""
+	step=int(df_raw['Restaurant ID'].max())+1
+	copies=[]
+	for i in range(factor):
+		aux=df_raw.copy()
+		aux['Restaurant ID']=aux['Restaurant ID']+i*step
+		copies.append(aux)
+	return pd.concat(copies,ignore_index=True)
+
+def best_time(func,df,repeat):
+	"""
+	Esta função executa 'func(df)' 'repeat' vezes e retorna o menor tempo (em segundos) e o último resultado.
+
+	Input: função, dataframe, número de repetições
+	Output: tupla (tempo, resultado)
+	"""
+	best=None
+	for _ in range(repeat):
+		# Cada execução recebe a sua própria cópia, porque as funções de derivação modificam o dataframe
+		aux=df.copy()
+		start=time.perf_counter()
+		result=func(aux)
+		elapsed=time.perf_counter()-start
+		best=elapsed if best is None else min(best,elapsed)
+	return best,result
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+if __name__=='__main__':
+	parser=argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--sizes',type=int,nargs='+',default=[1,10,100])
+	parser.add_argument('--repeat',type=int,default=3)
+	args=parser.parse_args()
+
+	df_raw=pd.read_csv(DATASET_PATH)
+	stages=[
+		('colunas derivadas',legacy_derive_columns,derive_columns,lambda df: rename_columns(df).dropna().drop_duplicates(ignore_index=True)),
+		('clean_data completo',legacy_clean_data,clean_data,lambda df: df),
+	]
+
+	print(f"{'etapa':<20} {'tamanho':>8} {'linhas':>10} {'original (s)':>13} {'vetorizado (s)':>15} {'ganho':>7}")
+	for factor in args.sizes:
+		df_big=replicate(df_raw,factor)
+		for name,legacy_func,new_func,prepare in stages:
+			df_input=prepare(df_big)
+			legacy_time,expected=best_time(legacy_func,df_input,args.repeat)
+			new_time,result=best_time(new_func,df_input,args.repeat)
+			# As duas versões devem produzir exatamente o mesmo dataframe
+			pd.testing.assert_frame_equal(result,expected)
+			print(f"{name:<20} {str(factor)+'x':>8} {len(df_big):>10} {legacy_time:>13.4f} {new_time:>15.4f} {legacy_time/new_time:>6.1f}x")
@@ -0,0 +1,100 @@
+"""
+Benchmark das consultas de proximidade: compara o índice em grade de 'fome_zero.nearby.GeoQueries' com a varredura completa (a
+distância de haversine até todos os restaurantes) em datasets sintéticos ('benchmarks/synthetic.py').
+
+Os pontos de consulta (centrais de entrega) são restaurantes sorteados, deslocados em até ~2 km. Para cada consulta as duas versões
+devem retornar exatamente os mesmos restaurantes, na mesma ordem. Os tempos são por consulta, em milissegundos.
+
+Uso: python benchmarks/bench_geo.py [--sizes 10000 100000 1000000] [--hubs 1000] [--radius 5] [--k 10]
+"""
+# Importando as bibliotecas necessárias
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fome_zero.data import clean_data
+from fome_zero.nearby import NEARBY_COLUMNS, GeoQueries, haversine_km
+from synthetic import synthetic_raw
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def brute_within(geo,latitude,longitude,radius_km,delivery=False):
+	"""
+	Esta função é a busca por raio com a varredura completa, usada como referência.
+
+	Input: GeoQueries, latitude e longitude do ponto, raio em km, apenas restaurantes com entrega online (opcional)
+	Output: tupla (array com as posições dos restaurantes, array com as distâncias em km)
+	"""
+	distances=haversine_km(latitude,longitude,geo.latitude,geo.longitude)
+	inside=distances<=radius_km
+	if delivery:
+		inside&=geo.delivery
+	positions=np.flatnonzero(inside)
+	order=np.lexsort((positions,distances[positions]))
+	return positions[order],distances[positions][order]
+
+def brute_nearest(geo,latitude,longitude,k,delivery=False):
+	"""
+	Esta função é a busca dos 'k' mais próximos com a varredura completa, usada como referência.
+
+	Input: GeoQueries, latitude e longitude do ponto, quantidade de restaurantes, apenas restaurantes com entrega online (opcional)
+	Output: tupla (array com as posições dos restaurantes, array com as distâncias em km)
+	"""
+	distances=haversine_km(latitude,longitude,geo.latitude,geo.longitude)
+	positions=geo.delivery_positions if delivery else np.arange(len(distances))
+	order=np.lexsort((positions,distances[positions]))[:k]
+	return positions[order],distances[positions][order]
+
+def per_query(func,hubs):
+	"""
+	Esta função executa 'func' para cada ponto e retorna o tempo médio por consulta (em milissegundos) e os resultados.
+
+	Input: função (latitude, longitude), array de pontos (n x 2)
+	Output: tupla (float, lista de resultados)
+	"""
+	start=time.perf_counter()
+	results=[func(lat,lon) for lat,lon in hubs]
+	return (time.perf_counter()-start)/len(hubs)*1000,results
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+if __name__=='__main__':
+	parser=argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--sizes',type=int,nargs='+',default=[10_000,100_000,1_000_000])
+	parser.add_argument('--hubs',type=int,default=1000)
+	parser.add_argument('--radius',type=float,default=5.0)
+	parser.add_argument('--k',type=int,default=10)
+	parser.add_argument('--seed',type=int,default=0)
+	args=parser.parse_args()
+
+	print(f"{'consulta':<28} {'linhas':>10} {'varredura (ms)':>15} {'índice (ms)':>12} {'ganho':>7}")
+	for n_rows in args.sizes:
+		df=clean_data(synthetic_raw(n_rows,args.seed)).loc[:,NEARBY_COLUMNS]
+		start=time.perf_counter()
+		geo=GeoQueries(df)
+		print(f"{'montagem do índice':<28} {len(geo):>10} {'':>15} {(time.perf_counter()-start)*1000:>12.1f}")
+		rng=np.random.default_rng(args.seed)
+		sample=rng.integers(0,len(geo),args.hubs)
+		hubs=np.column_stack([geo.latitude[sample]+rng.uniform(-0.02,0.02,args.hubs),geo.longitude[sample]+rng.uniform(-0.02,0.02,args.hubs)])
+		queries=[
+			(f'raio {args.radius:g} km',brute_within,geo.within,(args.radius,)),
+			(f'{args.k} mais próximos',brute_nearest,geo.nearest,(args.k,)),
+			(f'{args.k} mais próximos (entrega)',brute_nearest,geo.nearest,(args.k,True)),
+		]
+		for name,brute,indexed,params in queries:
+			brute_time,expected=per_query(lambda lat,lon: brute(geo,lat,lon,*params),hubs)
+			index_time,result=per_query(lambda lat,lon: indexed(lat,lon,*params),hubs)
+			# As duas versões devem retornar os mesmos restaurantes, na mesma ordem
+			for (positions,distances),(expected_positions,expected_distances) in zip(result,expected):
+				np.testing.assert_array_equal(positions,expected_positions)
+				np.testing.assert_allclose(distances,expected_distances)
+			print(f"{name:<28} {len(geo):>10} {brute_time:>15.3f} {index_time:>12.3f} {brute_time/index_time:>6.1f}x")
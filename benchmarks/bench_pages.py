@@ -0,0 +1,255 @@
+"""
+Benchmark de todas as computações das páginas do dashboard, sem o servidor do Streamlit, em datasets sintéticos de vários tamanhos.
+
+Para cada tamanho o script gera um dataset com o esquema do zomato.csv ('benchmarks/synthetic.py'), mede a limpeza, a montagem das
+estruturas compartilhadas (cubo, índice espacial) e cada indicador e gráfico das páginas com todos os países selecionados (o padrão
+das páginas). Cada medida é o menor tempo entre as repetições; os indicadores são medidos com o cache de seleções vazio, ou seja,
+o tempo da primeira renderização de uma seleção.
+
+Os resultados são gravados em JSON ('--output'). Com '--baseline' os tempos são comparados aos de uma execução anterior e o script
+termina com erro se alguma etapa ficar mais lenta que o limite ('--tolerance'). Diferenças menores que '--min-delta' (1 ms por padrão) são
+ignoradas, porque nas etapas de menos de um milissegundo o ruído da medida sozinho passa do limite relativo.
+
+Uso:
+	python benchmarks/bench_pages.py --sizes 10000 100000 --output benchmarks/results.json
+	python benchmarks/bench_pages.py --sizes 10000 100000 --baseline benchmarks/results.json
+"""
+# Importando as bibliotecas necessárias
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fome_zero.data import clean_data
+from fome_zero.cube import build_cube, CubeView
+from fome_zero.memo import SelectionCache
+from fome_zero.shared import SharedFrame
+from fome_zero.cuisines import CuisineIndex, CuisineRanking
+from fome_zero.header import HeaderTotals
+from fome_zero.costs import CostTables, read_fx_table
+from fome_zero.geo import GridIndex, GEO_COLUMNS, WORLD_BOUNDS, central_spot
+from fome_zero.nearby import NEARBY_COLUMNS, GeoQueries
+from fome_zero.coverage import COVERAGE_COLUMNS, CoverageGrid, coverage_layer
+from fome_zero.search import SEARCH_COLUMNS, SearchIndex
+from fome_zero.metrics import (CUISINES, LEADERBOARD_MIN_VOTES, CANDIDATE_COLUMNS, batch_metrics, default_selections, rating_country, top_city, rating_city, top_rated_restaurants, most_voted_restaurants,
+								best_worse_restaurant, cuisine_leaderboard, city_diversity, cost_ranking, cost_summary)
+from fome_zero.charts import country_vote, country_deliver_booking, city_cuisine, city_service_charts, delivery_charts, cost_boxes
+from synthetic import synthetic_raw
+
+
+# Tamanhos padrão dos datasets sintéticos (linhas do arquivo bruto)
+SIZES=[10_000,100_000,1_000_000,10_000_000]
+
+# Quantidade de cidades nos rankings da página de cidades (o padrão do slider)
+TOP_NUMBER=10
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def best_time(func,repeat,setup=None):
+	"""
+	Esta função executa 'func' 'repeat' vezes e retorna o menor tempo (em segundos). 'setup', se informado, é executado antes de cada
+	repetição, fora da medição, e o seu resultado é passado para 'func'.
+
+	Input: função, número de repetições, função de preparação (opcional)
+	Output: float (segundos)
+	"""
+	best=None
+	for _ in range(repeat):
+		args=(setup(),) if setup is not None else ()
+		start=time.perf_counter()
+		func(*args)
+		elapsed=time.perf_counter()-start
+		best=elapsed if best is None else min(best,elapsed)
+	return best
+
+def dense_view(geo_df):
+	"""
+	Esta função retorna a área visível e o zoom de um mapa aproximado na cidade com mais restaurantes (o caso com mais pontos individuais).
+
+	Input: dataframe com 'GEO_COLUMNS'
+	Output: tupla ((sul, oeste, norte, leste), zoom)
+	"""
+	city=geo_df['city'].value_counts().index[0]
+	aux=geo_df.loc[geo_df['city']==city]
+	lat=aux['latitude'].median()
+	lon=aux['longitude'].median()
+	return (lat-0.1,lon-0.2,lat+0.1,lon+0.2),12
+
+def page_stages(df,shared,cuisine_index,geo_df,geo_index):
+	"""
+	Esta função lista as computações das páginas, na ordem em que aparecem, como pares (nome, função). Cada função recebe um
+	recorte do cubo novo (com o cache de seleções vazio). As tabelas de restaurantes e culinárias usam, como as páginas, a seleção
+	de linhas do dataframe compartilhado (e o índice de culinárias).
+
+	Input: dataframe limpo, SharedFrame, CuisineIndex, dataframe com 'GEO_COLUMNS', índice espacial
+	Output: lista de tuplas (nome, função)
+	"""
+	selection=list(df['country_name'].unique())
+	rows=shared.select('country_name',selection)
+	bounds,zoom=dense_view(geo_df)
+	header=HeaderTotals.from_rows(shared.all_rows(),cuisine_index)
+	nearby=GeoQueries(df.loc[:,NEARBY_COLUMNS])
+	coverage=CoverageGrid.from_frame(df.loc[:,COVERAGE_COLUMNS])
+	search_frame=SharedFrame.from_frame(df.loc[:,SEARCH_COLUMNS])
+	search_index=SearchIndex.from_frame(search_frame)
+	search_rows=search_frame.select('country_name',selection)
+	spot=(float(nearby.latitude[0]),float(nearby.longitude[0]))
+	costs=CostTables.from_frame(df,read_fx_table())
+	ranking=CuisineRanking.from_index(cuisine_index,shared)
+	return [
+		('geral: header totals',lambda view: header.totals(selection)),
+		('geral: header totals (HyperLogLog)',lambda view: header.totals(selection,approx=True)),
+		('geral: central_spot (mundo)',lambda view: central_spot(geo_df,geo_index,selection,WORLD_BOUNDS,2)),
+		('geral: central_spot (cidade)',lambda view: central_spot(geo_df,geo_index,selection,bounds,zoom)),
+		('geral: coverage_layer (mundo)',lambda view: coverage_layer(coverage.cells(selection,WORLD_BOUNDS,2))),
+		('geral: coverage_layer (cidade)',lambda view: coverage_layer(coverage.cells(selection,bounds,zoom))),
+		('países: rating_country',lambda view: (rating_country(view,'maior'),rating_country(view,'menor'))),
+		('países: country_vote',lambda view: country_vote(view)),
+		('países: country_deliver_booking',lambda view: (country_deliver_booking(view,'delivery'),country_deliver_booking(view,'booking'))),
+		('cidades: top_city',lambda view: top_city(view)),
+		('cidades: rating_city',lambda view: (rating_city(view,'melhor',TOP_NUMBER),rating_city(view,'pior',TOP_NUMBER))),
+		('cidades: city_cuisine',lambda view: city_cuisine(city_diversity(rows,cuisine_index),TOP_NUMBER)),
+		('cidades: city_diversity (HyperLogLog)',lambda view: city_diversity(rows,cuisine_index,approx=True)),
+		('cidades: make_multiple_charts',lambda view: city_service_charts(view,TOP_NUMBER)),
+		('restaurantes: make_multiple_charts',lambda view: delivery_charts(view)),
+		('restaurantes: tabelas top 10',lambda view: (top_rated_restaurants(rows,10),most_voted_restaurants(rows,10))),
+		('culinárias: cuisine_leaderboard (5)',lambda view: [
+			cuisine_leaderboard(ranking,rows,CUISINES,TOP_NUMBER,LEADERBOARD_MIN_VOTES,parameter) for parameter in ('maior','menor')
+		]),
+		('culinárias: cuisine_leaderboard (todas)',lambda view: [
+			cuisine_leaderboard(ranking,rows,cuisine_index.cuisines,TOP_NUMBER,LEADERBOARD_MIN_VOTES,parameter) for parameter in ('maior','menor')
+		]),
+		('culinárias: best_worse_restaurant',lambda view: [
+			best_worse_restaurant(ranking,cuisine,parameter)
+			for ranking in [cuisine_index.best_worst(rows,CUISINES)] for cuisine in CUISINES for parameter in ('maior','menor')
+		]),
+		('proximidade: within 5 km',lambda view: nearby.within(*spot,5)),
+		('proximidade: nearest 10 (entrega)',lambda view: nearby.nearest(*spot,10,True)),
+		('busca: search (1 termo)',lambda view: search_index.results(search_rows,'mall',50)),
+		('busca: search (2 termos, com erro)',lambda view: search_index.results(search_rows,'connaught plce',50)),
+		('custos: cost_summary',lambda view: cost_summary(costs,selection,'BRL')),
+		('custos: cost_boxes',lambda view: (cost_boxes(costs,'country_name',selection,'BRL'),cost_boxes(costs,'price_type',selection,'BRL'))),
+		('custos: cost_ranking',lambda view: (cost_ranking(costs,'cuisines',selection,'BRL',TOP_NUMBER),cost_ranking(costs,'city',selection,'BRL',TOP_NUMBER))),
+	]
+
+def run_size(n_rows,repeat,seed):
+	"""
+	Esta função mede todas as etapas para um dataset sintético de 'n_rows' linhas.
+
+	Input: linhas do dataset bruto, número de repetições, semente
+	Output: lista de dicts com 'rows', 'stage' e 'seconds'
+	"""
+	df_raw=synthetic_raw(n_rows,seed)
+	results=[]
+
+	def record(stage,seconds):
+		results.append({'rows':n_rows,'stage':stage,'seconds':round(seconds,6)})
+		print(f'{n_rows:>10} {stage:<40} {seconds:>10.4f}',flush=True)
+
+	# Estruturas compartilhadas, montadas uma vez por processo nas páginas
+	record('clean_data',best_time(clean_data,repeat,setup=df_raw.copy))
+	df=clean_data(df_raw)
+	del df_raw
+	record('build_cube',best_time(lambda: build_cube(df),repeat))
+	cube=build_cube(df)
+	geo_df=df.loc[:,GEO_COLUMNS]
+	record('GridIndex',best_time(lambda: GridIndex(geo_df['latitude'],geo_df['longitude']),repeat))
+	geo_index=GridIndex(geo_df['latitude'],geo_df['longitude'])
+	restaurants=df.loc[:,CANDIDATE_COLUMNS]
+	record('SharedFrame',best_time(lambda: SharedFrame.from_frame(restaurants),repeat))
+	shared=SharedFrame.from_frame(restaurants)
+	record('CuisineIndex',best_time(lambda: CuisineIndex.from_frame(shared),repeat))
+	cuisine_index=CuisineIndex.from_frame(shared)
+	record('CuisineRanking',best_time(lambda: CuisineRanking.from_index(cuisine_index,shared),repeat))
+	record('HeaderTotals',best_time(lambda: HeaderTotals.from_rows(shared.all_rows(),cuisine_index),repeat))
+	record('CoverageGrid',best_time(lambda: CoverageGrid.from_frame(df.loc[:,COVERAGE_COLUMNS]),repeat))
+	record('SearchIndex',best_time(lambda: SearchIndex.from_frame(SharedFrame.from_frame(df.loc[:,SEARCH_COLUMNS])),repeat))
+	record('GeoQueries',best_time(lambda: GeoQueries(df.loc[:,NEARBY_COLUMNS]),repeat))
+	record('CostTables',best_time(lambda: CostTables.from_frame(df,read_fx_table()),repeat))
+
+	# Indicadores e gráficos: cada repetição começa com o cache de seleções vazio
+	selection=list(df['country_name'].unique())
+	record('slice_countries',best_time(lambda: CubeView(cube,selection,SelectionCache()),repeat))
+	record('SharedFrame.select',best_time(lambda: shared.select('country_name',selection),repeat))
+	for stage,func in page_stages(df,shared,cuisine_index,geo_df,geo_index):
+		record(stage,best_time(func,repeat,setup=lambda: CubeView(cube,selection,SelectionCache())))
+
+	# Cálculo em lote dos snapshots: todos os países e cada país sozinho
+	selections=default_selections(selection)
+	record(f'lote: batch_metrics ({len(selections)} seleções)',best_time(lambda: batch_metrics(cube,restaurants,selections),repeat))
+	return results
+
+def compare(results,baseline,tolerance,min_delta=0.001):
+	"""
+	Esta função compara os tempos com os de uma execução anterior e imprime a razão de cada etapa. Uma etapa só é uma regressão quando
+	passa do limite relativo e também fica mais lenta que 'min_delta' segundos.
+
+	Input: lista de resultados, lista de resultados da execução anterior, tolerância (fração, por exemplo 0.2 para 20%), diferença
+		mínima em segundos (opcional)
+	Output: lista com as etapas que ficaram mais lentas que o limite
+	"""
+	previous={(item['rows'],item['stage']):item['seconds'] for item in baseline}
+	regressions=[]
+	print(f"\n{'linhas':>10} {'etapa':<40} {'anterior (s)':>12} {'atual (s)':>10} {'razão':>7}")
+	for item in results:
+		key=(item['rows'],item['stage'])
+		if key not in previous:
+			continue
+		ratio=item['seconds']/max(previous[key],1e-9)
+		flag=''
+		if ratio>1+tolerance and item['seconds']-previous[key]>min_delta:
+			flag=' REGRESSÃO'
+			regressions.append({**item,'baseline_seconds':previous[key],'ratio':round(ratio,3)})
+		print(f'{item["rows"]:>10} {item["stage"]:<40} {previous[key]:>12.4f} {item["seconds"]:>10.4f} {ratio:>6.2f}x{flag}')
+	return regressions
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+if __name__=='__main__':
+	parser=argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--sizes',type=int,nargs='+',default=SIZES)
+	parser.add_argument('--repeat',type=int,default=3)
+	parser.add_argument('--seed',type=int,default=0)
+	parser.add_argument('--output',help='arquivo JSON onde os resultados são gravados')
+	parser.add_argument('--baseline',help='arquivo JSON de uma execução anterior, para comparação')
+	parser.add_argument('--tolerance',type=float,default=0.2)
+	parser.add_argument('--min-delta',type=float,default=0.001,help='diferença mínima, em segundos, para contar como regressão')
+	args=parser.parse_args()
+
+	print(f"{'linhas':>10} {'etapa':<40} {'tempo (s)':>10}")
+	results=[]
+	for n_rows in args.sizes:
+		results+=run_size(n_rows,args.repeat,args.seed)
+
+	report={
+		'timestamp':datetime.now(timezone.utc).isoformat(timespec='seconds'),
+		'python':platform.python_version(),
+		'pandas':pd.__version__,
+		'numpy':np.__version__,
+		'machine':platform.machine(),
+		'repeat':args.repeat,
+		'results':results,
+	}
+	if args.output:
+		with open(args.output,'w',encoding='utf-8') as file:
+			json.dump(report,file,ensure_ascii=False,indent=1)
+
+	if args.baseline:
+		with open(args.baseline,encoding='utf-8') as file:
+			baseline=json.load(file)['results']
+		regressions=compare(results,baseline,args.tolerance,args.min_delta)
+		if regressions:
+			print(f'\n{len(regressions)} etapa(s) mais lenta(s) que o limite de {args.tolerance:.0%} (e mais de {args.min_delta*1000:g} ms)')
+			sys.exit(1)
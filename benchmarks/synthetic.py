@@ -0,0 +1,142 @@
+"""
+Geração de datasets sintéticos com o mesmo esquema do zomato.csv, para medir o dashboard em escalas maiores que a do arquivo original.
+
+As cardinalidades seguem as do arquivo original e crescem com o tamanho do dataset de forma parecida com uma base real:
+	- países: os mesmos 15, com a mesma proporção de restaurantes;
+	- cidades: as 125 originais mais cidades novas em cada país, crescendo com a raiz quadrada do tamanho;
+	- culinárias: as combinações originais ("Italian, Pizza") mais combinações novas dos 199 tipos, também crescendo com a raiz quadrada;
+	- restaurantes: IDs novos, com cerca de 8% de linhas repetidas (como no original, que tem linhas duplicadas).
+As demais colunas (notas, votos, preços, serviços, endereço) são sorteadas em blocos de linhas reais, para manter as combinações coerentes.
+
+Uso: python benchmarks/synthetic.py 100000 dataset/zomato_100k.csv [--seed 0]
+"""
+# Importando as bibliotecas necessárias
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fome_zero.data import DATASET_PATH
+
+
+# Fração das linhas que são cópias exatas de outras linhas (no arquivo original são cerca de 8%)
+DUPLICATE_RATIO=0.08
+
+# Colunas sorteadas em conjunto a partir de uma mesma linha real
+RATING_COLUMNS=['Aggregate rating','Rating color','Rating text','Votes']
+SERVICE_COLUMNS=['Has Table booking','Has Online delivery','Is delivering now','Switch to order menu']
+PRICE_COLUMNS=['Average Cost for two','Price range']
+ADDRESS_COLUMNS=['Address','Locality','Locality Verbose']
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def growth(n_rows,n_source):
+	"""
+	Esta função retorna o fator de crescimento das cardinalidades (cidades, combinações de culinária) para um dataset de 'n_rows' linhas.
+
+	Input: linhas do dataset sintético, linhas do dataset original
+	Output: float (maior ou igual a 1)
+	"""
+	return max(1.0,np.sqrt(n_rows/n_source))
+
+def synthetic_cities(source,n_rows,rng):
+	"""
+	Esta função monta a tabela de cidades do dataset sintético: as cidades originais e cidades novas derivadas delas, cada uma com o seu
+	país, moeda, centro (latitude e longitude) e peso (proporção de restaurantes).
+
+	Input: dataframe original, linhas do dataset sintético, gerador de números aleatórios
+	Output: dataframe com uma linha por cidade
+	"""
+	cities=(source.groupby(['Country Code','City','Currency'])
+				.agg(latitude=('Latitude','median'),longitude=('Longitude','median'),weight=('Restaurant ID','size'))
+				.reset_index())
+	n_new=int(len(cities)*(growth(n_rows,len(source))-1))
+	if n_new>0:
+		# Cada cidade nova copia o país e a moeda de uma cidade original, com o centro deslocado e um peso sorteado entre os originais
+		parent=rng.choice(len(cities),size=n_new,p=cities['weight']/cities['weight'].sum())
+		new=cities.iloc[parent].reset_index(drop=True)
+		new['City']=new['City']+' '+pd.Series(np.arange(n_new)+2,dtype=str)
+		new['latitude']=np.clip(new['latitude']+rng.uniform(-2,2,n_new),-85,85)
+		new['longitude']=(new['longitude']+rng.uniform(-2,2,n_new)+180)%360-180
+		new['weight']=rng.choice(cities['weight'].to_numpy(),size=n_new)
+		cities=pd.concat([cities,new],ignore_index=True)
+	return cities
+
+def synthetic_cuisines(source,n_rows,rng):
+	"""
+	Esta função monta as combinações de culinária do dataset sintético ("Italian, Pizza, Cafe"): as originais, com a frequência original,
+	e combinações novas sorteadas dos tipos de culinária originais, com a quantidade de tipos por restaurante do arquivo original.
+
+	Input: dataframe original, linhas do dataset sintético, gerador de números aleatórios
+	Output: tupla (array com as combinações, array com os pesos)
+	"""
+	counts=source['Cuisines'].value_counts()
+	combos=counts.index.to_numpy(dtype=object)
+	weights=counts.to_numpy(dtype='float64')
+	n_new=int(len(combos)*(growth(n_rows,len(source))-1))
+	if n_new>0:
+		labels=source['Cuisines'].str.split(', ')
+		kinds=labels.explode().value_counts()
+		sizes=rng.choice(labels.str.len().to_numpy(),size=n_new)
+		new=[
+			', '.join(rng.choice(kinds.index.to_numpy(),size=size,replace=False,p=kinds.to_numpy()/kinds.sum()))
+			for size in sizes
+		]
+		combos=np.concatenate([combos,np.array(new,dtype=object)])
+		weights=np.concatenate([weights,rng.choice(weights,size=n_new)])
+	return combos,weights/weights.sum()
+
+def synthetic_raw(n_rows,seed=0,path=DATASET_PATH):
+	"""
+	Esta função gera um dataframe bruto (com as colunas do zomato.csv) de 'n_rows' linhas.
+
+	Input: quantidade de linhas, semente (opcional), caminho do arquivo original (opcional)
+	Output: dataframe bruto
+	"""
+	rng=np.random.default_rng(seed)
+	source=pd.read_csv(path).dropna().drop_duplicates(ignore_index=True)
+	n_unique=max(1,int(round(n_rows*(1-DUPLICATE_RATIO))))
+
+	cities=synthetic_cities(source,n_rows,rng)
+	city=rng.choice(len(cities),size=n_unique,p=cities['weight']/cities['weight'].sum())
+	combos,combo_weights=synthetic_cuisines(source,n_rows,rng)
+
+	df=pd.DataFrame({'Restaurant ID':np.arange(n_unique,dtype='int64')+1_000_000})
+	# Nomes se repetem como no original (redes de restaurantes): cerca de 85% de nomes distintos
+	names=rng.integers(0,max(1,int(n_unique*0.85)),size=n_unique)
+	df['Restaurant Name']=pd.Series(names).map('Restaurante {}'.format)
+	df['Country Code']=cities['Country Code'].to_numpy()[city]
+	df['City']=cities['City'].to_numpy()[city]
+	df['Longitude']=(cities['longitude'].to_numpy()[city]+rng.normal(0,0.05,n_unique)+180)%360-180
+	df['Latitude']=np.clip(cities['latitude'].to_numpy()[city]+rng.normal(0,0.05,n_unique),-85,85)
+	df['Cuisines']=combos[rng.choice(len(combos),size=n_unique,p=combo_weights)]
+	for columns in (ADDRESS_COLUMNS,PRICE_COLUMNS,SERVICE_COLUMNS,RATING_COLUMNS):
+		rows=rng.integers(0,len(source),size=n_unique)
+		for name in columns:
+			df[name]=source[name].to_numpy()[rows]
+	df['Currency']=cities['Currency'].to_numpy()[city]
+
+	# Linhas duplicadas: cópias exatas de linhas sorteadas, misturadas ao resto do arquivo
+	duplicates=rng.integers(0,n_unique,size=n_rows-n_unique)
+	df=pd.concat([df,df.iloc[duplicates]],ignore_index=True)
+	df=df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+	return df.loc[:,source.columns]
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+if __name__=='__main__':
+	parser=argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('rows',type=int)
+	parser.add_argument('output')
+	parser.add_argument('--seed',type=int,default=0)
+	args=parser.parse_args()
+
+	synthetic_raw(args.rows,args.seed).to_csv(args.output,index=False)
@@ -0,0 +1,5 @@
+"""
+Pacote compartilhado do dashboard Fome Zero.
+
+Reúne o carregamento e a limpeza dos dados usados por todas as páginas, para que o arquivo seja lido uma única vez por processo.
+"""
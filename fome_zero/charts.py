@@ -0,0 +1,201 @@
+"""
+Gráficos das páginas do dashboard.
+
+Os dados de cada gráfico são calculados pelo 'fome_zero.metrics'; aqui são montadas apenas as figuras do Plotly. As funções recebem
+o recorte dos dados ('CubeView') e os parâmetros da barra lateral e não usam o Streamlit, de modo que podem ser chamadas fora das páginas.
+"""
+# Importando as bibliotecas necessárias
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import plotly.express as px
+
+from fome_zero.profiling import profiled
+from fome_zero.metrics import country_votes, country_services, city_cuisines, flag_rankings, delivery_summary, delivery_booking, cost_distribution, COST_LABELS
+
+
+# =====================================================
+# VISÃO PAÍSES
+# =====================================================
+
+@profiled()
+def country_vote(view):
+	"""
+	Esta função tem como objetivo criar um gráfico de colunas para representar a quantidade média de avaliações registradas por país.
+
+	Input: recorte do cubo (view)
+	Output: gráfico de colunas
+	"""
+	aux1=country_votes(view)
+	graph=px.bar(aux1,x='country_name',y='votes',title='Número médio de avaliações por país',color='country_name',labels={'country_name':'Países'})
+	graph.update_xaxes(title='Países')
+	graph.update_yaxes(title='Número médio de avaliações')
+	return (graph)
+
+@profiled()
+def country_deliver_booking(view,aux='delivery'or'booking'):
+	"""
+	Esta função tem como objetivo criar um gráfico de colunas com o número de restaurantes por país que fazem entrega ('delivery') ou reserva de mesa ('booking').
+
+	Input: recorte do cubo (view), aux ('delivery' ou 'booking')
+	Output: gráfico de colunas
+	"""
+	if aux=='delivery':
+		aux=country_services(view,'delivery')
+		graph=px.bar(aux,x='country_name',y='restaurant_id',title='Número de restaurantes que fazem entrega por país',color='country_name',labels={'country_name':'Países','restaurant_id':'Nº de restaurantes'})
+		return (graph)
+	elif aux=='booking':
+		aux=country_services(view,'booking')
+		graph=px.bar(aux,x='country_name',y='restaurant_id',title='Número de restaurantes que fazem reserva de mesa por país',color='country_name',labels={'country_name':'Países','restaurant_id':'Nº de restaurantes'})
+		return (graph)
+
+
+# =====================================================
+# VISÃO CIDADES
+# =====================================================
+
+@profiled()
+def city_cuisine(cities,top_number=10):
+	"""
+	Esta função tem como objetivo retornar um gráfico de colunas para representar a quantidade de tipos de culinária distintos por cidade.
+	Os dados são mostrados em ordem decrescente do número de tipos de culinária.
+
+	Input: culinárias distintas por cidade da seleção ('fome_zero.metrics.city_diversity'), quantidade de cidades
+	Output: gráfico de colunas onde o eixo x é o nome da cidade e o eixo y a quantidade de tipos de culinária distintos
+	"""
+	city_cuisine=city_cuisines(cities,top_number)
+	graph=px.bar(
+				city_cuisine,
+				x='city',
+				y='cuisines',
+				color='country_name',
+				width=800,height=600,
+				template='simple_white',
+				title='<b>Cidades com maior quantidade de tipos de culinária distintos<b>',
+				labels={'cuisines':'Tipos de culinária distintos','country_name':'País','city':'Cidade'})
+
+	# Customizando o gráfico
+	graph.update_layout(font_family='sans-serif',
+						title=dict(font=dict(size=22,color='black'),x=0.5),
+						legend=dict(title='<b>Países<b>',title_font={'size':20,'color':'black'},orientation='h',yanchor='bottom',xanchor='center',y=-0.7,x=0.5))
+	return (graph)
+
+@profiled()
+def city_service_charts(view,top_number=10):
+	"""
+	Esta função tem como objetivo criar uma tabela de gráficos, levando em consideração as três categorias 'has_table_booking','has_online_delivering','is_delivering_now'.
+	A função cria subplots, que são subgráficos de coluna para representar a quantidade de restaurantes que atendem à categoria por cidade.
+	A quantidade de cidades é mostrada de acordo com o número de cidades escolhido pelo usuário ('top_number')
+	(é o 'make_multiple_charts' da página de cidades).
+
+	Input: recorte do cubo (view), quantidade de cidades
+	Output: gráficos (graph)
+	"""
+	graph = make_subplots(rows=1, cols=3)
+
+	# Selecionando os dados dos três gráficos, contados em um único agrupamento
+	rankings=flag_rankings(view,'city',top_number)
+
+	# Selecionando os dados que serão utilizados para construir o gráfico 1
+	aux=rankings['has_table_booking']
+	# Adicionando o primeiro gráfico dos restaurantes que fazem reserva
+	graph.add_trace(go.Bar(x=aux['city'],y=aux['restaurant_id'],name='que fazem reserva'), row=1, col=1)
+	# Customizando o gráfico
+	graph.update_xaxes(tickangle=45,title_text='Cidade',title_font={'size':14,'color':'black'},title_standoff=25, row=1, col=1)
+	graph.update_yaxes(tickangle=0,title_text="Nº de Restaurantes",title_font={'size':16,'color':'black'},title_standoff=25, row=1, col=1)
+
+	# Selecionando os dados que serão utilizados para construir o gráfico 2
+	aux1=rankings['has_online_delivery']
+	# Adicionando o segundo gráfico dos restaurantes que fazem entrega online
+	graph.add_trace(go.Bar(x=aux1['city'],y=aux1['restaurant_id'],name='que fazem entrega online',marker_color='green'), row=1, col=2)
+	# Customizando o gráfico
+	graph.update_xaxes(tickangle=45,title_text='Cidade',title_font={'size':14,'color':'black'},title_standoff=25, row=1, col=2)
+	graph.update_yaxes(tickangle=0, row=1, col=2)
+
+	# Selecionando os dados que serão utilizados para construir o gráfico 3
+	aux2=rankings['is_delivering_now']
+	# Adicionando o terceiro gráfico dos restaurantes que estão fazendo entrega agora
+	graph.add_trace(go.Bar(x=aux2['city'],y=aux2['restaurant_id'],name='que estão fazendo entrega agora'), row=1, col=3)
+	# Customizando o gráfico
+	graph.update_xaxes(tickangle=45,title_text='Cidade',title_font={'size':14,'color':'black'},title_standoff=25, row=1, col=3)
+	graph.update_yaxes(tickangle=0, row=1, col=3)
+
+	graph.update_layout(font_family='sans-serif',
+						legend=dict(title=f'<b>Top {top_number} cidades com mais restaurantes<b>',title_font={'size':30,'color':'black'},orientation='h',yanchor='bottom',xanchor='center',y=1.1,x=0.5))
+
+	return (graph)
+
+
+# =====================================================
+# VISÃO RESTAURANTES
+# =====================================================
+
+@profiled()
+def delivery_charts(view):
+	"""
+	Esta função tem como objetivo criar uma tabela de gráficos para ajudar a analisar os seguintes dados referentes a restaurantes que fazem ou não entrega:
+	1. Se a quantidade média de avaliações por restaurante é maior em restaurantes que fazem entrega
+	2. Se a média da nota dos restaurantes que fazem entrega é maior do que dos restaurantes que não fazem entrega
+	3. Se os restaurantes que fazem entrega são os que menos fazem reserva ou não
+	A função cria subplots, que são subgráficos de barra para representar a relação dos restaurantes que fazem entrega ou não com os parâmetros acima mencionados
+	(é o 'make_multiple_charts' da página de restaurantes).
+
+	Input: recorte do cubo (view)
+	Output: gráficos (graph)
+	"""
+	graph = make_subplots(rows=1, cols=3)
+
+	# Selecionando os dados que serão utilizados para construir o gráfico 1
+	# Os restaurantes que aceitam pedido online são também, na média, os restaurantes que mais possuem avaliações registradas?
+	aux=delivery_summary(view)
+	# Adicionando o primeiro gráfico dos restaurantes que fazem reserva
+	graph.add_trace(go.Bar(y=aux['votes'],x=aux['has_online_delivery'],name='com a média de avaliações registradas',marker=dict(color=['red','blue'])), row=1, col=1)
+	# Customizando o gráfico
+	graph.update_xaxes(tickangle=0, row=1, col=1)
+	graph.update_yaxes(tickangle=0,title_text='Média de avaliações registradas',title_font={'size':14,'color':'black'},title_standoff=15, row=1, col=1)
+
+
+	# Selecionando os dados que serão utilizados para construir o gráfico 2
+	aux1=aux
+	# Adicionando o segundo gráfico dos restaurantes que fazem entrega online
+	graph.add_trace(go.Bar(y=aux1['aggregate_rating'],x=aux1['has_online_delivery'],name='com as notas médias',marker=dict(color=['red','blue'])), row=1, col=2)
+	# Customizando o gráfico
+	graph.update_xaxes(tickangle=0,title_text="Fazem entrega?",title_font={'size':16,'color':'black'},title_standoff=25, row=1, col=2)
+	graph.update_yaxes(tickangle=0,title_text='Média das notas',title_font={'size':14,'color':'black'},title_standoff=5, row=1, col=2)
+
+	# Selecionando os dados que serão utilizados para construir o gráfico 3
+	aux2=delivery_booking(view)
+	# Adicionando o terceiro gráfico dos restaurantes que estão fazendo entrega agora
+	graph.add_trace(go.Bar(y=aux2['restaurant_name'],x=aux2['has_online_delivery'],name='com o número de restaurantes que fazem reserva de mesa',marker=dict(color=['red','blue'])), row=1, col=3)
+	# Customizando o gráfico
+	graph.update_yaxes(tickangle=0,title_text='Nº de restaurantes que fazem reserva',title_font={'size':14,'color':'black'},title_standoff=5, row=1, col=3)
+	graph.update_xaxes(tickangle=0, row=1, col=3)
+
+	graph.update_layout(font_family='sans-serif',
+						legend=dict(title=f'<b>Relação dos restaurantes que fazem ou não entrega<b>',title_font={'size':24,'color':'black'},orientation='h',yanchor='bottom',xanchor='center',y=1.1,x=0.5))
+
+	return (graph)
+
+
+# =====================================================
+# VISÃO CUSTOS
+# =====================================================
+
+@profiled()
+def cost_boxes(costs,dim,selection,currency,top_number=None):
+	"""
+	Esta função tem como objetivo criar um gráfico de caixas com a distribuição do custo médio para dois de cada grupo, a partir dos
+	quantis já calculados: a caixa vai do P25 ao P75, com a mediana no meio, e as hastes vão do P10 ao P90.
+	Os grupos são mostrados em ordem decrescente da mediana.
+
+	Input: distribuições do custo (CostTables), dimensão ('country_name', 'city', 'cuisines' ou 'price_type'), lista de países,
+		código ISO da moeda, quantidade de grupos (opcional)
+	Output: gráfico de caixas
+	"""
+	aux=cost_distribution(costs,dim,selection,currency,top_number)
+	graph=go.Figure(go.Box(x=aux[dim],q1=aux['p25'],median=aux['p50'],q3=aux['p75'],lowerfence=aux['p10'],upperfence=aux['p90'],
+							name='',marker_color='darkorange'))
+	graph.update_xaxes(title=COST_LABELS[dim])
+	graph.update_yaxes(title=f'Custo para dois ({currency})')
+	graph.update_layout(font_family='sans-serif',showlegend=False,
+						title=dict(text=f'<b>Custo médio para dois por {COST_LABELS[dim].lower()}<b>',font=dict(size=22,color='black'),x=0.5))
+	return (graph)
@@ -0,0 +1,265 @@
+"""
+Custos comparáveis entre países: o custo médio para dois ('average_cost_for_two') convertido para uma moeda de referência.
+
+O custo de cada restaurante está na moeda local do seu país, e a coluna 'currency' do CSV não é confiável (as Filipinas aparecem com
+'Botswana Pula(P)', quatro países com 'Dollar($)'). A conversão usa a tabela de câmbio local 'dataset/fx_rates.csv', sem acesso à rede,
+com uma linha por país ('country_code'): o código ISO da moeda, quantos dólares vale uma unidade ('usd_per_unit') e a versão da
+tabela (a data das cotações). Para atualizar as cotações, basta editar o arquivo e trocar a versão: os agregados são recalculados
+quando o arquivo muda. Custos iguais a zero são tratados como ausentes.
+
+Os custos são convertidos para dólares uma única vez por processo (e por versão dos dados e do câmbio), e as distribuições são
+calculadas de uma vez ('CostTables'):
+	- por país e por cidade: quantis e médias exatos (cada cidade pertence a um único país, então a seleção de países só filtra as linhas);
+	- por tipo de culinária (todas as culinárias de cada restaurante) e por categoria de preço, que misturam países: um histograma por
+	  país e grupo, com faixas em escala logarítmica ('BIN_EDGES', cerca de 3.5% de largura). Os histogramas dos países selecionados são
+	  somados e os quantis são interpolados dentro da faixa (erro máximo de meia faixa); as médias continuam exatas.
+A troca da moeda de referência apenas multiplica os valores já calculados.
+"""
+# Importando as bibliotecas necessárias
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, load_data, dataset_version
+from fome_zero.cuisines import explode_cuisines
+from fome_zero.profiling import profiled
+
+
+# Tabela de câmbio local, ao lado do CSV
+FX_PATH=os.path.join(os.path.dirname(DATASET_PATH),'fx_rates.csv')
+FX_COLUMNS=['country_code','currency','usd_per_unit','version']
+
+# Moeda em que os custos são guardados
+REFERENCE_CURRENCY='USD'
+
+# Quantis das distribuições e o nome das suas colunas
+QUANTILES=[0.1,0.25,0.5,0.75,0.9]
+QUANTILE_COLUMNS=['p10','p25','p50','p75','p90']
+
+# Faixas dos histogramas, em dólares: 400 faixas em escala logarítmica entre 10 centavos e 100 mil dólares
+BIN_EDGES=np.geomspace(0.1,1e5,401)
+
+# Colunas do dataframe limpo usadas nos custos
+COST_COLUMNS=['country_code','country_name','city','cuisine_list','price_type','average_cost_for_two']
+
+# Dimensões que misturam países, respondidas pelos histogramas
+HISTOGRAM_DIMENSIONS=['cuisines','price_type']
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def read_fx_table(path=FX_PATH):
+	"""
+	Esta função lê a tabela de câmbio e confere as suas colunas.
+
+	Input: caminho da tabela (opcional)
+	Output: dataframe com uma linha por país ('FX_COLUMNS')
+	"""
+	fx=pd.read_csv(path)
+	missing=[col for col in FX_COLUMNS if col not in fx.columns]
+	if missing:
+		raise ValueError(f'colunas ausentes na tabela de câmbio {path}: {missing}')
+	if fx['country_code'].duplicated().any():
+		raise ValueError(f'países repetidos na tabela de câmbio {path}')
+	return fx
+
+def fx_version(path=FX_PATH):
+	"""
+	Esta função retorna a versão atual da tabela de câmbio (data de modificação do arquivo), para fazer parte da chave dos caches.
+
+	Input: caminho da tabela (opcional)
+	Output: int (data de modificação em ns)
+	"""
+	return os.stat(path).st_mtime_ns
+
+@profiled()
+def cost_in_reference(df,fx):
+	"""
+	Esta função converte o custo médio para dois de cada restaurante para a moeda de referência, pela taxa do seu país.
+
+	Input: dataframe com 'country_code' e 'average_cost_for_two', tabela de câmbio
+	Output: série com o custo em dólares (NaN para os custos iguais a zero)
+	"""
+	rates=df['country_code'].map(fx.set_index('country_code')['usd_per_unit'])
+	if rates.isna().any():
+		raise ValueError(f"países sem taxa na tabela de câmbio: {sorted(df.loc[rates.isna(),'country_code'].unique())}")
+	cost=df['average_cost_for_two'].astype('float64')
+	return cost.where(cost>0)*rates.astype('float64')
+
+def distribution(df,by):
+	"""
+	Esta função calcula a distribuição exata do custo em cada grupo.
+
+	Input: dataframe com a coluna 'cost', coluna ou lista de colunas do grupo
+	Output: dataframe com as colunas do grupo, 'restaurants', 'mean' e 'QUANTILE_COLUMNS'
+	"""
+	costs=df.groupby(by,observed=True,sort=True)['cost']
+	quantiles=costs.quantile(QUANTILES).unstack()
+	quantiles.columns=QUANTILE_COLUMNS
+	return pd.concat([costs.count().rename('restaurants'),costs.mean().rename('mean'),quantiles],axis=1).reset_index()
+
+def histogram_quantiles(counts,quantiles=QUANTILES):
+	"""
+	Esta função estima os quantis de cada linha de histogramas, interpolando dentro da faixa em escala logarítmica.
+
+	Input: array com uma linha de contagens por grupo (uma coluna por faixa de 'BIN_EDGES'), lista de quantis (opcional)
+	Output: array com uma linha por grupo e uma coluna por quantil (NaN para os grupos vazios)
+	"""
+	cumulative=counts.cumsum(axis=1)
+	total=cumulative[:,-1]
+	log_edges=np.log(BIN_EDGES)
+	result=np.full((len(counts),len(quantiles)),np.nan)
+	filled=total>0
+	rows=np.flatnonzero(filled)
+	for col,quantile in enumerate(quantiles):
+		target=quantile*total[filled]
+		# Primeira faixa em que a contagem acumulada alcança o alvo, e a posição do alvo dentro dela
+		bins=(cumulative[filled]<target[:,None]).sum(axis=1).clip(0,counts.shape[1]-1)
+		before=cumulative[rows,bins]-counts[rows,bins]
+		within=np.divide(target-before,counts[rows,bins],out=np.zeros(len(rows)),where=counts[rows,bins]>0)
+		result[filled,col]=np.exp(log_edges[bins]+within*(log_edges[bins+1]-log_edges[bins]))
+	return result
+
+class CostTables:
+	"""
+	Distribuições do custo em dólares: as tabelas exatas por país e por cidade e, para cada dimensão de 'HISTOGRAM_DIMENSIONS', os
+	valores do grupo, os histogramas por país e grupo ('counts') e as somas dos custos ('sums').
+	"""
+
+	def __init__(self,fx,countries,tables,histograms):
+		self.fx=fx
+		self.version=str(fx['version'].iloc[0]) if len(fx) else ''
+		self.countries=countries
+		self.tables=tables
+		self.histograms=histograms
+
+	@classmethod
+	@profiled()
+	def from_frame(cls,df,fx):
+		"""
+		Esta função converte os custos e calcula todas as distribuições, em uma única passada por dimensão.
+
+		Input: dataframe limpo com 'COST_COLUMNS', tabela de câmbio
+		Output: CostTables
+		"""
+		df=df.loc[:,COST_COLUMNS].assign(cost=cost_in_reference(df,fx)).dropna(subset=['cost'])
+		country_codes,countries=pd.factorize(df['country_name'],sort=True)
+		tables={'country_name':distribution(df,'country_name'),'city':distribution(df,['country_name','city'])}
+		bins=(np.searchsorted(BIN_EDGES,df['cost'].to_numpy(),side='right')-1).clip(0,len(BIN_EDGES)-2)
+		exploded=explode_cuisines(df.loc[:,['country_name','cuisine_list','cost']].assign(bin=bins))
+		histograms={}
+		for dim,aux in (('cuisines',exploded),('price_type',df.assign(bin=bins))):
+			codes,groups=pd.factorize(aux[dim],sort=True)
+			country=np.searchsorted(countries,aux['country_name'].to_numpy())
+			cells=country*len(groups)+codes
+			size=len(countries)*len(groups)
+			counts=np.bincount(cells*(len(BIN_EDGES)-1)+aux['bin'].to_numpy(),minlength=size*(len(BIN_EDGES)-1))
+			histograms[dim]={
+				'groups':np.asarray(groups,dtype=object),
+				'counts':counts.reshape(len(countries),len(groups),len(BIN_EDGES)-1).astype('int32'),
+				'sums':np.bincount(cells,weights=aux['cost'].to_numpy(),minlength=size).reshape(len(countries),len(groups)),
+			}
+		return cls(fx,np.asarray(countries,dtype=object),tables,histograms)
+
+	@property
+	def nbytes(self):
+		tables=sum(table.memory_usage(deep=True).sum() for table in self.tables.values())
+		return int(tables+sum(item['counts'].nbytes+item['sums'].nbytes for item in self.histograms.values()))
+
+	@property
+	def currencies(self):
+		"""
+		Esta função lista as moedas da tabela de câmbio, começando pela moeda de referência.
+		"""
+		return list(dict.fromkeys([REFERENCE_CURRENCY]+list(self.fx['currency'])))
+
+	def rate(self,currency):
+		"""
+		Esta função retorna quantas unidades da moeda valem um dólar.
+
+		Input: código ISO da moeda
+		Output: float
+		"""
+		if currency==REFERENCE_CURRENCY:
+			return 1.0
+		usd_per_unit=self.fx.loc[self.fx['currency']==currency,'usd_per_unit']
+		if usd_per_unit.empty:
+			raise ValueError(f'moeda fora da tabela de câmbio: {currency}')
+		return 1/float(usd_per_unit.iloc[0])
+
+	def _merged(self,dim,selection):
+		"""
+		Esta função soma os histogramas e os custos dos países selecionados.
+
+		Input: dimensão de 'HISTOGRAM_DIMENSIONS', lista de países
+		Output: tupla (valores do grupo, contagens por grupo e faixa, soma dos custos por grupo)
+		"""
+		item=self.histograms[dim]
+		wanted=np.isin(self.countries,list(selection))
+		return item['groups'],item['counts'][wanted].sum(axis=0),item['sums'][wanted].sum(axis=0)
+
+	@profiled()
+	def table(self,dim,selection,currency=REFERENCE_CURRENCY):
+		"""
+		Esta função retorna a distribuição do custo por grupo da dimensão, para a seleção de países e na moeda escolhida.
+
+		Input: dimensão ('country_name', 'city', 'cuisines' ou 'price_type'), lista de países, código ISO da moeda (opcional)
+		Output: dataframe com as colunas do grupo ('country_name' e 'city' para as cidades), 'restaurants', 'mean' e 'QUANTILE_COLUMNS',
+			em ordem crescente dos grupos
+		"""
+		if dim in self.tables:
+			aux=self.tables[dim]
+			aux=aux.loc[aux['country_name'].isin(list(selection))].reset_index(drop=True)
+		else:
+			groups,counts,sums=self._merged(dim,selection)
+			total=counts.sum(axis=1)
+			present=total>0
+			aux=pd.DataFrame(histogram_quantiles(counts[present]),columns=QUANTILE_COLUMNS)
+			aux.insert(0,dim,groups[present])
+			aux.insert(1,'restaurants',total[present])
+			aux.insert(2,'mean',sums[present]/total[present])
+		rate=self.rate(currency)
+		if rate!=1.0:
+			aux=aux.assign(**{col:aux[col]*rate for col in ['mean']+QUANTILE_COLUMNS})
+		return aux
+
+	def summary(self,selection,currency=REFERENCE_CURRENCY):
+		"""
+		Esta função retorna a distribuição do custo de todos os restaurantes da seleção (a soma dos histogramas das categorias de preço,
+		já que cada restaurante tem uma única categoria).
+
+		Input: lista de países, código ISO da moeda (opcional)
+		Output: dict com 'restaurants', 'mean' e os quantis de 'QUANTILE_COLUMNS' (None quando a seleção não tem custos)
+		"""
+		_,counts,sums=self._merged('price_type',selection)
+		counts=counts.sum(axis=0,keepdims=True)
+		total=int(counts.sum())
+		if total==0:
+			return {'restaurants':0,'mean':None,**{col:None for col in QUANTILE_COLUMNS}}
+		rate=self.rate(currency)
+		quantiles=histogram_quantiles(counts)[0]*rate
+		return {'restaurants':total,'mean':sums.sum()/total*rate,**dict(zip(QUANTILE_COLUMNS,quantiles))}
+
+@st.cache_resource(max_entries=4,show_spinner=False)
+def _load_cost_tables(path,mtime,version,fx_path,fx_mtime):
+	"""
+	Esta função calcula as distribuições do custo uma única vez por processo e por versão dos dados e da tabela de câmbio.
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza, caminho e data de modificação da tabela de câmbio
+	Output: CostTables
+	"""
+	return CostTables.from_frame(load_data(path,columns=COST_COLUMNS),read_fx_table(fx_path))
+
+def load_cost_tables(path=DATASET_PATH,fx_path=FX_PATH):
+	"""
+	Esta função tem como objetivo carregar as distribuições do custo compartilhadas por todas as sessões.
+
+	Input: caminho do arquivo (opcional), caminho da tabela de câmbio (opcional)
+	Output: CostTables
+	"""
+	mtime,version=dataset_version(path)
+	return _load_cost_tables(path,mtime,version,fx_path,fx_version(fx_path))
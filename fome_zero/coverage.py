@@ -0,0 +1,192 @@
+"""
+Camada de cobertura de entrega do mapa da Visão Geral: os restaurantes agrupados em uma grade quadrada para cada nível de zoom, com
+a quantidade de restaurantes e a proporção dos que fazem entrega online ('has_online_delivery') ou estão entregando agora
+('is_delivering_now') em cada célula.
+
+As células têm o mesmo tamanho das do agrupamento do mapa ('fome_zero.geo.cluster_size', cerca de 'CLUSTER_PIXELS' pixels de tela),
+de modo que a área visível tem sempre um número limitado de células, qualquer que seja a quantidade de restaurantes. A grade é
+montada uma única vez por processo: os pontos são agrupados no zoom mais alto ('MAX_COVERAGE_ZOOM') e cada zoom abaixo é obtido
+somando as células do zoom seguinte (cada célula contém exatamente 2x2 células do zoom seguinte). As células são separadas por país,
+para que o filtro de países apenas escolha as células e some as de países diferentes que caem no mesmo quadrado.
+"""
+# Importando as bibliotecas necessárias
+import numpy as np
+import pandas as pd
+import folium
+import branca.colormap
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, load_data, dataset_version
+from fome_zero.geo import GridIndex, cluster_size
+from fome_zero.profiling import profiled
+
+
+# Colunas do dataframe limpo usadas na grade
+COVERAGE_COLUMNS=['country_name','latitude','longitude','has_online_delivery','is_delivering_now']
+
+# Indicadores de entrega que podem colorir as células (coluna: descrição)
+COVERAGE_METRICS={'has_online_delivery':'entrega online','is_delivering_now':'entregando agora'}
+
+# Níveis de zoom com a grade calculada (acima do maior, as células do maior zoom são usadas)
+MIN_COVERAGE_ZOOM=2
+MAX_COVERAGE_ZOOM=14
+
+# Escala de cores da proporção de restaurantes com entrega (0% a 100%)
+COVERAGE_COLORS=['#d7191c','#fdae61','#a6d96a','#1a9641']
+
+# Casas decimais das coordenadas enviadas ao navegador (cerca de 1 m)
+COORDINATE_DECIMALS=5
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def _aggregate(keys,values):
+	"""
+	Esta função soma as colunas de 'values' das linhas com a mesma chave.
+
+	Input: array int64 de chaves, dict de arrays (uma entrada por linha)
+	Output: tupla (chaves distintas em ordem crescente, dict com as somas de cada chave)
+	"""
+	unique,inverse=np.unique(keys,return_inverse=True)
+	return unique,{name:np.bincount(inverse,weights=value,minlength=len(unique)) for name,value in values.items()}
+
+class CoverageGrid:
+	"""
+	Grade de cobertura de cada nível de zoom: para cada célula não vazia de cada país, a linha e a coluna da célula, o país, a quantidade
+	de restaurantes e de restaurantes com cada indicador de 'COVERAGE_METRICS', e um índice espacial sobre os centros das células.
+	"""
+
+	def __init__(self,countries,levels):
+		self.countries=countries
+		self.levels=levels
+
+	@classmethod
+	@profiled()
+	def from_frame(cls,df):
+		"""
+		Esta função agrupa os restaurantes em todos os níveis de zoom com operações vetorizadas.
+
+		Input: dataframe com 'COVERAGE_COLUMNS'
+		Output: CoverageGrid
+		"""
+		country,countries=pd.factorize(df['country_name'],sort=True)
+		size=cluster_size(MAX_COVERAGE_ZOOM)
+		rows=np.floor((df['latitude'].to_numpy(dtype='float64')+90)/size).astype('int64')
+		cols=np.floor((df['longitude'].to_numpy(dtype='float64')+180)/size).astype('int64')
+		values={'count':np.ones(len(df))}
+		values.update({col:df[col].to_numpy(dtype='float64') for col in COVERAGE_METRICS})
+		country=country.astype('int64')
+		levels={}
+		for zoom in range(MAX_COVERAGE_ZOOM,MIN_COVERAGE_ZOOM-1,-1):
+			# Chave da célula: país, linha e coluna em bits separados (a linha e a coluna têm no máximo 17 bits no maior zoom)
+			keys,values=_aggregate((country<<40)|(rows<<20)|cols,values)
+			country,rows,cols=keys>>40,(keys>>20)&0xFFFFF,keys&0xFFFFF
+			size=cluster_size(zoom)
+			levels[zoom]={
+				'country':country.astype('int16'),
+				'row':rows.astype('int32'),
+				'col':cols.astype('int32'),
+				**{name:value.astype('int32') for name,value in values.items()},
+				# Centro da parte da célula dentro do mapa (a última linha e a última coluna passam de 90 e de 180 graus)
+				'index':GridIndex((rows*size-90+np.minimum((rows+1)*size-90,90))/2,(cols*size-180+np.minimum((cols+1)*size-180,180))/2),
+			}
+			# As células do zoom de baixo contêm 2x2 células deste zoom
+			rows,cols=rows>>1,cols>>1
+		return cls(np.asarray(countries,dtype=object),levels)
+
+	@property
+	def nbytes(self):
+		return int(sum(value.nbytes for level in self.levels.values() for name,value in level.items() if name!='index'))
+
+	@profiled()
+	def cells(self,selection,bounds,zoom):
+		"""
+		Esta função retorna as células da área visível para os países selecionados, somando as de países diferentes no mesmo quadrado.
+
+		Input: lista de países, área visível (sul, oeste, norte, leste), nível de zoom
+		Output: dict com arrays 'south', 'west', 'north' e 'east' (limites de cada célula), 'count' e um array por indicador de
+			'COVERAGE_METRICS' (restaurantes com o indicador)
+		"""
+		zoom=int(min(max(zoom,MIN_COVERAGE_ZOOM),MAX_COVERAGE_ZOOM))
+		level=self.levels[zoom]
+		size=cluster_size(zoom)
+		# Os centros das células parcialmente visíveis ficam a até meia célula fora da área
+		south,west,north,east=bounds
+		south,north=max(south-size,-90.0),min(north+size,90.0)
+		width=east-west+2*size if west<=east else east+360-west+2*size
+		if width>=360:
+			west,east=-180.0,180.0
+		else:
+			west,east=west-size,east+size
+			west,east=west+360 if west<-180 else west,east-360 if east>180 else east
+		positions=level['index'].query(south,west,north,east)
+		positions=positions[np.isin(level['country'][positions],np.flatnonzero(np.isin(self.countries,list(selection))))]
+		rows=level['row'][positions].astype('int64')
+		cols=level['col'][positions].astype('int64')
+		keys,values=_aggregate((rows<<20)|cols,{name:level[name][positions] for name in ['count']+list(COVERAGE_METRICS)})
+		rows,cols=keys>>20,keys&0xFFFFF
+		return {
+			'south':rows*size-90,'west':cols*size-180,'north':np.minimum((rows+1)*size-90,90.0),'east':np.minimum((cols+1)*size-180,180.0),
+			**{name:value.astype('int64') for name,value in values.items()},
+		}
+
+@profiled()
+def coverage_layer(cells,metric='has_online_delivery',name='Cobertura de entrega'):
+	"""
+	Esta função monta a camada do mapa com um quadrado GeoJSON por célula não vazia: a cor mostra a proporção de restaurantes com o
+	indicador (de vermelho, 0%, a verde, 100%) e a opacidade cresce com a quantidade de restaurantes da célula.
+
+	Input: células retornadas por 'CoverageGrid.cells', indicador de 'COVERAGE_METRICS' (opcional), nome da camada (opcional)
+	Output: folium.FeatureGroup
+	"""
+	colormap=branca.colormap.LinearColormap(COVERAGE_COLORS,vmin=0,vmax=1)
+	count=cells['count']
+	ratio=cells[metric]/np.maximum(count,1)
+	opacity=np.round(0.25+0.5*np.log1p(count)/np.log1p(max(count.max(),1)),2) if len(count) else count
+	bounds=[np.round(cells[side],COORDINATE_DECIMALS) for side in ('south','west','north','east')]
+	features=[
+		{
+			'type':'Feature',
+			'geometry':{'type':'Polygon','coordinates':[[[w,s],[e,s],[e,n],[w,n],[w,s]]]},
+			'properties':{
+				'label':f'{total} restaurantes: {share:.0%} com {COVERAGE_METRICS[metric]}',
+				'color':colormap(share),
+				'opacity':alpha,
+			},
+		}
+		for s,w,n,e,total,share,alpha in zip(*bounds,count,ratio,opacity)
+	]
+	layer=folium.FeatureGroup(name=name)
+	folium.GeoJson(
+		{'type':'FeatureCollection','features':features},
+		style_function=lambda feature: {
+			'fillColor':feature['properties']['color'],
+			'fillOpacity':feature['properties']['opacity'],
+			'color':feature['properties']['color'],
+			'weight':0.5,
+		},
+		tooltip=folium.GeoJsonTooltip(fields=['label'],labels=False),
+	).add_to(layer)
+	return layer
+
+@st.cache_resource(max_entries=4,show_spinner=False)
+def _load_coverage_grid(path,mtime,version):
+	"""
+	Esta função monta a grade de cobertura uma única vez por processo e por versão dos dados.
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza
+	Output: CoverageGrid
+	"""
+	return CoverageGrid.from_frame(load_data(path,columns=COVERAGE_COLUMNS))
+
+def load_coverage_grid(path=DATASET_PATH):
+	"""
+	Esta função tem como objetivo carregar a grade de cobertura de entrega, compartilhada por todas as sessões.
+
+	Input: caminho do arquivo (opcional)
+	Output: CoverageGrid
+	"""
+	mtime,version=dataset_version(path)
+	return _load_coverage_grid(path,mtime,version)
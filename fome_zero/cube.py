@@ -0,0 +1,223 @@
+"""
+Cubo de agregados pré-calculado por país, cidade, culinária, categoria de preço, serviços e faixa de nota.
+
+Cada linha do cubo é um grupo de restaurantes com a mesma combinação de dimensões e guarda a quantidade de restaurantes e, para cada medida,
+a soma, a soma dos quadrados, o mínimo e o máximo. Os gráficos das páginas são respondidos agregando o cubo ('rollup'), e o filtro de países
+é apenas um recorte dele ('slice_countries'), de modo que o custo de cada renderização depende do número de grupos e não do número de restaurantes.
+"""
+# Importando as bibliotecas necessárias
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, load_data, dataset_version
+from fome_zero.memo import selection_key
+from fome_zero.profiling import profiled
+
+
+# Faixas de nota usadas na página de cidades: acima de 4 ('alta') e abaixo de 2.5 ('baixa')
+HIGH_RATING=4.0
+LOW_RATING=2.5
+
+DIMENSIONS=['country_name','city','cuisines','price_type','has_online_delivery','has_table_booking','is_delivering_now','rating_band']
+MEASURES=['votes','aggregate_rating']
+
+# Colunas do dataframe limpo necessárias para montar o cubo
+CUBE_COLUMNS=[col for col in DIMENSIONS if col!='rating_band']+MEASURES
+
+# Dimensões 0/1 dos serviços, somadas de uma só vez por 'flag_rollup'
+FLAG_DIMENSIONS=['has_online_delivery','has_table_booking','is_delivering_now']
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def rating_band(rating):
+	"""
+	Esta função classifica as notas em faixas: 'alta' (maior que 4), 'baixa' (menor que 2.5) ou 'media'.
+
+	Input: série com as notas
+	Output: array com a faixa de cada nota
+	"""
+	rating=np.asarray(rating)
+	return np.select([rating>HIGH_RATING,rating<LOW_RATING],['alta','baixa'],default='media').astype(object)
+
+@profiled()
+def build_cube(df):
+	"""
+	Esta função tem como objetivo montar o cubo de agregados a partir do dataframe limpo, em uma única passada de groupby.
+
+	Input: dataframe limpo
+	Output: dataframe com uma linha por combinação de 'DIMENSIONS' e as colunas 'count', '<medida>_sum', '<medida>_sumsq', '<medida>_min' e '<medida>_max'
+	"""
+	aux=df.loc[:,CUBE_COLUMNS].copy()
+	aux['rating_band']=rating_band(aux['aggregate_rating'])
+	aggregations={'count':('votes','size')}
+	for measure in MEASURES:
+		aux[measure+'_sq']=aux[measure].astype('float64')**2
+		aggregations[measure+'_sum']=(measure,'sum')
+		aggregations[measure+'_sumsq']=(measure+'_sq','sum')
+		aggregations[measure+'_min']=(measure,'min')
+		aggregations[measure+'_max']=(measure,'max')
+	cube=aux.groupby(DIMENSIONS,sort=False,observed=True).agg(**aggregations).reset_index()
+	return cube
+
+@profiled()
+def slice_countries(cube,countries):
+	"""
+	Esta função recorta o cubo para os países selecionados no filtro da barra lateral.
+
+	Input: cubo, lista de países
+	Output: cubo recortado
+	"""
+	return cube.loc[cube['country_name'].isin(countries)]
+
+def rollup(cube,by):
+	"""
+	Esta função agrega o cubo pelas dimensões informadas, somando as quantidades e as somas e combinando os mínimos e máximos.
+	Também calcula a média ('<medida>_mean') e o desvio padrão populacional ('<medida>_std') de cada medida.
+
+	Input: cubo, dimensão ou lista de dimensões
+	Output: dataframe com uma linha por grupo (ordenado pelas dimensões), com as dimensões como colunas
+	"""
+	aggregations={'count':'sum'}
+	for measure in MEASURES:
+		aggregations[measure+'_sum']='sum'
+		aggregations[measure+'_sumsq']='sum'
+		aggregations[measure+'_min']='min'
+		aggregations[measure+'_max']='max'
+	aux=cube.groupby(by,observed=True).agg(aggregations).reset_index()
+	for measure in MEASURES:
+		mean=aux[measure+'_sum']/aux['count']
+		aux[measure+'_mean']=mean
+		aux[measure+'_std']=np.sqrt(np.maximum(aux[measure+'_sumsq']/aux['count']-mean**2,0))
+	return aux
+
+@profiled()
+def flag_rollup(cube,by):
+	"""
+	Esta função agrega o cubo pelas dimensões informadas contando, em uma única passada de groupby, os restaurantes de cada grupo que
+	oferecem cada serviço de 'FLAG_DIMENSIONS' (a soma de 'count' das linhas em que o serviço vale 1), além do total de restaurantes e
+	das somas e médias das medidas. Substitui um 'rollup([serviço, ...])' por serviço.
+	Também aceita um resultado de 'rollup' que tenha os serviços entre as dimensões.
+
+	Input: cubo, dimensão ou lista de dimensões
+	Output: dataframe com uma linha por grupo (ordenado pelas dimensões), com as colunas 'count', uma coluna por serviço (número de
+		restaurantes com o serviço, exceto os serviços usados como dimensão), '<medida>_sum' e '<medida>_mean'
+	"""
+	by_list=by if isinstance(by,list) else [by]
+	counts=cube['count'].to_numpy()
+	flags={flag:cube[flag].to_numpy()*counts for flag in FLAG_DIMENSIONS if flag not in by_list}
+	aux=cube.loc[:,by_list+['count']+[measure+'_sum' for measure in MEASURES]].assign(**flags)
+	aux=aux.groupby(by_list,observed=True).sum().reset_index()
+	for measure in MEASURES:
+		aux[measure+'_mean']=aux[measure+'_sum']/aux['count']
+	return aux
+
+@profiled()
+def merge_cubes(cubes):
+	"""
+	Esta função combina cubos montados a partir de partes disjuntas dos dados (por exemplo blocos do CSV) no cubo do conjunto,
+	somando as quantidades e as somas e combinando os mínimos e máximos de cada grupo.
+
+	Input: lista de cubos
+	Output: cubo
+	"""
+	return rollup(pd.concat(cubes,ignore_index=True),DIMENSIONS).loc[:,cubes[0].columns]
+
+def _group_keys(cube):
+	return pd.MultiIndex.from_frame(cube.loc[:,DIMENSIONS])
+
+@profiled()
+def update_cube(cube,removed,added,df):
+	"""
+	Esta função atualiza o cubo depois de uma alteração nos restaurantes, mexendo apenas nos grupos afetados:
+	1. Grupos que perderam restaurantes (removidos ou alterados) são recalculados a partir das linhas atuais desses grupos, para que o mínimo e o máximo continuem exatos
+	2. Grupos que apenas ganharam restaurantes são combinados com o cubo das linhas novas ('merge_cubes')
+	3. Os demais grupos são mantidos como estão
+
+	Input: cubo, linhas removidas (versão antiga das linhas alteradas e removidas), linhas adicionadas (versão nova), dataframe limpo já atualizado
+	Output: cubo atualizado (novo dataframe; o cubo original não é modificado)
+	"""
+	keys=_group_keys(cube)
+	removed_cube=build_cube(removed)
+	added_cube=build_cube(added)
+	lost=_group_keys(removed_cube)
+	gained=_group_keys(added_cube)
+	gained_only=gained[~gained.isin(lost)]
+
+	# Linhas atuais dos grupos que perderam restaurantes: o filtro por cidade e culinária é só uma pré-seleção barata antes de montar o cubo
+	candidates=df.loc[df['city'].isin(removed_cube['city'].unique())&df['cuisines'].isin(removed_cube['cuisines'].unique())]
+	recomputed=build_cube(candidates)
+	recomputed=recomputed.loc[_group_keys(recomputed).isin(lost)]
+
+	merged=merge_cubes([cube.loc[keys.isin(gained_only)],added_cube.loc[gained.isin(gained_only)]]) if len(gained_only) else cube.iloc[:0]
+	untouched=cube.loc[~keys.isin(lost)&~keys.isin(gained_only)]
+	return pd.concat([untouched,recomputed,merged],ignore_index=True).loc[:,cube.columns]
+
+@profiled()
+def filtered_rollup(cube,by,where):
+	"""
+	Esta função filtra o cubo pelas condições de igualdade informadas (por exemplo {'has_online_delivery':1}) e depois o agrega com 'rollup'.
+
+	Input: cubo, dimensão ou lista de dimensões, dict com as condições
+	Output: dataframe agregado
+	"""
+	for col,value in where.items():
+		cube=cube.loc[cube[col]==value]
+	return rollup(cube,by)
+
+class CubeView:
+	"""
+	Recorte do cubo para uma seleção de países, com o recorte e os agregados memorizados no cache de seleções ('fome_zero.memo').
+
+	Os dataframes retornados por 'rollup' são compartilhados entre as sessões: use '.assign', '.rename' ou '.copy' antes de modificá-los.
+	"""
+
+	def __init__(self,cube,selection,memo):
+		self.selection=frozenset(selection)
+		self.memo=memo
+		self.cube=memo.get_or_compute(selection_key(self.selection,'cube'),slice_countries,cube,list(self.selection))
+
+	def rollup(self,by,**where):
+		"""
+		Esta função agrega o recorte pelas dimensões informadas, depois de filtrá-lo pelas condições de igualdade passadas como argumentos nomeados.
+
+		Input: dimensão ou lista de dimensões, condições (opcional, por exemplo rating_band='alta')
+		Output: dataframe agregado (compartilhado, não modificar)
+		"""
+		by_key=tuple(by) if isinstance(by,list) else by
+		key=selection_key(self.selection,'rollup',by_key,tuple(sorted(where.items())))
+		return self.memo.get_or_compute(key,filtered_rollup,self.cube,by,where)
+
+	def flag_rollup(self,by):
+		"""
+		Esta função retorna o 'flag_rollup' do recorte (os restaurantes com cada serviço por grupo), memorizado pela seleção.
+
+		Input: dimensão ou lista de dimensões
+		Output: dataframe agregado (compartilhado, não modificar)
+		"""
+		by_key=tuple(by) if isinstance(by,list) else by
+		return self.memo.get_or_compute(selection_key(self.selection,'flag_rollup',by_key),flag_rollup,self.cube,by)
+
+@st.cache_resource(max_entries=4,show_spinner=False)
+def _load_cube(path,mtime,version):
+	"""
+	Esta função monta o cubo uma única vez por processo e por versão dos dados ('mtime' e 'version' fazem parte da chave do cache).
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza
+	Output: cubo
+	"""
+	return build_cube(load_data(path,columns=CUBE_COLUMNS))
+
+def load_cube(path=DATASET_PATH):
+	"""
+	Esta função tem como objetivo carregar o cubo de agregados compartilhado por todas as páginas.
+	Assim como o dataframe de 'load_data', o cubo é compartilhado entre as sessões e não deve ser modificado.
+
+	Input: caminho do arquivo (opcional)
+	Output: cubo
+	"""
+	mtime,version=dataset_version(path)
+	return _load_cube(path,mtime,version)
@@ -0,0 +1,280 @@
+"""
+Índice de culinárias com todos os tipos de culinária de cada restaurante.
+
+A coluna 'cuisines' do dataframe limpo guarda apenas o primeiro tipo de culinária (é a dimensão do cubo e dos gráficos), mas boa parte
+dos restaurantes tem vários ('Pizza, Italian'). O 'CuisineIndex' é a tabela restaurante × culinária da coluna 'cuisine_list', montada
+uma única vez por processo: dois arrays de int32 (a posição do restaurante no 'SharedFrame' e o código da culinária), ordenados pela
+culinária, com o início de cada culinária em 'offsets' (o formato CSR de uma matriz de incidência esparsa). O texto é separado uma
+única vez por combinação distinta de culinárias, e não por restaurante.
+
+Assim o melhor restaurante japonês considera todos os restaurantes com 'Japanese' na lista, e não apenas os que têm 'Japanese' como
+primeiro tipo, e as consultas por culinária (restaurantes, contagens, melhor e pior, diversidade por cidade) são operações vetorizadas
+sobre os códigos, sem comparar textos. A seleção de países ('SharedRows') entra como uma máscara sobre as posições.
+"""
+# Importando as bibliotecas necessárias
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, CUISINE_SEPARATOR, dataset_version
+from fome_zero.shared import SharedRows, group_extremes, load_shared
+from fome_zero.distinct import DEFAULT_PRECISION, distinct_counts, group_codes
+from fome_zero.profiling import profiled
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def split_cuisines(values):
+	"""
+	Esta função separa os tipos de culinária de cada valor da coluna 'cuisine_list'.
+
+	Input: array de textos
+	Output: lista com a lista de tipos de cada valor
+	"""
+	return [value.split(CUISINE_SEPARATOR) if value else [] for value in values]
+
+def explode_cuisines(df):
+	"""
+	Esta função repete cada linha do dataframe uma vez por tipo de culinária da coluna 'cuisine_list', com o tipo na coluna 'cuisines'.
+	É a versão em dataframe do índice, usada nos candidatos do cálculo em lote ('fome_zero.metrics').
+
+	Input: dataframe com a coluna 'cuisine_list'
+	Output: dataframe sem a coluna 'cuisine_list', com um novo índice (0 a n-1)
+	"""
+	codes,uniques=pd.factorize(df['cuisine_list'])
+	labels=pd.Series(split_cuisines(uniques),dtype=object).to_numpy()
+	return df.drop(columns='cuisine_list').assign(cuisines=labels[codes]).explode('cuisines',ignore_index=True)
+
+class CuisineIndex:
+	"""
+	Pares (restaurante, culinária) do dataframe compartilhado, agrupados pela culinária: 'rows' são as posições dos restaurantes no
+	'SharedFrame', 'labels' os códigos das culinárias (a posição em 'cuisines', em ordem alfabética) e 'offsets' o início de cada culinária.
+	"""
+
+	def __init__(self,rows,labels,offsets,cuisines,n_rows):
+		self.rows=rows
+		self.labels=labels
+		self.offsets=offsets
+		self.cuisines=cuisines
+		self.n_rows=n_rows
+
+	@classmethod
+	def from_codes(cls,codes,combinations):
+		"""
+		Esta função monta o índice a partir dos códigos da coluna 'cuisine_list' de cada linha e das combinações distintas.
+
+		Input: array com o código da combinação de cada linha, array com o texto de cada combinação
+		Output: CuisineIndex
+		"""
+		split=split_cuisines(combinations)
+		lengths=np.array([len(labels) for labels in split],dtype='int64')
+		flat,cuisines=pd.factorize(np.array([label for labels in split for label in labels],dtype=object),sort=True)
+		starts=np.cumsum(lengths)-lengths
+		# Cada linha é repetida pelo número de culinárias da sua combinação, e 'within' é a posição da culinária dentro da combinação
+		counts=lengths[codes]
+		rows=np.repeat(np.arange(len(codes)),counts)
+		within=np.arange(counts.sum())-np.repeat(np.cumsum(counts)-counts,counts)
+		labels=flat[np.repeat(starts[codes],counts)+within]
+		# Ordenação estável: dentro de cada culinária as posições continuam em ordem crescente
+		order=np.argsort(labels,kind='stable')
+		offsets=np.r_[0,np.cumsum(np.bincount(labels,minlength=len(cuisines)))]
+		return cls(rows[order].astype('int32'),labels[order].astype('int32'),offsets,np.asarray(cuisines,dtype=object),len(codes))
+
+	@classmethod
+	def from_frame(cls,frame):
+		"""
+		Esta função monta o índice a partir do dataframe compartilhado.
+
+		Input: SharedFrame com a coluna 'cuisine_list'
+		Output: CuisineIndex
+		"""
+		return cls.from_codes(frame.arrays['cuisine_list'],frame.categories['cuisine_list'])
+
+	@property
+	def nbytes(self):
+		return self.rows.nbytes+self.labels.nbytes+self.offsets.nbytes
+
+	def entries(self,selection,cuisines=None):
+		"""
+		Esta função retorna os pares do índice que pertencem à seleção de linhas (e às culinárias informadas).
+
+		Input: SharedRows, lista de culinárias (opcional, None para todas)
+		Output: array de posições em 'rows' e 'labels'
+		"""
+		if selection.frame.n_rows!=self.n_rows:
+			raise ValueError('o índice de culinárias e a seleção vêm de versões diferentes dos dados')
+		selected=np.zeros(self.n_rows,dtype=bool)
+		selected[selection.positions]=True
+		keep=selected[self.rows]
+		if cuisines is not None:
+			keep&=np.isin(self.cuisines,list(cuisines))[self.labels]
+		return np.flatnonzero(keep)
+
+	def restaurants(self,selection,cuisine):
+		"""
+		Esta função retorna os restaurantes da seleção que têm o tipo de culinária na lista (em qualquer posição).
+
+		Input: SharedRows, tipo de culinária
+		Output: SharedRows (vazio para uma culinária desconhecida)
+		"""
+		code=np.searchsorted(self.cuisines,cuisine)
+		if code==len(self.cuisines) or self.cuisines[code]!=cuisine:
+			return SharedRows(selection.frame,np.empty(0,dtype='int32'),selection.columns)
+		rows=self.rows[self.offsets[code]:self.offsets[code+1]]
+		return SharedRows(selection.frame,np.intersect1d(rows,selection.positions,assume_unique=True),selection.columns)
+
+	@profiled()
+	def counts(self,selection):
+		"""
+		Esta função conta os restaurantes da seleção de cada tipo de culinária, em ordem decrescente (empates em ordem alfabética).
+
+		Input: SharedRows
+		Output: dataframe com as colunas 'cuisines' e 'restaurant_id' (número de restaurantes)
+		"""
+		counts=np.bincount(self.labels[self.entries(selection)],minlength=len(self.cuisines))
+		present=np.flatnonzero(counts)
+		order=present[np.lexsort((present,-counts[present]))]
+		return pd.DataFrame({'cuisines':self.cuisines[order],'restaurant_id':counts[order]})
+
+	@profiled()
+	def best_worst(self,selection,cuisines=None,value='aggregate_rating',tie='restaurant_id'):
+		"""
+		Esta função é o 'best_worst' do 'fome_zero.ranking' por tipo de culinária, considerando todas as culinárias de cada restaurante:
+		um restaurante 'Pizza, Italian' concorre em 'Pizza' e em 'Italian'.
+
+		Input: SharedRows (com as colunas 'value' e 'tie'), lista de culinárias desejadas (opcional), coluna do valor (opcional),
+			coluna de desempate (opcional)
+		Output: dict com as chaves 'maior' e 'menor', cada uma com um dataframe indexado pela culinária ('cuisines')
+		"""
+		entries=self.entries(selection,cuisines)
+		rows=self.rows[entries]
+		labels=self.labels[entries]
+		frame=selection.frame
+		extremes=group_extremes(labels,frame.arrays[value][rows],frame.arrays[tie][rows],len(self.cuisines))
+		result={}
+		for parameter,first in extremes.items():
+			aux=SharedRows(frame,rows[first],selection.columns).take()
+			result[parameter]=aux.assign(cuisines=self.cuisines[labels[first]]).set_index('cuisines')
+		return result
+
+	@profiled()
+	def diversity(self,selection,group='city',approx=False,precision=DEFAULT_PRECISION):
+		"""
+		Esta função conta os tipos de culinária distintos de cada grupo (por exemplo, de cada cidade), com o motor de 'fome_zero.distinct'.
+
+		Input: SharedRows, coluna ou lista de colunas do grupo (opcional), modo aproximado (opcional), precisão do HyperLogLog (opcional)
+		Output: dataframe com as colunas do grupo e 'cuisines' (número de tipos distintos), em ordem crescente dos grupos
+		"""
+		entries=self.entries(selection)
+		groups,n_groups,keys=group_codes(selection,group)
+		# Posição de cada linha do 'SharedFrame' dentro da seleção, para levar o grupo de cada linha aos pares do índice
+		relative=np.full(self.n_rows,-1,dtype='int64')
+		relative[selection.positions]=np.arange(len(selection.positions))
+		groups=groups[relative[self.rows[entries]]]
+		counts=distinct_counts(groups,self.labels[entries],n_groups,len(self.cuisines),approx,precision)
+		keys['cuisines']=counts
+		return keys.loc[counts>0].reset_index(drop=True)
+
+class CuisineRanking:
+	"""
+	Ranking de cada tipo de culinária, calculado uma única vez: as posições dos restaurantes de cada culinária do 'CuisineIndex' (com os
+	mesmos 'offsets'), ordenadas pela maior nota, depois pelo maior número de avaliações e pelo menor ID.
+	"""
+
+	def __init__(self,index,ranked):
+		self.index=index
+		self.ranked=ranked
+
+	@classmethod
+	@profiled()
+	def from_index(cls,index,frame):
+		"""
+		Esta função ordena os restaurantes de todas as culinárias do índice em uma única ordenação.
+
+		Input: CuisineIndex, SharedFrame com 'restaurant_id', 'aggregate_rating' e 'votes' (o mesmo do índice)
+		Output: CuisineRanking
+		"""
+		if frame.n_rows!=index.n_rows:
+			raise ValueError('o índice de culinárias e o dataframe vêm de versões diferentes dos dados')
+		rows=index.rows
+		order=np.lexsort((frame.arrays['restaurant_id'][rows],-frame.arrays['votes'][rows],-frame.arrays['aggregate_rating'][rows],index.labels))
+		return cls(index,rows[order])
+
+	@property
+	def nbytes(self):
+		return self.ranked.nbytes
+
+	@profiled()
+	def leaders(self,selection,cuisines,top_number=1,min_votes=0,parameter='maior'):
+		"""
+		Esta função retorna os primeiros (ou, com parameter='menor', os últimos) restaurantes do ranking de cada culinária, entre os
+		restaurantes da seleção com pelo menos 'min_votes' avaliações. Cada culinária é uma consulta ao seu trecho do ranking, sem ordenar.
+
+		Input: SharedRows (com 'votes'), lista de culinárias, quantidade de restaurantes por culinária (opcional), número mínimo de
+			avaliações (opcional), 'maior' ou 'menor' (opcional)
+		Output: dataframe com as colunas da seleção, 'cuisines' e 'position' (1 para o melhor ou o pior), na ordem das culinárias informadas
+		"""
+		frame=selection.frame
+		if frame.n_rows!=self.index.n_rows:
+			raise ValueError('o ranking de culinárias e a seleção vêm de versões diferentes dos dados')
+		eligible=np.zeros(frame.n_rows,dtype=bool)
+		eligible[selection.positions]=True
+		eligible&=frame.arrays['votes']>=min_votes
+		offsets=self.index.offsets
+		positions,labels,ranks=[],[],[]
+		for cuisine in dict.fromkeys(cuisines):
+			code=np.searchsorted(self.index.cuisines,cuisine)
+			if code==len(self.index.cuisines) or self.index.cuisines[code]!=cuisine:
+				continue
+			segment=self.ranked[offsets[code]:offsets[code+1]]
+			segment=segment[eligible[segment]]
+			leaders=segment[:top_number] if parameter=='maior' else segment[::-1][:top_number]
+			positions.append(leaders)
+			labels+=[cuisine]*len(leaders)
+			ranks.append(np.arange(1,len(leaders)+1))
+		positions=np.concatenate(positions) if positions else np.empty(0,dtype='int32')
+		ranks=np.concatenate(ranks) if ranks else np.empty(0,dtype='int64')
+		return SharedRows(frame,positions,selection.columns).take().assign(cuisines=labels,position=ranks)
+
+@st.cache_resource(max_entries=2,show_spinner=False)
+def _load_cuisine_index(path,mtime,version):
+	"""
+	Esta função monta o índice uma única vez por processo e por versão dos dados, a partir do 'SharedFrame' compartilhado.
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza
+	Output: CuisineIndex
+	"""
+	return CuisineIndex.from_frame(load_shared(path))
+
+def load_cuisine_index(path=DATASET_PATH):
+	"""
+	Esta função tem como objetivo carregar o índice de culinárias compartilhado por todas as sessões. As posições do índice são as do
+	'SharedFrame' de 'load_shared' (as mesmas para qualquer lista de colunas da página).
+
+	Input: caminho do arquivo (opcional)
+	Output: CuisineIndex
+	"""
+	mtime,version=dataset_version(path)
+	return _load_cuisine_index(path,mtime,version)
+
+@st.cache_resource(max_entries=2,show_spinner=False)
+def _load_cuisine_ranking(path,mtime,version):
+	"""
+	Esta função ordena o ranking de cada culinária uma única vez por processo e por versão dos dados.
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza
+	Output: CuisineRanking
+	"""
+	return CuisineRanking.from_index(load_cuisine_index(path),load_shared(path))
+
+def load_cuisine_ranking(path=DATASET_PATH):
+	"""
+	Esta função tem como objetivo carregar o ranking de cada culinária, compartilhado por todas as sessões.
+
+	Input: caminho do arquivo (opcional)
+	Output: CuisineRanking
+	"""
+	mtime,version=dataset_version(path)
+	return _load_cuisine_ranking(path,mtime,version)
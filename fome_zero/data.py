@@ -0,0 +1,284 @@
+# Importando as bibliotecas necessárias
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+import inflection
+
+from fome_zero.snapshot import read_snapshot, write_snapshot
+from fome_zero.profiling import profiled, stage
+
+
+# Caminho padrão do arquivo de dados, relativo à raiz do projeto
+DATASET_PATH=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),'dataset','zomato.csv')
+
+# Versão das regras de limpeza. Deve ser incrementada sempre que 'clean_data' mudar, para invalidar o cache.
+CLEAN_VERSION=2
+
+# Tabelas de conversão usadas na limpeza. Ficam no nível do módulo para serem aplicadas de uma vez sobre as colunas inteiras.
+COUNTRIES={
+	1: "India",
+	14: "Australia",
+	30: "Brazil",
+	37: "Canada",
+	94: "Indonesia",
+	148: "New Zeland",
+	162: "Philippines",
+	166: "Qatar",
+	184: "Singapure",
+	189: "South Africa",
+	191: "Sri Lanka",
+	208: "Turkey",
+	214: "United Arab Emirates",
+	215: "England",
+	216: "United States of America",
+}
+
+COLORS={
+	"3F7E00": "darkgreen",
+	"5BA829": "green",
+	"9ACD32": "lightgreen",
+	"CDD614": "orange",
+	"FFBA00": "red",
+	"CBCBC8": "darkred",
+	"FF7800": "darkred",
+}
+
+PRICE_TYPES={
+	1: 'cheap',
+	2: 'normal',
+	3: 'expensive',
+}
+PRICE_TYPE_DEFAULT='gourmet'
+
+# Colunas 0/1 que indicam se o restaurante oferece o serviço
+FLAG_COLUMNS=['has_table_booking','has_online_delivery','is_delivering_now','switch_to_order_menu']
+
+# Separador dos tipos de culinária na coluna 'cuisine_list' (o mesmo do CSV)
+CUISINE_SEPARATOR=', '
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def rename_columns(df):
+	"""
+	Esta função tem como objetivo renomear as colunas do dataframe, modificando elas para o modo Snake Case, ou seja, com letras minúsculas, separadas por '_'.
+
+	Input: dataframe a modificar(df)
+	Output: dataframe modificado (dataframe)
+	"""
+	dataframe=df.copy()
+	cols_old=dataframe.columns
+	spaces= lambda x: x.replace(" ","")
+	snakecase= lambda x: inflection.underscore(x)
+	title=lambda x: inflection.titleize(x)
+	cols_old=list(map(title,cols_old))
+	cols_old=list(map(spaces,cols_old))
+	cols_new=list(map(snakecase,cols_old))
+	dataframe.columns=cols_new
+	return dataframe
+
+def country_name(country_id):
+	"""
+	Esta função retorna o nome do país a partir do seu código.
+
+	Input: código numérico do país
+	Output: str (nome do país)
+	"""
+	return COUNTRIES[country_id]
+
+def create_price_type (price_range):
+	"""
+	Esta função tem como objetivo classificar os restaurantes a partir do valor do preço dos pratos.
+
+	Input: valor numérico
+	Output: string com a classificação
+	"""
+	return PRICE_TYPES.get(price_range,PRICE_TYPE_DEFAULT)
+
+def color_name(color_code):
+	"""
+	Esta função retorna o nome da cor a partir do seu código hexadecimal.
+
+	Input: código da cor
+	Output: str (nome da cor)
+	"""
+	return COLORS[color_code]
+
+@profiled()
+def derive_columns(df):
+	"""
+	Esta função cria as colunas derivadas do dataframe já renomeado, aplicando as tabelas de conversão sobre as colunas inteiras (sem laços em Python):
+	1. Nome dos países a partir da tabela 'COUNTRIES'
+	2. Categoria de preço a partir da tabela 'PRICE_TYPES'
+	3. Nome das cores a partir da tabela 'COLORS'
+	4. Apenas o primeiro tipo de culinária de cada restaurante ('cuisines'), usado no cubo e nos gráficos
+	5. A lista completa dos tipos de culinária ('cuisine_list'), sem espaços extras nem repetições, separados por 'CUISINE_SEPARATOR'
+	   (usada pelo índice de culinárias, 'fome_zero.cuisines')
+
+	Input: dataframe renomeado
+	Output: dataframe modificado
+	"""
+	df['country_name']=df['country_code'].map(COUNTRIES)
+	price_range=df['price_range'].to_numpy()
+	df['price_type']=np.select(
+		[price_range==code for code in PRICE_TYPES],
+		list(PRICE_TYPES.values()),
+		default=PRICE_TYPE_DEFAULT).astype(object)
+	df['rating_color']=df['rating_color'].map(COLORS)
+	# As combinações de culinária se repetem muito: o texto é separado apenas uma vez para cada valor distinto
+	codes,uniques=pd.factorize(df['cuisines'])
+	labels=[list(dict.fromkeys(label.strip() for label in value.split(',') if label.strip())) for value in uniques]
+	df['cuisine_list']=np.array([CUISINE_SEPARATOR.join(label) for label in labels],dtype=object).take(codes)
+	df['cuisines']=uniques.str.split(',',n=1).str[0].take(codes)
+	return df
+
+@profiled()
+def clean_data(df):
+	"""
+	Esta função tem como objetivo limpar o dataframe para que ele fique mais fácil de ser manipulado.
+
+	As seguintes etapas são realizadas:
+	1. Renomear todas as colunas a partir da função 'rename_columns'
+	2. Limpar os valores nulos
+	3. Remover os valores duplicados
+	4. Criar as colunas derivadas (nome do país, categoria de preço, nome da cor, o primeiro tipo de culinária e a lista completa) com a função 'derive_columns'
+	5. Ordenar o dataframe pelo número do ID dos restaurantes, para que o primeiro seja sempre o mais antigo (menor ID)
+
+	Input: dataframe
+	Output: dataframe modificado
+	"""
+	df=rename_columns(df)
+	df=df.dropna()
+	df=df.drop_duplicates(ignore_index=True)
+	df=derive_columns(df)
+	df=df.sort_values('restaurant_id',ascending=1).reset_index(drop=True)
+	return df
+
+@profiled()
+def compact_data(df,max_category_ratio=0.5):
+	"""
+	Esta função tem como objetivo reduzir a memória ocupada pelo dataframe limpo, sem alterar os seus valores:
+	1. Colunas de texto com poucos valores distintos (até 'max_category_ratio' do número de linhas) viram 'category'
+	2. As colunas 0/1 de 'FLAG_COLUMNS' viram uint8
+	3. As demais colunas inteiras são reduzidas para o menor tipo que comporta os valores
+	As colunas decimais (notas e coordenadas) continuam em float64: em float32 os valores mudariam (4.6 viraria 4.599999904).
+
+	Atenção: ao agrupar por uma coluna 'category', use 'observed=True' para que categorias sem restaurantes não apareçam no resultado.
+
+	Input: dataframe limpo, proporção máxima de valores distintos para virar categoria (opcional)
+	Output: dataframe compacto (cópia)
+	"""
+	df=df.copy()
+	for col in df.columns:
+		serie=df[col]
+		if col in FLAG_COLUMNS:
+			df[col]=serie.astype('uint8')
+		elif serie.dtype==object:
+			if serie.nunique()<=max_category_ratio*len(serie):
+				df[col]=serie.astype('category')
+		elif pd.api.types.is_integer_dtype(serie):
+			downcast='unsigned' if len(serie)>0 and serie.min()>=0 else 'integer'
+			df[col]=pd.to_numeric(serie,downcast=downcast)
+	return df
+
+def memory_report(df_before,df_after):
+	"""
+	Esta função compara a memória ocupada por cada coluna de dois dataframes, usando 'memory_usage(deep=True)'.
+
+	Input: dataframe original, dataframe compacto
+	Output: dataframe com a memória (em bytes) antes e depois de cada coluna, mais a linha 'total'
+	"""
+	report=pd.DataFrame({
+		'antes':df_before.memory_usage(deep=True,index=False),
+		'depois':df_after.memory_usage(deep=True,index=False),
+	})
+	report.loc['total']=report.sum()
+	report['reducao']=(1-report['depois']/report['antes']).round(3)
+	return report
+
+@profiled()
+def filter_countries(df,countries):
+	"""
+	Esta função filtra o dataframe pelos países selecionados no filtro da barra lateral.
+
+	Input: dataframe, lista de países
+	Output: dataframe filtrado (cópia)
+	"""
+	return df.loc[df['country_name'].isin(countries),:]
+
+def dataset_version(path=DATASET_PATH):
+	"""
+	Esta função retorna a versão atual dos dados: a data de modificação do arquivo e a versão da limpeza.
+	Deve fazer parte da chave de qualquer cache derivado do dataframe limpo, para que ele seja invalidado junto com os dados.
+
+	Input: caminho do arquivo (opcional)
+	Output: tupla (data de modificação em ns, versão da limpeza)
+	"""
+	return (os.stat(path).st_mtime_ns,CLEAN_VERSION)
+
+def build_snapshot(path=DATASET_PATH):
+	"""
+	Esta função lê e limpa o CSV e grava o resultado em um snapshot colunar ao lado dele (veja 'fome_zero.snapshot').
+	Deve ser executada a cada atualização do CSV, por exemplo no deploy: python -m fome_zero.snapshot
+
+	Input: caminho do CSV (opcional)
+	Output: str (caminho do snapshot)
+	"""
+	df=clean_data(pd.read_csv(path))
+	return write_snapshot(df,path,CLEAN_VERSION)
+
+@st.cache_resource(max_entries=16,show_spinner=False)
+def _load_clean_data(path,mtime,version,compact=False,columns=None):
+	"""
+	Esta função carrega o dataframe limpo uma única vez por processo. O resultado fica guardado no cache do Streamlit e é o mesmo objeto para todas as sessões.
+	Quando existe um snapshot atualizado, apenas as colunas pedidas são lidas dele; caso contrário o CSV é lido e limpo novamente.
+	Os parâmetros 'mtime' e 'version' fazem parte da chave do cache, para que ele seja invalidado quando o arquivo ou as regras de limpeza mudarem.
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza, usar o esquema compacto, tupla de colunas (None para todas)
+	Output: dataframe limpo
+	"""
+	columns=list(columns) if columns is not None else None
+	with stage('read_snapshot') as record:
+		df=read_snapshot(path,version,columns)
+		if record is not None and df is not None:
+			record['rows_out']=len(df)
+	if df is None:
+		with stage('read_csv') as record:
+			df_raw=pd.read_csv(path)
+			if record is not None:
+				record['rows_out']=len(df_raw)
+		df=clean_data(df_raw)
+		if columns is not None:
+			df=df.loc[:,columns]
+	if compact:
+		df=compact_data(df)
+	return df
+
+def load_data(path=DATASET_PATH,compact=False,columns=None):
+	"""
+	Esta função tem como objetivo carregar o dataframe limpo que é compartilhado por todas as páginas.
+	O arquivo só é lido novamente quando a sua data de modificação muda ou quando 'CLEAN_VERSION' é incrementada.
+
+	O dataframe retornado é compartilhado entre todas as sessões e não deve ser modificado. Filtros como 'df.loc[...]' criam uma cópia e podem ser usados normalmente.
+	Com 'compact=True' o dataframe passa pela função 'compact_data' antes de ir para o cache.
+	Com 'columns' apenas as colunas informadas são carregadas, o que reduz o tempo de leitura do snapshot.
+
+	Input: caminho do arquivo (opcional), usar o esquema compacto (opcional), lista de colunas (opcional)
+	Output: dataframe limpo
+	"""
+	mtime,version=dataset_version(path)
+	columns=tuple(columns) if columns is not None else None
+	return _load_clean_data(path,mtime,version,compact,columns)
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+if __name__=='__main__':
+	# Relatório de memória do esquema compacto: python -m fome_zero.data
+	df=clean_data(pd.read_csv(DATASET_PATH))
+	report=memory_report(df,compact_data(df))
+	print(report.to_string())
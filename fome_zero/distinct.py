@@ -0,0 +1,169 @@
+"""
+Contagem de valores distintos por grupo ('nunique'), exata ou aproximada.
+
+As colunas são tratadas como códigos inteiros (os códigos do 'SharedFrame' ou os de 'pd.factorize'), e cada par (grupo, valor) vira
+um único inteiro:
+	- modo exato: os pares são marcados em um bitmap de 'n_grupos × n_valores' (uma única passada, sem ordenar) ou, quando o bitmap
+	  passaria de 'EXACT_BITMAP_LIMIT', contados depois de um 'np.unique';
+	- modo aproximado ('approx=True'): um HyperLogLog por grupo, com 2**precision registradores de um byte. A memória depende apenas do
+	  número de grupos e da precisão (o erro padrão é cerca de 1.04/sqrt(2**precision), 1.6% com a precisão padrão), e os registradores
+	  de partes disjuntas dos dados podem ser combinados ('hll_merge'), desde que os valores usem os mesmos códigos.
+
+O motor serve para qualquer contagem distinta das páginas: tipos de culinária por cidade ('CuisineIndex.diversity'), localidades por
+cidade, culinárias por país...
+"""
+# Importando as bibliotecas necessárias
+import numpy as np
+import pandas as pd
+
+from fome_zero.shared import SharedRows
+from fome_zero.profiling import profiled
+
+
+# Precisão padrão do HyperLogLog (2**12 registradores por grupo). Entre 11 e 16, para que o restante do hash caiba no float64 sem arredondar.
+DEFAULT_PRECISION=12
+
+# Maior bitmap (número de pares grupo × valor) usado no modo exato. Acima dele, os pares distintos são ordenados.
+EXACT_BITMAP_LIMIT=2**24
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def _hash64(values):
+	"""
+	Esta função embaralha os códigos inteiros em hashes de 64 bits (o 'splitmix64'), para que os bits do hash sejam uniformes.
+
+	Input: array de inteiros
+	Output: array de uint64
+	"""
+	with np.errstate(over='ignore'):
+		x=values.astype('uint64')+np.uint64(0x9E3779B97F4A7C15)
+		x=(x^(x>>np.uint64(30)))*np.uint64(0xBF58476D1CE4E5B9)
+		x=(x^(x>>np.uint64(27)))*np.uint64(0x94D049BB133111EB)
+		return x^(x>>np.uint64(31))
+
+def hll_registers(groups,values,n_groups,precision=DEFAULT_PRECISION):
+	"""
+	Esta função monta os registradores do HyperLogLog de cada grupo.
+
+	Input: array com o código do grupo de cada linha, array com o código do valor de cada linha, número de grupos, precisão (opcional)
+	Output: array uint8 com uma linha de 2**precision registradores por grupo
+	"""
+	if not 11<=precision<=16:
+		raise ValueError('a precisão do HyperLogLog deve estar entre 11 e 16')
+	size=1<<precision
+	bits=64-precision
+	registers=np.zeros(n_groups*size,dtype='uint8')
+	if len(values)==0:
+		return registers.reshape(n_groups,size)
+	hashes=_hash64(np.asarray(values))
+	# Os primeiros bits escolhem o registrador, e o registrador guarda a maior posição do primeiro bit 1 do restante do hash
+	# ('frexp' retorna o número de bits do restante, exato porque ele tem no máximo 53 bits)
+	_,length=np.frexp((hashes&np.uint64((1<<bits)-1)).astype('float64'))
+	rank=(bits+1-length).astype('uint8')
+	flat=np.asarray(groups,dtype='int64')*size+(hashes>>np.uint64(bits)).astype('int64')
+	# Gravando as posições em ordem crescente, o último valor gravado em cada registrador é o maior (sem 'np.maximum.at')
+	order=np.argsort(rank,kind='stable')
+	ranks=rank[order]
+	starts=np.flatnonzero(np.r_[True,ranks[1:]!=ranks[:-1]])
+	for start,end in zip(starts,np.r_[starts[1:],len(order)]):
+		registers[flat[order[start:end]]]=ranks[start]
+	return registers.reshape(n_groups,size)
+
+def hll_merge(registers):
+	"""
+	Esta função combina os registradores de vários grupos (ou de partes disjuntas dos dados) em um único HyperLogLog.
+
+	Input: array uint8 com uma linha de registradores por grupo
+	Output: array uint8 com uma única linha de registradores
+	"""
+	return registers.max(axis=0,keepdims=True)
+
+def hll_estimate(registers):
+	"""
+	Esta função estima o número de valores distintos de cada linha de registradores (com a correção para poucos valores).
+
+	Input: array uint8 com uma linha de registradores por grupo
+	Output: array float64 com a estimativa de cada grupo
+	"""
+	size=registers.shape[1]
+	alpha=0.7213/(1+1.079/size)
+	estimate=alpha*size**2/np.exp2(-registers.astype('float64')).sum(axis=1)
+	zeros=(registers==0).sum(axis=1)
+	# Poucos valores: contagem linear pelos registradores vazios
+	small=(estimate<=2.5*size)&(zeros>0)
+	estimate[small]=size*np.log(size/zeros[small])
+	return estimate
+
+def distinct_counts(groups,values,n_groups,n_values=None,approx=False,precision=DEFAULT_PRECISION):
+	"""
+	Esta função conta os valores distintos de cada grupo a partir dos códigos inteiros.
+
+	Input: array com o código do grupo de cada linha (de 0 a 'n_groups'-1), array com o código do valor de cada linha, número de grupos,
+		número de valores (opcional, o maior código mais 1), modo aproximado (opcional), precisão do HyperLogLog (opcional)
+	Output: array int64 com a contagem de cada grupo
+	"""
+	if approx:
+		return np.rint(hll_estimate(hll_registers(groups,values,n_groups,precision))).astype('int64')
+	groups=np.asarray(groups,dtype='int64')
+	values=np.asarray(values,dtype='int64')
+	if n_values is None:
+		n_values=int(values.max())+1 if len(values) else 0
+	if n_groups*n_values<=EXACT_BITMAP_LIMIT:
+		seen=np.zeros(n_groups*n_values,dtype=bool)
+		seen[groups*n_values+values]=True
+		return seen.reshape(n_groups,n_values).sum(axis=1)
+	pairs=np.unique(groups*n_values+values)
+	return np.bincount(pairs//n_values,minlength=n_groups)
+
+def column_codes(df,column):
+	"""
+	Esta função retorna os códigos inteiros de uma coluna e os valores distintos (em ordem crescente).
+
+	Input: dataframe (ou SharedRows), nome da coluna
+	Output: tupla (array de códigos, array de valores distintos)
+	"""
+	if isinstance(df,SharedRows):
+		if column in df.frame.categories:
+			return df.values(column),df.frame.categories[column]
+		values=df.values(column)
+	else:
+		values=df[column]
+	codes,uniques=pd.factorize(values,sort=True)
+	return codes,np.asarray(uniques)
+
+def group_codes(df,by):
+	"""
+	Esta função numera os grupos formados pelas colunas 'by' (um código por combinação de valores presente nas linhas).
+
+	Input: dataframe (ou SharedRows), coluna ou lista de colunas
+	Output: tupla (array com o código do grupo de cada linha, número de grupos, dataframe com os valores de cada grupo, em ordem crescente)
+	"""
+	by_list=by if isinstance(by,list) else [by]
+	columns=[column_codes(df,col) for col in by_list]
+	if len(columns)==1:
+		codes,uniques=columns[0]
+		return codes,len(uniques),pd.DataFrame({by_list[0]:uniques})
+	key=np.zeros(len(df),dtype='int64')
+	for codes,uniques in columns:
+		key=key*len(uniques)+codes
+	keys,first,inverse=np.unique(key,return_index=True,return_inverse=True)
+	values=pd.DataFrame({col:uniques[codes[first]] for col,(codes,uniques) in zip(by_list,columns)})
+	return inverse,len(keys),values
+
+@profiled()
+def nunique(df,by,column,approx=False,precision=DEFAULT_PRECISION):
+	"""
+	Esta função conta os valores distintos da coluna 'column' em cada grupo de 'by' (como 'df.groupby(by)[column].nunique()').
+
+	Input: dataframe (ou SharedRows), coluna ou lista de colunas do grupo, coluna contada, modo aproximado (opcional), precisão do
+		HyperLogLog (opcional)
+	Output: dataframe com as colunas de 'by' e a coluna 'column' (número de valores distintos), em ordem crescente dos grupos
+	"""
+	groups,n_groups,keys=group_codes(df,by)
+	values,uniques=column_codes(df,column)
+	counts=distinct_counts(groups,values,n_groups,len(uniques),approx,precision)
+	keys[column]=counts
+	return keys.loc[counts>0].reset_index(drop=True)
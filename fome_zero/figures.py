@@ -0,0 +1,150 @@
+"""
+Cache das figuras do Plotly já montadas.
+
+Montar uma figura com o Plotly Express e toda a customização do layout custa dezenas de milissegundos, mesmo quando os dados do gráfico
+são uma tabela pequena do cubo. O 'FigureCache' guarda a figura pronta, com a chave (gráfico, seleção de países, parâmetros como o
+'top_number'): um gráfico já visto é enviado com 'st.plotly_chart' sem montar nem validar a figura de novo (o Streamlit só valida
+figuras recebidas como dict). As figuras guardadas são compartilhadas entre as sessões e não devem ser modificadas.
+
+O cache é um 'SelectionCache' (LRU limitado em bytes, pelo tamanho do JSON de cada figura) por versão dos dados, compartilhado por
+todas as sessões do processo. Com a variável de ambiente FOME_ZERO_FIGURE_DIR, as figuras também são gravadas em disco em JSON (uma
+pasta por versão dos dados), de modo que sobrevivem a reinícios do servidor e são compartilhadas entre processos.
+"""
+# Importando as bibliotecas necessárias
+import hashlib
+import json
+import os
+import shutil
+
+import plotly.io
+import plotly.utils
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, dataset_version
+from fome_zero.memo import SelectionCache, selection_key
+
+
+# Limite padrão de memória do cache de figuras, em MB. Pode ser alterado pela variável de ambiente FOME_ZERO_FIGURE_MB.
+DEFAULT_MAX_MB=32
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def figure_json(figure):
+	"""
+	Esta função serializa a figura como o Streamlit faz antes de enviá-la ao navegador (usada para gravar em disco e medir as figuras).
+
+	Input: figura do Plotly
+	Output: str (JSON)
+	"""
+	return json.dumps(figure.to_dict(),cls=plotly.utils.PlotlyJSONEncoder)
+
+def version_id(version):
+	"""
+	Esta função retorna um identificador curto da versão dos dados, usado no nome da pasta das figuras em disco.
+
+	Input: versão dos dados (tupla de 'dataset_version')
+	Output: str
+	"""
+	return hashlib.sha1(repr(version).encode()).hexdigest()[:12]
+
+class FigureCache(SelectionCache):
+	"""
+	Cache LRU (limitado em bytes) das figuras, com gravação opcional em disco.
+	"""
+
+	def __init__(self,max_bytes=DEFAULT_MAX_MB*2**20,folder=None):
+		super().__init__(max_bytes)
+		self.folder=folder
+		self.disk_hits=0
+		if folder is not None:
+			os.makedirs(folder,exist_ok=True)
+
+	def _path(self,key):
+		name=hashlib.sha1(repr((sorted(key[0]),)+key[1:]).encode()).hexdigest()
+		return os.path.join(self.folder,name+'.json')
+
+	def _load_or_render(self,key,func,args,kwargs):
+		"""
+		Esta função lê a figura do disco (quando a gravação em disco está ativa) ou monta a figura, gravando-a em seguida.
+
+		Input: chave do cache, função que monta a figura e seus argumentos
+		Output: figura do Plotly
+		"""
+		path=self._path(key) if self.folder is not None else None
+		if path is not None and os.path.exists(path):
+			with open(path,encoding='utf-8') as file:
+				spec=file.read()
+			with self._lock:
+				self.disk_hits+=1
+			return plotly.io.from_json(spec)
+		figure=func(*args,**kwargs)
+		if path is not None:
+			spec=figure_json(figure)
+			# Arquivo temporário e renomeação, para que outros processos nunca leiam uma figura pela metade
+			tmp_path=f'{path}.{os.getpid()}.tmp'
+			with open(tmp_path,'w',encoding='utf-8') as file:
+				file.write(spec)
+			os.replace(tmp_path,path)
+		return figure
+
+	def _sizeof(self,figure):
+		"""
+		Esta função estima a memória ocupada por uma figura pelo tamanho do seu JSON (a figura em si guarda os mesmos dados).
+
+		Input: figura do Plotly
+		Output: int (bytes)
+		"""
+		return len(figure_json(figure))
+
+	def get_or_render(self,chart,selection,func,*args,**kwargs):
+		"""
+		Esta função retorna a figura para o gráfico e a seleção de países, montando a figura apenas na primeira vez.
+
+		Input: identificação do gráfico (str ou tupla com o nome e os parâmetros, por exemplo ('city_cuisine',10)), lista de países,
+			função que monta a figura e seus argumentos
+		Output: figura do Plotly
+		"""
+		chart=chart if isinstance(chart,tuple) else (chart,)
+		key=selection_key(selection,'figure')+chart
+		return self.get_or_compute(key,self._load_or_render,key,func,args,kwargs)
+
+	def stats(self):
+		"""
+		Esta função retorna os contadores do cache, incluindo as figuras lidas do disco.
+		"""
+		stats=super().stats()
+		with self._lock:
+			stats['leituras_disco']=self.disk_hits
+		return stats
+
+@st.cache_resource(max_entries=2,show_spinner=False)
+def _figure_cache(version,max_bytes,folder):
+	"""
+	Esta função cria o cache de figuras do processo, um por versão dos dados. As pastas de versões anteriores são removidas do disco.
+
+	Input: versão dos dados, limite de memória em bytes, pasta das figuras em disco (ou None)
+	Output: FigureCache
+	"""
+	if folder is None:
+		return FigureCache(max_bytes)
+	current=version_id(version)
+	if os.path.isdir(folder):
+		for name in os.listdir(folder):
+			if name!=current:
+				shutil.rmtree(os.path.join(folder,name),ignore_errors=True)
+	return FigureCache(max_bytes,os.path.join(folder,current))
+
+def get_figure_cache(path=DATASET_PATH):
+	"""
+	Esta função tem como objetivo retornar o cache de figuras compartilhado por todas as sessões do processo.
+	O limite de memória vem da variável de ambiente FOME_ZERO_FIGURE_MB (padrão: 'DEFAULT_MAX_MB') e a pasta em disco, opcional,
+	da variável FOME_ZERO_FIGURE_DIR.
+
+	Input: caminho do arquivo (opcional)
+	Output: FigureCache
+	"""
+	max_bytes=int(float(os.environ.get('FOME_ZERO_FIGURE_MB',DEFAULT_MAX_MB))*2**20)
+	return _figure_cache(dataset_version(path),max_bytes,os.environ.get('FOME_ZERO_FIGURE_DIR') or None)
@@ -0,0 +1,237 @@
+"""
+Índice espacial e agrupamento dos restaurantes para o mapa da página Visão Geral.
+
+Os pontos ficam ordenados pela célula de uma grade regular de latitude/longitude ('GridIndex'), de modo que a consulta de uma área
+visível do mapa lê apenas as células que a cobrem. Os pontos visíveis são então agrupados em células do tamanho de alguns pixels
+de tela para o nível de zoom atual ('cluster_cells'): em zoom baixo cada célula representa a densidade de restaurantes da região,
+em zoom alto cada célula tem um único restaurante. Apenas as células não vazias são enviadas ao navegador, em uma única camada GeoJSON.
+"""
+# Importando as bibliotecas necessárias
+import numpy as np
+import folium
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, load_data, dataset_version
+from fome_zero.profiling import profiled
+
+
+# Colunas do dataframe limpo usadas no mapa
+GEO_COLUMNS=['restaurant_id','restaurant_name','city','country_name','latitude','longitude']
+
+# Tamanho (em graus) das células do índice espacial
+INDEX_CELL_SIZE=1.0
+
+# Tamanho aproximado, em pixels de tela, de cada célula de agrupamento (os tiles do mapa têm 256 pixels)
+CLUSTER_PIXELS=48
+TILE_PIXELS=256
+
+# A partir deste zoom os restaurantes são mostrados individualmente, sem agrupamento
+MAX_CLUSTER_ZOOM=16
+
+# Área visível usada antes da primeira interação com o mapa (o mundo inteiro)
+WORLD_BOUNDS=(-90.0,-180.0,90.0,180.0)
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+class GridIndex:
+	"""
+	Índice espacial em grade regular: os pontos são ordenados pelo identificador da célula (linha*colunas+coluna), e cada
+	linha da grade ocupa um trecho contíguo do vetor ordenado, localizado com busca binária.
+	"""
+
+	def __init__(self,latitude,longitude,cell_size=INDEX_CELL_SIZE):
+		self.latitude=np.asarray(latitude,dtype='float64')
+		self.longitude=np.asarray(longitude,dtype='float64')
+		self.cell_size=cell_size
+		self.n_rows=int(np.ceil(180/cell_size))
+		self.n_cols=int(np.ceil(360/cell_size))
+		cell_id=self._row(self.latitude)*self.n_cols+self._col(self.longitude)
+		self.order=np.argsort(cell_id,kind='stable')
+		self.sorted_ids=cell_id[self.order]
+
+	# 'np.minimum'/'np.maximum' em vez de 'np.clip', que é bem mais lento para os valores escalares das consultas
+	def _row(self,latitude):
+		return np.minimum(np.maximum(np.floor((np.asarray(latitude)+90)/self.cell_size).astype('int64'),0),self.n_rows-1)
+
+	def _col(self,longitude):
+		return np.minimum(np.maximum(np.floor((np.asarray(longitude)+180)/self.cell_size).astype('int64'),0),self.n_cols-1)
+
+	def _ranges(self,rows,col_start,col_end):
+		"""
+		Esta função retorna as posições (no vetor ordenado) dos pontos das células [col_start, col_end] de cada linha da grade.
+		"""
+		starts=np.searchsorted(self.sorted_ids,rows*self.n_cols+col_start,side='left')
+		ends=np.searchsorted(self.sorted_ids,rows*self.n_cols+col_end,side='right')
+		lengths=ends-starts
+		if lengths.sum()==0:
+			return np.empty(0,dtype='int64')
+		# Concatena os intervalos [start, end) sem laço em Python
+		offsets=np.repeat(starts-np.concatenate([[0],np.cumsum(lengths)[:-1]]),lengths)
+		return np.arange(lengths.sum())+offsets
+
+	def query(self,south,west,north,east):
+		"""
+		Esta função retorna as posições dos pontos dentro da área informada. Quando 'west' é maior que 'east' a área atravessa o antimeridiano.
+
+		Input: latitude sul, longitude oeste, latitude norte, longitude leste
+		Output: array com as posições dos pontos (em ordem crescente)
+		"""
+		rows=np.arange(self._row(south),self._row(north)+1)
+		if west<=east:
+			positions=self._ranges(rows,self._col(west),self._col(east))
+		else:
+			positions=np.concatenate([self._ranges(rows,self._col(west),self.n_cols-1),self._ranges(rows,0,self._col(east))])
+		points=self.order[positions]
+		lat=self.latitude[points]
+		lon=self.longitude[points]
+		inside=(lat>=south)&(lat<=north)
+		if west<=east:
+			inside&=(lon>=west)&(lon<=east)
+		else:
+			inside&=(lon>=west)|(lon<=east)
+		return np.sort(points[inside])
+
+def normalize_bounds(bounds):
+	"""
+	Esta função converte a área visível devolvida pelo mapa (dict do Leaflet com '_southWest' e '_northEast') em uma tupla (sul, oeste, norte, leste),
+	com as longitudes no intervalo [-180, 180]. Quando a área não é conhecida, retorna o mundo inteiro.
+
+	Input: dict com a área visível (ou None)
+	Output: tupla (sul, oeste, norte, leste)
+	"""
+	try:
+		south=float(bounds['_southWest']['lat'])
+		west=float(bounds['_southWest']['lng'])
+		north=float(bounds['_northEast']['lat'])
+		east=float(bounds['_northEast']['lng'])
+	except (TypeError,KeyError,ValueError):
+		return WORLD_BOUNDS
+	south,north=max(south,-90.0),min(north,90.0)
+	if east-west>=360:
+		return (south,-180.0,north,180.0)
+	west=(west+180)%360-180
+	east=(east+180)%360-180
+	return (south,west,north,east)
+
+def cluster_size(zoom):
+	"""
+	Esta função retorna o tamanho, em graus, das células de agrupamento para um nível de zoom do mapa.
+
+	Input: nível de zoom
+	Output: float (graus)
+	"""
+	return 360/(2**zoom)*CLUSTER_PIXELS/TILE_PIXELS
+
+@profiled()
+def cluster_cells(latitude,longitude,zoom):
+	"""
+	Esta função agrupa os pontos em células de 'CLUSTER_PIXELS' pixels para o zoom informado, com operações vetorizadas.
+	A partir de 'MAX_CLUSTER_ZOOM' cada ponto forma a sua própria célula.
+
+	Input: arrays de latitude e longitude, nível de zoom
+	Output: dict com arrays 'latitude' e 'longitude' (centroide de cada célula), 'count' (pontos na célula), 'first' (posição do primeiro ponto da célula) e 'inverse' (célula de cada ponto)
+	"""
+	latitude=np.asarray(latitude,dtype='float64')
+	longitude=np.asarray(longitude,dtype='float64')
+	if zoom>=MAX_CLUSTER_ZOOM:
+		keys=np.arange(len(latitude))
+	else:
+		size=cluster_size(zoom)
+		n_cols=int(np.ceil(360/size))+1
+		keys=np.floor((latitude+90)/size).astype('int64')*n_cols+np.floor((longitude+180)/size).astype('int64')
+	_,first,inverse,count=np.unique(keys,return_index=True,return_inverse=True,return_counts=True)
+	return {
+		'latitude':np.bincount(inverse,weights=latitude)/count,
+		'longitude':np.bincount(inverse,weights=longitude)/count,
+		'count':count,
+		'first':first,
+		'inverse':inverse,
+	}
+
+@profiled()
+def cells_layer(df,cells,name='Restaurantes'):
+	"""
+	Esta função monta a camada do mapa com uma feição GeoJSON por célula não vazia: o raio cresce com a quantidade de restaurantes,
+	e células com um único restaurante mostram o seu nome, cidade e país.
+
+	Input: dataframe com 'GEO_COLUMNS' dos pontos agrupados, células retornadas por 'cluster_cells', nome da camada (opcional)
+	Output: folium.FeatureGroup
+	"""
+	first=cells['first']
+	count=cells['count']
+	labels=(df['restaurant_name'].to_numpy()[first].astype(object)+' - '
+			+df['city'].to_numpy()[first].astype(object)+' ('
+			+df['country_name'].to_numpy()[first].astype(object)+')')
+	labels=np.where(count>1,[f'{n} restaurantes' for n in count],labels)
+	radius=np.round(5+3*np.log2(count),1)
+	features=[
+		{
+			'type':'Feature',
+			'geometry':{'type':'Point','coordinates':[lon,lat]},
+			'properties':{'label':label,'count':int(n),'radius':r},
+		}
+		for lat,lon,label,n,r in zip(cells['latitude'],cells['longitude'],labels,count,radius)
+	]
+	layer=folium.FeatureGroup(name=name)
+	folium.GeoJson(
+		{'type':'FeatureCollection','features':features},
+		marker=folium.CircleMarker(radius=5,fill=True,fill_opacity=0.7,weight=1),
+		style_function=lambda feature: {
+			'radius':feature['properties']['radius'],
+			'color':'darkred' if feature['properties']['count']>1 else 'blue',
+			'fillColor':'red' if feature['properties']['count']>1 else 'blue',
+		},
+		tooltip=folium.GeoJsonTooltip(fields=['label'],labels=False),
+	).add_to(layer)
+	return layer
+
+@profiled()
+def visible_points(index,df,selection,bounds):
+	"""
+	Esta função retorna as posições dos restaurantes dos países selecionados que estão dentro da área visível do mapa.
+
+	Input: índice espacial (GridIndex), dataframe com 'GEO_COLUMNS', lista de países, tupla (sul, oeste, norte, leste)
+	Output: array com as posições dos restaurantes
+	"""
+	positions=index.query(*bounds)
+	in_selection=df['country_name'].to_numpy()[positions]
+	return positions[np.isin(in_selection,list(selection))]
+
+@profiled()
+def central_spot(geo_df,index,selection,bounds,zoom):
+	"""
+	Esta função retorna a camada do mapa com os restaurantes dos países selecionados que estão na área visível do mapa.
+	Os restaurantes visíveis são encontrados pelo índice espacial e agrupados em células de acordo com o zoom: em zoom baixo cada círculo mostra a densidade de restaurantes da região e, ao aproximar, os restaurantes aparecem individualmente.
+
+	Input: dataframe com as coordenadas, índice espacial, lista de países, área visível (sul, oeste, norte, leste), nível de zoom
+	Output: camada do mapa (folium.FeatureGroup)
+	"""
+	positions=visible_points(index,geo_df,selection,bounds)
+	latitude=geo_df['latitude'].to_numpy()[positions]
+	longitude=geo_df['longitude'].to_numpy()[positions]
+	cells=cluster_cells(latitude,longitude,zoom)
+	return cells_layer(geo_df.iloc[positions],cells)
+
+@st.cache_resource(max_entries=4,show_spinner=False)
+def _load_geo(path,mtime,version):
+	"""
+	Esta função monta o índice espacial uma única vez por processo e por versão dos dados.
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza
+	Output: tupla (dataframe com 'GEO_COLUMNS', GridIndex)
+	"""
+	df=load_data(path,columns=GEO_COLUMNS)
+	return df,GridIndex(df['latitude'],df['longitude'])
+
+def load_geo(path=DATASET_PATH):
+	"""
+	Esta função tem como objetivo carregar os pontos do mapa e o seu índice espacial, compartilhados por todas as sessões.
+
+	Input: caminho do arquivo (opcional)
+	Output: tupla (dataframe com 'GEO_COLUMNS', GridIndex)
+	"""
+	mtime,version=dataset_version(path)
+	return _load_geo(path,mtime,version)
@@ -0,0 +1,139 @@
+"""
+Indicadores do cabeçalho da Visão Geral (restaurantes, países, cidades, total de avaliações e tipos de culinária).
+
+Os indicadores eram cinco 'nunique' sobre o dataframe inteiro a cada execução da página, ignorando o filtro de países (e o total de
+avaliações era o número de valores distintos da coluna 'votes', e não a soma). O 'HeaderTotals' guarda os totais de cada país,
+calculados uma única vez por processo e por versão dos dados, e cada execução apenas combina as linhas dos países selecionados:
+	- restaurantes, cidades e avaliações são somados (cada restaurante e cada cidade pertencem a um único país);
+	- os tipos de culinária não se somam (a mesma culinária aparece em vários países): no modo exato, cada país guarda a presença de
+	  cada culinária e a seleção conta as culinárias presentes em algum país; no modo aproximado, cada país guarda um HyperLogLog
+	  ('fome_zero.distinct') e os da seleção são combinados.
+No modo aproximado, restaurantes e cidades também vêm dos HyperLogLogs dos países, sem supor que cada um pertence a um único país.
+
+O modo é escolhido pela variável de ambiente FOME_ZERO_HEADER_APPROX (1 para o modo aproximado).
+"""
+# Importando as bibliotecas necessárias
+import os
+
+import numpy as np
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, dataset_version
+from fome_zero.shared import load_shared
+from fome_zero.cuisines import load_cuisine_index
+from fome_zero.distinct import DEFAULT_PRECISION, distinct_counts, hll_registers, hll_merge, hll_estimate
+from fome_zero.profiling import profiled
+
+
+# Colunas do 'SharedFrame' usadas nos totais (as mesmas da Visão Geral, para compartilhar o mesmo objeto)
+HEADER_COLUMNS=['restaurant_id','country_name','city','votes','cuisine_list']
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+class HeaderTotals:
+	"""
+	Totais de cada país (na ordem de 'countries'): restaurantes, avaliações e cidades, a presença de cada culinária e os HyperLogLogs
+	de restaurantes, cidades e culinárias.
+	"""
+
+	def __init__(self,countries,restaurants,votes,cities,cuisines,sketches):
+		self.countries=countries
+		self.restaurants=restaurants
+		self.votes=votes
+		self.cities=cities
+		self.cuisines=cuisines
+		self.sketches=sketches
+
+	@classmethod
+	@profiled()
+	def from_rows(cls,rows,cuisine_index,precision=DEFAULT_PRECISION):
+		"""
+		Esta função calcula os totais de cada país a partir das linhas do dataframe compartilhado.
+
+		Input: SharedRows (com 'HEADER_COLUMNS'), índice de culinárias, precisão do HyperLogLog (opcional)
+		Output: HeaderTotals
+		"""
+		frame=rows.frame
+		countries=frame.categories['country_name']
+		size=len(countries)
+		country=rows.values('country_name')
+		ids=rows.values('restaurant_id')
+		city=rows.values('city')
+		# Culinárias: o país de cada par (restaurante, culinária) do índice
+		entries=cuisine_index.entries(rows)
+		entry_country=frame.arrays['country_name'][cuisine_index.rows[entries]]
+		labels=cuisine_index.labels[entries]
+		cuisines=np.zeros((size,len(cuisine_index.cuisines)),dtype=bool)
+		cuisines[entry_country,labels]=True
+		_,id_codes=np.unique(ids,return_inverse=True)
+		sketches={
+			'restaurantes':hll_registers(country,id_codes,size,precision),
+			# A cidade é identificada junto com o país, como nas contagens distintas por cidade
+			'cidades':hll_registers(country,country.astype('int64')*len(frame.categories['city'])+city,size,precision),
+			'culinarias':hll_registers(entry_country,labels,size,precision),
+		}
+		return cls(
+			countries,
+			distinct_counts(country,id_codes,size),
+			np.bincount(country,weights=rows.values('votes'),minlength=size).round().astype('int64'),
+			distinct_counts(country,city,size,len(frame.categories['city'])),
+			cuisines,
+			sketches)
+
+	@property
+	def nbytes(self):
+		return self.cuisines.nbytes+sum(sketch.nbytes for sketch in self.sketches.values())
+
+	def _estimate(self,name,wanted):
+		return int(round(hll_estimate(hll_merge(self.sketches[name][wanted]))[0]))
+
+	def totals(self,selection,approx=False):
+		"""
+		Esta função retorna os indicadores do cabeçalho para a seleção de países, combinando apenas as linhas dos países selecionados.
+
+		Input: lista de países, modo aproximado (opcional)
+		Output: dict com as chaves 'restaurantes', 'paises', 'cidades', 'avaliacoes' e 'culinarias'
+		"""
+		wanted=np.isin(self.countries,list(selection))&(self.restaurants>0)
+		if not wanted.any():
+			return {'restaurantes':0,'paises':0,'cidades':0,'avaliacoes':0,'culinarias':0}
+		totals={'paises':int(wanted.sum()),'avaliacoes':int(self.votes[wanted].sum())}
+		if approx:
+			totals.update({name:self._estimate(name,wanted) for name in ('restaurantes','cidades','culinarias')})
+		else:
+			totals.update({
+				'restaurantes':int(self.restaurants[wanted].sum()),
+				'cidades':int(self.cities[wanted].sum()),
+				'culinarias':int(self.cuisines[wanted].any(axis=0).sum()),
+			})
+		return totals
+
+def approx_enabled():
+	"""
+	Esta função indica se os indicadores do cabeçalho usam o modo aproximado (variável de ambiente FOME_ZERO_HEADER_APPROX).
+	"""
+	return os.environ.get('FOME_ZERO_HEADER_APPROX','0').lower() in ('1','true','sim')
+
+@st.cache_resource(max_entries=2,show_spinner=False)
+def _load_header_totals(path,mtime,version):
+	"""
+	Esta função calcula os totais por país uma única vez por processo e por versão dos dados.
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza
+	Output: HeaderTotals
+	"""
+	frame=load_shared(path,HEADER_COLUMNS)
+	return HeaderTotals.from_rows(frame.all_rows(),load_cuisine_index(path))
+
+def load_header_totals(path=DATASET_PATH):
+	"""
+	Esta função tem como objetivo carregar os totais por país do cabeçalho da Visão Geral, compartilhados por todas as sessões.
+
+	Input: caminho do arquivo (opcional)
+	Output: HeaderTotals
+	"""
+	mtime,version=dataset_version(path)
+	return _load_header_totals(path,mtime,version)
@@ -0,0 +1,168 @@
+"""
+Memorização dos resultados que dependem apenas da seleção de países (e de outros parâmetros dos filtros).
+
+Os resultados ficam em um cache LRU compartilhado pelo processo, limitado em bytes, com contadores de acertos e falhas.
+Assim, mudar um widget que não altera a seleção (por exemplo o 'top_number' da página de cidades) não refaz o filtro nem os agrupamentos.
+"""
+# Importando as bibliotecas necessárias
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, dataset_version
+
+
+# Limite padrão de memória do cache, em MB. Pode ser alterado pela variável de ambiente FOME_ZERO_MEMO_MB.
+DEFAULT_MAX_MB=64
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def selection_key(selection,*params):
+	"""
+	Esta função monta a chave do cache a partir da seleção de países (sem importar a ordem) e dos demais parâmetros.
+
+	Input: lista de países selecionados, demais parâmetros (devem ser 'hashable')
+	Output: tupla (chave do cache)
+	"""
+	return (frozenset(selection),)+params
+
+def sizeof(value):
+	"""
+	Esta função estima a memória ocupada por um valor guardado no cache, em bytes.
+
+	Input: valor (dataframe, série, array ou outro objeto)
+	Output: int (bytes)
+	"""
+	if isinstance(value,pd.DataFrame):
+		return int(value.memory_usage(deep=True).sum())
+	if isinstance(value,pd.Series):
+		return int(value.memory_usage(deep=True))
+	if isinstance(value,(tuple,list)):
+		return sys.getsizeof(value)+sum(sizeof(item) for item in value)
+	# Arrays do NumPy e seleções do dataframe compartilhado ('SharedRows') informam o próprio tamanho
+	if hasattr(value,'nbytes'):
+		return sys.getsizeof(value)+int(value.nbytes)
+	return sys.getsizeof(value)
+
+class SelectionCache:
+	"""
+	Cache LRU limitado em bytes e seguro para várias sessões (threads) ao mesmo tempo.
+
+	Os valores guardados são compartilhados entre as sessões e não devem ser modificados.
+	"""
+
+	def __init__(self,max_bytes=DEFAULT_MAX_MB*2**20):
+		self.max_bytes=max_bytes
+		self.current_bytes=0
+		self.hits=0
+		self.misses=0
+		self.evictions=0
+		self._entries=OrderedDict()
+		self._lock=threading.Lock()
+
+	def get_or_compute(self,key,func,*args,**kwargs):
+		"""
+		Esta função retorna o valor guardado para a chave ou, se ele não existir, calcula 'func(*args,**kwargs)' e guarda o resultado.
+		O cálculo é feito fora do lock, para que sessões com chaves diferentes não esperem umas pelas outras.
+
+		Input: chave, função e seus argumentos
+		Output: valor
+		"""
+		with self._lock:
+			if key in self._entries:
+				self._entries.move_to_end(key)
+				self.hits+=1
+				return self._entries[key][0]
+			self.misses+=1
+		value=func(*args,**kwargs)
+		self._store(key,value)
+		return value
+
+	def _store(self,key,value):
+		"""
+		Esta função guarda um valor e remove os menos usados recentemente até que o cache volte a caber no limite de memória.
+		Valores maiores do que o próprio limite não são guardados.
+
+		Input: chave, valor
+		Output: None
+		"""
+		size=self._sizeof(value)
+		if size>self.max_bytes:
+			return
+		with self._lock:
+			if key in self._entries:
+				self.current_bytes-=self._entries.pop(key)[1]
+			self._entries[key]=(value,size)
+			self.current_bytes+=size
+			while self.current_bytes>self.max_bytes:
+				_,(_,old_size)=self._entries.popitem(last=False)
+				self.current_bytes-=old_size
+				self.evictions+=1
+
+	def _sizeof(self,value):
+		"""
+		Esta função estima a memória ocupada por um valor guardado no cache (veja 'sizeof'). Caches de outros tipos de valor podem substituí-la.
+
+		Input: valor
+		Output: int (bytes)
+		"""
+		return sizeof(value)
+
+	def clear(self):
+		"""
+		Esta função esvazia o cache e zera os contadores.
+
+		Input: None
+		Output: None
+		"""
+		with self._lock:
+			self._entries.clear()
+			self.current_bytes=0
+			self.hits=self.misses=self.evictions=0
+
+	def stats(self):
+		"""
+		Esta função retorna os contadores do cache, para o painel de depuração.
+
+		Input: None
+		Output: dict
+		"""
+		with self._lock:
+			total=self.hits+self.misses
+			return {
+				'entradas':len(self._entries),
+				'memoria_mb':round(self.current_bytes/2**20,2),
+				'limite_mb':round(self.max_bytes/2**20,2),
+				'acertos':self.hits,
+				'falhas':self.misses,
+				'taxa_de_acerto':round(self.hits/total,3) if total else 0.0,
+				'remocoes':self.evictions,
+			}
+
+@st.cache_resource(max_entries=2,show_spinner=False)
+def _selection_cache(version,max_bytes):
+	"""
+	Esta função cria o cache de seleções do processo. Há uma instância por versão dos dados, de modo que resultados antigos não são reaproveitados quando o CSV muda.
+
+	Input: versão dos dados, limite de memória em bytes
+	Output: SelectionCache
+	"""
+	return SelectionCache(max_bytes)
+
+def get_selection_cache(path=DATASET_PATH):
+	"""
+	Esta função tem como objetivo retornar o cache de seleções compartilhado por todas as sessões do processo.
+	O limite de memória vem da variável de ambiente FOME_ZERO_MEMO_MB (padrão: 'DEFAULT_MAX_MB').
+
+	Input: caminho do arquivo (opcional)
+	Output: SelectionCache
+	"""
+	max_bytes=int(float(os.environ.get('FOME_ZERO_MEMO_MB',DEFAULT_MAX_MB))*2**20)
+	return _selection_cache(dataset_version(path),max_bytes)
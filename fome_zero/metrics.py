@@ -0,0 +1,703 @@
+"""
+Camada de cálculo das métricas do dashboard, sem Streamlit e sem gráficos.
+
+As funções de métrica recebem um recorte dos dados e retornam apenas valores (str) ou dataframes: tudo o que as páginas mostram em
+'st.metric' e 'st.dataframe', e os dados de cada gráfico do 'fome_zero.charts'. Elas aceitam dois tipos de recorte:
+	- 'CubeView' (fome_zero.cube), usado pelas páginas para a seleção de países de cada sessão;
+	- 'SelectionView', usado no cálculo em lote ('batch_metrics'), em que muitas seleções compartilham os mesmos agregados por país.
+
+No cálculo em lote, cada agregado é calculado uma única vez por país ('SharedAggregates') e cada seleção apenas soma os agregados
+dos seus países. Os restaurantes que podem aparecer nas tabelas (os melhores de cada país e de cada culinária) também são separados
+uma única vez. Assim o custo de cada seleção depende do número de grupos, e não do número de restaurantes.
+
+Uso (snapshots noturnos): python -m fome_zero.metrics dataset/metrics [--max-size 2] [--selections selecoes.json]
+"""
+# Importando as bibliotecas necessárias
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import threading
+
+import pandas as pd
+
+from fome_zero.data import DATASET_PATH, load_data, dataset_version
+from fome_zero.cube import FLAG_DIMENSIONS, load_cube, rollup, flag_rollup
+from fome_zero.profiling import profiled
+from fome_zero.ranking import top_k, best_worst
+from fome_zero.shared import SharedRows
+from fome_zero.cuisines import explode_cuisines
+from fome_zero.distinct import nunique
+
+
+# Rótulos usados nos gráficos para as colunas 0/1
+YES_NO={0:'Não',1:'Sim'}
+
+# Tipos de culinária mostrados nos indicadores de melhores e piores restaurantes
+CUISINES=['Italian','American','Arabian','Japanese','Home-made']
+
+# Número mínimo de avaliações padrão do ranking de culinárias (restaurantes com poucas avaliações têm notas pouco confiáveis)
+LEADERBOARD_MIN_VOTES=10
+
+# Maior ranking mostrado nas páginas (o limite do slider da página de cidades)
+RANK_LIMIT=100
+
+# Colunas do dataframe limpo usadas pelas métricas de restaurantes e culinárias
+RESTAURANT_COLUMNS=['restaurant_id','restaurant_name','country_name','cuisines','votes','aggregate_rating']
+
+# Colunas usadas para separar os restaurantes candidatos do cálculo em lote (a lista completa de culinárias entra nos melhores e
+# piores e nas culinárias distintas por cidade)
+CANDIDATE_COLUMNS=RESTAURANT_COLUMNS+['city','cuisine_list']
+
+# Colunas que indicam os serviços de cada restaurante, nos gráficos por país e por cidade
+SERVICES={'delivery':'has_online_delivery','booking':'has_table_booking'}
+CITY_SERVICES=['has_table_booking','has_online_delivery','is_delivering_now']
+
+
+# =====================================================
+# VISÃO PAÍSES
+# =====================================================
+
+def first_value(df,col,default='Sem restaurantes'):
+	"""
+	Esta função retorna o valor da coluna 'col' na primeira linha do dataframe, ou 'default' quando o dataframe está vazio
+	(por exemplo, um país sem restaurantes que fazem entrega).
+
+	Input: dataframe, coluna, valor padrão (opcional)
+	Output: valor da primeira linha
+	"""
+	if df.empty:
+		return default
+	return df[col].iloc[0]
+
+@profiled()
+def rating_country(view,parameter):
+	"""
+	Esta função retorna o país com a maior avaliação ou o país com a menor avaliação média.
+
+	Input: recorte (view), parameter (maior ou menor)
+	Output: str (nome do país)
+	"""
+
+	aux=view.rollup('country_name')
+	aux=aux.assign(aggregate_rating=aux['aggregate_rating_mean'].round(2))
+
+
+	if parameter == 'maior':
+		# Ordenar do maior para o menor a partir da nota média e mostrar o primeiro país
+		country=first_value(top_k(aux,1,'aggregate_rating',tie='country_name'),'country_name')
+		return (country)
+	elif parameter == 'menor':
+		country=first_value(top_k(aux,1,'aggregate_rating',ascending=True,tie='country_name'),'country_name')
+		return (country)
+	else:
+		return ('Parâmetro inválido')
+
+@profiled()
+def country_votes(view):
+	"""
+	Esta função retorna a quantidade média de avaliações registradas por país, em ordem decrescente.
+
+	Input: recorte (view)
+	Output: dataframe com as colunas 'country_name' e 'votes'
+	"""
+	aux=view.rollup('country_name')
+	aux=aux.assign(votes=aux['votes_mean'].round(2)).loc[:,['country_name','votes']]
+	return aux.sort_values('votes',ascending=0).reset_index(drop=True)
+
+@profiled()
+def flag_rankings(view,by,top_number=None,flags=FLAG_DIMENSIONS):
+	"""
+	Esta função retorna, para cada serviço, os grupos (cidades, países...) com mais restaurantes que oferecem o serviço, em ordem
+	decrescente (empates desfeitos pelo nome do grupo). Os serviços são contados juntos, em um único agrupamento ('flag_rollup'),
+	e os grupos sem nenhum restaurante com o serviço ficam de fora.
+
+	Input: recorte (view), dimensão dos grupos, quantidade de grupos (opcional, None para todos), lista de serviços (opcional)
+	Output: dict {serviço: dataframe com as colunas da dimensão e 'restaurant_id' (número de restaurantes)}
+	"""
+	aux=view.flag_rollup(by)
+	rankings={}
+	for flag in flags:
+		ranking=aux.loc[aux[flag]>0,[by,flag]].rename(columns={flag:'restaurant_id'})
+		rankings[flag]=top_k(ranking,len(ranking) if top_number is None else top_number,'restaurant_id',tie=by).reset_index(drop=True)
+	return rankings
+
+@profiled()
+def country_services(view,aux='delivery'):
+	"""
+	Esta função retorna o número de restaurantes por país que fazem entrega ('delivery') ou reserva de mesa ('booking'), em ordem decrescente.
+
+	Input: recorte (view), aux ('delivery' ou 'booking')
+	Output: dataframe com as colunas 'country_name' e 'restaurant_id' (número de restaurantes)
+	"""
+	return flag_rankings(view,'country_name',flags=[SERVICES[aux]])[SERVICES[aux]]
+
+
+# =====================================================
+# VISÃO CIDADES
+# =====================================================
+
+@profiled()
+def top_city(view):
+	"""
+	Esta função retorna a cidade com mais restaurantes registrados.
+
+	Input: recorte (view)
+	Output: str (nome da cidade)
+	"""
+	return first_value(top_k(view.rollup('city'),1,'count',tie='city'),'city')
+
+@profiled()
+def rating_city(view,parameter,top_number=10):
+	"""
+	Esta função retorna as cidades com mais restaurantes com nota acima de 4 e mais restaurantes com nota abaixo de 2,5.
+	A quantidade de cidades mostradas nas tabelas depende do filtro acionado pelo usuário ('top_number').
+
+	Input: recorte (view), parameter (melhor ou pior), quantidade de cidades
+	Output: dataframe (cidades e quantidade de restaurantes com nota acima de 4 ou nota abaixo de 2,5)
+	"""
+
+	if parameter == 'melhor':
+		city_high_rating=view.rollup('city',rating_band='alta').loc[:,['city','count']].rename(columns={'count':'restaurant_id'})
+		city_high_rating=top_k(city_high_rating,top_number,'restaurant_id',tie='city').reset_index(drop=True)
+		city_high_rating.columns=['Cidades','Quantidade de Restaurantes']
+		return(city_high_rating)
+	elif parameter == 'pior':
+		city_low_rating=view.rollup('city',rating_band='baixa').loc[:,['city','count']].rename(columns={'count':'restaurant_id'})
+		city_low_rating=top_k(city_low_rating,top_number,'restaurant_id',tie='city').reset_index(drop=True)
+		city_low_rating.columns=['Cidades','Quantidade de Restaurantes']
+		return(city_low_rating)
+	else:
+		return ('Parâmetro inválido')
+
+@profiled()
+def city_diversity(rows,cuisine_index,approx=False):
+	"""
+	Esta função conta os tipos de culinária distintos de cada cidade da seleção, considerando todas as culinárias de cada restaurante.
+	As cidades são agrupadas junto com o país, de modo que a contagem de uma cidade não depende dos outros países selecionados.
+
+	Input: seleção de linhas (SharedRows), índice de culinárias, modo aproximado (opcional, HyperLogLog)
+	Output: dataframe com as colunas 'country_name', 'city' e 'cuisines' (número de tipos distintos)
+	"""
+	return cuisine_index.diversity(rows,['country_name','city'],approx)
+
+@profiled()
+def city_localities(rows,approx=False):
+	"""
+	Esta função conta as localidades (bairros) distintas de cada cidade da seleção.
+
+	Input: seleção de linhas (SharedRows ou dataframe com 'country_name', 'city' e 'locality'), modo aproximado (opcional)
+	Output: dataframe com as colunas 'country_name', 'city' e 'locality' (número de localidades distintas)
+	"""
+	return nunique(rows,['country_name','city'],'locality',approx)
+
+@profiled()
+def country_cuisines(rows,cuisine_index,approx=False):
+	"""
+	Esta função conta os tipos de culinária distintos de cada país da seleção, considerando todas as culinárias de cada restaurante.
+
+	Input: seleção de linhas (SharedRows), índice de culinárias, modo aproximado (opcional)
+	Output: dataframe com as colunas 'country_name' e 'cuisines' (número de tipos distintos)
+	"""
+	return cuisine_index.diversity(rows,'country_name',approx)
+
+@profiled()
+def city_cuisines(cities,top_number=10):
+	"""
+	Esta função retorna as cidades com mais tipos de culinária distintos, em ordem decrescente (empates pelo nome da cidade).
+
+	Input: culinárias distintas por cidade da seleção ('city_diversity'), quantidade de cidades
+	Output: dataframe com as colunas 'city', 'country_name' e 'cuisines'
+	"""
+	city_cuisine=cities.loc[:,['city','country_name','cuisines']]
+	return top_k(city_cuisine,top_number,'cuisines',tie='city').reset_index(drop=True)
+
+@profiled()
+def city_services(view,flag,top_number=10):
+	"""
+	Esta função retorna as cidades com mais restaurantes que atendem à categoria informada ('has_table_booking', 'has_online_delivery' ou 'is_delivering_now').
+
+	Input: recorte (view), coluna da categoria, quantidade de cidades
+	Output: dataframe com as colunas 'city' e 'restaurant_id' (número de restaurantes)
+	"""
+	return flag_rankings(view,'city',top_number,flags=[flag])[flag]
+
+
+# =====================================================
+# VISÃO RESTAURANTES
+# =====================================================
+
+@profiled()
+def delivery_summary(view):
+	"""
+	Esta função retorna, para os restaurantes que fazem e que não fazem entrega online, a média de avaliações registradas e a nota média.
+
+	Input: recorte (view)
+	Output: dataframe com as colunas 'has_online_delivery' ('Sim'/'Não'), 'votes' e 'aggregate_rating'
+	"""
+	aux=view.flag_rollup('has_online_delivery').rename(columns={'votes_mean':'votes','aggregate_rating_mean':'aggregate_rating'})
+	aux=aux.loc[:,['has_online_delivery','votes','aggregate_rating']]
+	# Modificando os valores das variáveis para tornar mais visual
+	aux['has_online_delivery']=aux['has_online_delivery'].map(YES_NO)
+	return aux
+
+@profiled()
+def delivery_booking(view):
+	"""
+	Esta função retorna o número de restaurantes que fazem reserva de mesa, separados entre os que fazem e os que não fazem entrega online.
+
+	Input: recorte (view)
+	Output: dataframe com as colunas 'has_online_delivery' ('Sim'/'Não') e 'restaurant_name' (número de restaurantes)
+	"""
+	# Restaurantes que fazem reserva de mesa, contados no mesmo agrupamento do 'delivery_summary'
+	aux=view.flag_rollup('has_online_delivery').rename(columns={'has_table_booking':'restaurant_name'})
+	aux=aux.loc[aux['restaurant_name']>0,['has_online_delivery','restaurant_name']]
+	aux['has_online_delivery']=aux['has_online_delivery'].map(YES_NO)
+	return aux.reset_index(drop=True)
+
+@profiled()
+def top_rated_restaurants(df,top_number=10):
+	"""
+	Esta função retorna os restaurantes com as maiores notas médias (empates desfeitos pelo restaurante mais antigo).
+
+	Input: dataframe (ou SharedRows) com 'restaurant_id', 'restaurant_name' e 'aggregate_rating', quantidade de restaurantes
+	Output: dataframe com as colunas 'Nome do Restaurante' e 'Nota média'
+	"""
+	aux=top_k(df[['restaurant_id','restaurant_name','aggregate_rating']],top_number,'aggregate_rating').reset_index(drop=True)
+	aux.columns=['ID do Restaurante','Nome do Restaurante','Nota média']
+	return aux.iloc[:,1:]
+
+@profiled()
+def most_voted_restaurants(df,top_number=10):
+	"""
+	Esta função retorna os restaurantes (agrupados pelo nome) com mais avaliações registradas.
+
+	Input: dataframe (ou SharedRows) com 'restaurant_name' e 'votes', quantidade de restaurantes
+	Output: dataframe com as colunas 'Nome do Restaurante' e 'Nº de avaliações'
+	"""
+	if isinstance(df,SharedRows):
+		aux=df.group_sum('restaurant_name','votes')
+	else:
+		aux=df.loc[:,['restaurant_name','votes']].groupby('restaurant_name').sum().reset_index()
+	aux=top_k(aux,top_number,'votes',tie='restaurant_name').reset_index(drop=True)
+	aux.columns=['Nome do Restaurante','Nº de avaliações']
+	return aux
+
+
+# =====================================================
+# VISÃO TIPOS CULINÁRIOS
+# =====================================================
+
+@profiled()
+def best_worse_restaurant(ranking,cuisine,parameter):
+	"""
+	Esta função tem como objetivo retornar o nome do restaurante que possui a maior nota média ou a pior nota média de acordo com o tipo de culinária desejado.
+	O melhor e o pior restaurante de todas as culinárias são calculados de uma só vez (empates são desfeitos pelo restaurante mais antigo), considerando todas as culinárias de cada restaurante; aqui é feita apenas a consulta.
+
+	Input:
+		ranking = resultado de 'best_worst' por culinária ('CuisineIndex.best_worst' ou, no cálculo em lote, 'best_worst' dos candidatos)
+		cuisine = tipo de culinária ('Italian','Japanese', 'American', 'Brazilian',etc)
+		parameter = 'maior' ou 'menor' de acordo com a maior nota ou menor nota
+	Output: str (nome do restaurante)
+	"""
+	aux=ranking[parameter]
+	if cuisine not in aux.index:
+		return ('Sem restaurantes')
+	return (aux.loc[cuisine,'restaurant_name'])
+
+@profiled()
+def cuisine_leaderboard(ranking,df,cuisines,top_number=1,min_votes=LEADERBOARD_MIN_VOTES,parameter='maior'):
+	"""
+	Esta função retorna os melhores (ou os piores) restaurantes de cada tipo de culinária escolhido, a partir do ranking já ordenado de
+	cada culinária (maior nota, depois mais avaliações, depois o restaurante mais antigo), considerando todas as culinárias de cada restaurante.
+
+	Input:
+		ranking = ranking de cada culinária (CuisineRanking)
+		df = SharedRows com 'restaurant_name', 'country_name', 'aggregate_rating' e 'votes'
+		cuisines = lista de tipos de culinária
+		top_number = quantidade de restaurantes por culinária
+		min_votes = número mínimo de avaliações do restaurante
+		parameter = 'maior' ou 'menor' de acordo com os melhores ou os piores restaurantes
+	Output: dataframe com as colunas 'Tipo de culinária', 'Posição', 'Nome do Restaurante', 'País', 'Nota média' e 'Nº de avaliações'
+	"""
+	aux=ranking.leaders(df,cuisines,top_number,min_votes,parameter)
+	aux=aux[['cuisines','position','restaurant_name','country_name','aggregate_rating','votes']].reset_index(drop=True)
+	aux.columns=['Tipo de culinária','Posição','Nome do Restaurante','País','Nota média','Nº de avaliações']
+	return aux
+
+@profiled()
+def top_rated_cuisine(df):
+	"""
+	Esta função retorna o tipo de culinária do restaurante com a maior nota média.
+
+	Input: dataframe (ou SharedRows) com 'restaurant_id', 'cuisines' e 'aggregate_rating'
+	Output: str (tipo de culinária)
+	"""
+	return first_value(top_k(df,1,'aggregate_rating'),'cuisines')
+
+@profiled()
+def top_delivering_cuisine(view):
+	"""
+	Esta função retorna o tipo de culinária com mais restaurantes que aceitam pedido online e estão fazendo entregas.
+
+	Input: recorte (view)
+	Output: str (tipo de culinária)
+	"""
+	aux=view.rollup('cuisines',is_delivering_now=1,has_online_delivery=1).rename(columns={'count':'has_online_delivery'})
+	return first_value(top_k(aux,1,'has_online_delivery',tie='cuisines'),'cuisines')
+
+
+# =====================================================
+# VISÃO CUSTOS
+# =====================================================
+
+# Nomes das colunas das tabelas de custos mostradas na página
+COST_LABELS={
+	'country_name':'País','city':'Cidade','cuisines':'Tipo de culinária','price_type':'Categoria de preço',
+	'restaurants':'Restaurantes','mean':'Média','p10':'P10','p25':'P25','p50':'Mediana','p75':'P75','p90':'P90',
+}
+
+@profiled()
+def cost_distribution(costs,dim,selection,currency,top_number=None):
+	"""
+	Esta função retorna a distribuição do custo médio para dois por grupo, em ordem decrescente da mediana (empates pelo nome do grupo).
+
+	Input: distribuições do custo (CostTables), dimensão ('country_name', 'city', 'cuisines' ou 'price_type'), lista de países,
+		código ISO da moeda, quantidade de grupos (opcional, None para todos)
+	Output: dataframe com as colunas do grupo, 'restaurants', 'mean' e os quantis ('p10' a 'p90')
+	"""
+	aux=costs.table(dim,selection,currency)
+	return top_k(aux,len(aux) if top_number is None else top_number,'p50',tie=dim).reset_index(drop=True)
+
+@profiled()
+def cost_ranking(costs,dim,selection,currency,top_number=None):
+	"""
+	Esta função retorna a tabela da página com a distribuição do custo por grupo ('cost_distribution'), com os valores arredondados.
+
+	Input: distribuições do custo (CostTables), dimensão, lista de países, código ISO da moeda, quantidade de grupos (opcional)
+	Output: dataframe com as colunas em português
+	"""
+	return cost_distribution(costs,dim,selection,currency,top_number).round(2).rename(columns=COST_LABELS)
+
+@profiled()
+def cost_summary(costs,selection,currency):
+	"""
+	Esta função retorna os indicadores de custo de todos os restaurantes da seleção.
+
+	Input: distribuições do custo (CostTables), lista de países, código ISO da moeda
+	Output: dict com 'restaurants', 'mean' e os quantis ('p10' a 'p90'); os valores são None quando a seleção não tem custos
+	"""
+	return costs.summary(selection,currency)
+
+
+# =====================================================
+# CÁLCULO EM LOTE
+# =====================================================
+
+def _top_rated(df):
+	ranked=df.sort_values(['aggregate_rating','restaurant_id'],ascending=[False,True],kind='mergesort')
+	return ranked.groupby('country_name',observed=True,sort=False).head(RANK_LIMIT).loc[:,RESTAURANT_COLUMNS]
+
+def _votes(df):
+	return df.groupby(['country_name','restaurant_name'],observed=True)['votes'].sum().reset_index()
+
+def _extremes(df):
+	# Um restaurante concorre em todas as suas culinárias; os candidatos já separados (sem 'cuisine_list') têm uma culinária por linha
+	if 'cuisine_list' in df.columns:
+		df=explode_cuisines(df)
+	extremes=best_worst(df,['country_name','cuisines'])
+	return (pd.concat([extremes['maior'],extremes['menor']]).reset_index()
+				.drop_duplicates(['restaurant_id','cuisines']).loc[:,RESTAURANT_COLUMNS])
+
+def _cuisine_pairs(df):
+	if 'cuisine_list' in df.columns:
+		df=explode_cuisines(df.loc[:,['country_name','city','cuisine_list']])
+	return df.loc[:,['country_name','city','cuisines']].drop_duplicates(ignore_index=True)
+
+def restaurant_candidates(df):
+	"""
+	Esta função separa, do dataframe limpo, os restaurantes que podem aparecer nas tabelas de alguma seleção de países:
+		- 'top_rated': os 'RANK_LIMIT' restaurantes com as maiores notas de cada país;
+		- 'votes': a soma das avaliações por país e nome de restaurante;
+		- 'extremes': o melhor e o pior restaurante de cada país e culinária (considerando todas as culinárias de 'cuisine_list',
+		  com uma linha por restaurante e culinária);
+		- 'cuisine_pairs': os pares distintos (país, cidade, culinária), de onde saem as culinárias distintas por cidade.
+	O melhor (ou os k melhores) de uma seleção está sempre entre os melhores dos seus países, então os resultados das tabelas são exatos.
+
+	Input: dataframe limpo com 'CANDIDATE_COLUMNS'
+	Output: dict com os quatro dataframes
+	"""
+	df=df.loc[:,CANDIDATE_COLUMNS]
+	return {'top_rated':_top_rated(df),'votes':_votes(df),'extremes':_extremes(df),'cuisine_pairs':_cuisine_pairs(df)}
+
+def merge_candidates(parts):
+	"""
+	Esta função combina os candidatos de partes disjuntas dos dados (por exemplo blocos do CSV) nos candidatos do conjunto.
+
+	Input: lista de dicts retornados por 'restaurant_candidates'
+	Output: dict com os quatro dataframes
+	"""
+	return {
+		'top_rated':_top_rated(pd.concat([part['top_rated'] for part in parts],ignore_index=True)),
+		'votes':_votes(pd.concat([part['votes'] for part in parts],ignore_index=True)),
+		'extremes':_extremes(pd.concat([part['extremes'] for part in parts],ignore_index=True)),
+		'cuisine_pairs':_cuisine_pairs(pd.concat([part['cuisine_pairs'] for part in parts],ignore_index=True)),
+	}
+
+class SharedAggregates:
+	"""
+	Agregados por país compartilhados por todas as seleções de um lote: os agregados do cubo por país e dimensões (calculados na primeira
+	vez que são pedidos) e os restaurantes candidatos das tabelas ('restaurant_candidates'), separados uma única vez.
+	Pode ser montado a partir do dataframe limpo ('df') ou de candidatos já calculados ('candidates'), como na leitura em blocos do 'fome_zero.stream'.
+	"""
+
+	def __init__(self,cube,df=None,candidates=None):
+		self.cube=cube
+		self.countries=list(cube['country_name'].unique())
+		self._partials={}
+		self._lock=threading.Lock()
+		if candidates is None:
+			candidates=restaurant_candidates(df)
+		self.top_rated=candidates['top_rated']
+		self.votes=candidates['votes']
+		self.extremes=candidates['extremes']
+		# Culinárias distintas por país e cidade: cada cidade é contada dentro do seu país, então a seleção só filtra as linhas
+		self.cities=nunique(candidates['cuisine_pairs'],['country_name','city'],'cuisines')
+
+	def partial(self,dims):
+		"""
+		Esta função retorna o cubo agregado por país e pelas dimensões informadas, calculado uma única vez por lote.
+
+		Input: tupla de dimensões
+		Output: dataframe agregado (compartilhado, não modificar)
+		"""
+		with self._lock:
+			if dims not in self._partials:
+				self._partials[dims]=rollup(self.cube,['country_name']+[dim for dim in dims if dim!='country_name'])
+			return self._partials[dims]
+
+	def view(self,selection):
+		"""
+		Esta função retorna o recorte de uma seleção de países.
+
+		Input: lista de países
+		Output: SelectionView
+		"""
+		return SelectionView(self,selection)
+
+class SelectionView:
+	"""
+	Recorte de uma seleção de países em um lote. Tem a mesma interface 'rollup' do 'CubeView', mas agrega os agregados por país
+	do 'SharedAggregates' em vez do cubo, e expõe os restaurantes candidatos das tabelas da seleção.
+	"""
+
+	def __init__(self,shared,selection):
+		self.shared=shared
+		self.selection=frozenset(selection)
+		self._rollups={}
+
+	def _select(self,df):
+		return df.loc[df['country_name'].isin(list(self.selection))]
+
+	def rollup(self,by,**where):
+		"""
+		Esta função agrega a seleção pelas dimensões informadas, depois de filtrá-la pelas condições de igualdade passadas como argumentos nomeados.
+
+		Input: dimensão ou lista de dimensões, condições (opcional, por exemplo rating_band='alta')
+		Output: dataframe agregado
+		"""
+		by_list=by if isinstance(by,list) else [by]
+		key=(tuple(by_list),tuple(sorted(where.items())))
+		if key not in self._rollups:
+			aux=self._select(self.shared.partial(tuple(by_list)+tuple(sorted(where))))
+			for col,value in where.items():
+				aux=aux.loc[aux[col]==value]
+			self._rollups[key]=rollup(aux,by)
+		return self._rollups[key]
+
+	def flag_rollup(self,by):
+		"""
+		Esta função retorna o 'flag_rollup' da seleção (os restaurantes com cada serviço por grupo), a partir dos agregados por país e serviços.
+
+		Input: dimensão ou lista de dimensões
+		Output: dataframe agregado
+		"""
+		by_list=by if isinstance(by,list) else [by]
+		key=('flag_rollup',tuple(by_list))
+		if key not in self._rollups:
+			aux=self._select(self.shared.partial(tuple(dict.fromkeys(by_list+FLAG_DIMENSIONS))))
+			self._rollups[key]=flag_rollup(aux,by)
+		return self._rollups[key]
+
+	@property
+	def top_rated(self):
+		return self._select(self.shared.top_rated)
+
+	@property
+	def votes(self):
+		return self._select(self.shared.votes)
+
+	@property
+	def extremes(self):
+		return self._select(self.shared.extremes)
+
+	@property
+	def cities(self):
+		return self._select(self.shared.cities)
+
+@profiled()
+def dashboard_metrics(view,top_number=10):
+	"""
+	Esta função calcula todas as métricas e os dados de todos os gráficos das páginas para uma seleção de países.
+
+	Input: recorte da seleção (SelectionView), quantidade de cidades nos rankings
+	Output: dict com uma chave por página ('paises', 'cidades', 'restaurantes', 'culinarias'), cada uma com um dict de valores e dataframes
+	"""
+	ranking=best_worst(view.extremes,'cuisines',CUISINES)
+	return {
+		'paises':{
+			'maior_nota':rating_country(view,'maior'),
+			'menor_nota':rating_country(view,'menor'),
+			'avaliacoes_medias':country_votes(view),
+			'entregas':country_services(view,'delivery'),
+			'reservas':country_services(view,'booking'),
+		},
+		'cidades':{
+			'mais_restaurantes':top_city(view),
+			'notas_altas':rating_city(view,'melhor',top_number),
+			'notas_baixas':rating_city(view,'pior',top_number),
+			'culinarias':city_cuisines(view.cities,top_number),
+			**flag_rankings(view,'city',top_number,CITY_SERVICES),
+		},
+		'restaurantes':{
+			'entrega':delivery_summary(view),
+			'entrega_reserva':delivery_booking(view),
+			'mais_bem_avaliados':top_rated_restaurants(view.top_rated,10),
+			'mais_avaliados':most_voted_restaurants(view.votes,10),
+		},
+		'culinarias':{
+			'melhores':{cuisine:best_worse_restaurant(ranking,cuisine,'maior') for cuisine in CUISINES},
+			'piores':{cuisine:best_worse_restaurant(ranking,cuisine,'menor') for cuisine in CUISINES},
+			'mais_bem_avaliada':top_rated_cuisine(view.top_rated),
+			'mais_entregas':top_delivering_cuisine(view),
+		},
+	}
+
+def batch_metrics(cube,df,selections,top_number=10,shared=None):
+	"""
+	Esta função calcula as métricas de várias seleções de países de uma só vez, compartilhando os agregados por país entre elas.
+
+	Input: cubo, dataframe limpo (com 'CANDIDATE_COLUMNS'), lista de seleções (cada uma uma lista de países), quantidade de cidades nos rankings,
+		agregados já montados (opcional; quando informados, 'cube' e 'df' são ignorados)
+	Output: dict {frozenset de países: métricas de 'dashboard_metrics'}
+	"""
+	if shared is None:
+		shared=SharedAggregates(cube,df)
+	return {frozenset(selection):dashboard_metrics(shared.view(selection),top_number) for selection in selections}
+
+
+# =====================================================
+# SNAPSHOTS
+# =====================================================
+
+def selection_id(selection):
+	"""
+	Esta função retorna um identificador curto e estável para uma seleção de países (independente da ordem).
+
+	Input: lista de países
+	Output: str
+	"""
+	return hashlib.sha1('|'.join(sorted(selection)).encode('utf-8')).hexdigest()[:16]
+
+def to_json(value):
+	"""
+	Esta função converte as métricas em tipos serializáveis em JSON (dataframes viram listas de registros).
+
+	Input: métricas (dict, dataframe, str, número)
+	Output: valor serializável
+	"""
+	if isinstance(value,dict):
+		return {key:to_json(item) for key,item in value.items()}
+	if isinstance(value,pd.DataFrame):
+		return value.to_dict(orient='records')
+	if hasattr(value,'item'):
+		return value.item()
+	return value
+
+def write_snapshots(folder,selections,top_number=10,path=DATASET_PATH,shared=None):
+	"""
+	Esta função calcula as métricas das seleções informadas e grava um arquivo JSON por seleção em 'folder', junto com um 'index.json'
+	com as seleções disponíveis e a versão dos dados usada.
+
+	Input: pasta de destino, lista de seleções, quantidade de cidades nos rankings, caminho do arquivo (opcional), agregados já montados (opcional)
+	Output: quantidade de seleções gravadas
+	"""
+	if shared is None:
+		shared=SharedAggregates(load_cube(path),load_data(path,columns=CANDIDATE_COLUMNS))
+	results=batch_metrics(None,None,selections,top_number,shared)
+	os.makedirs(folder,exist_ok=True)
+	index={'data_version':list(dataset_version(path)),'top_number':top_number,'selections':{}}
+	for selection,metrics in results.items():
+		key=selection_id(selection)
+		with open(os.path.join(folder,key+'.json'),'w',encoding='utf-8') as file:
+			json.dump({'countries':sorted(selection),'metrics':to_json(metrics)},file,ensure_ascii=False)
+		index['selections'][key]=sorted(selection)
+	tmp=os.path.join(folder,'index.json.tmp')
+	with open(tmp,'w',encoding='utf-8') as file:
+		json.dump(index,file,ensure_ascii=False,indent=1)
+	os.replace(tmp,os.path.join(folder,'index.json'))
+	return len(results)
+
+def read_metrics(folder,selection,path=DATASET_PATH):
+	"""
+	Esta função lê as métricas pré-calculadas de uma seleção, se elas existirem e tiverem sido calculadas com a versão atual dos dados.
+
+	Input: pasta dos snapshots, lista de países, caminho do arquivo de dados (opcional)
+	Output: dict com as métricas (dataframes como listas de registros), ou None
+	"""
+	try:
+		with open(os.path.join(folder,'index.json'),encoding='utf-8') as file:
+			index=json.load(file)
+	except (OSError,ValueError):
+		return None
+	key=selection_id(selection)
+	if index.get('data_version')!=list(dataset_version(path)) or key not in index['selections']:
+		return None
+	with open(os.path.join(folder,key+'.json'),encoding='utf-8') as file:
+		return json.load(file)['metrics']
+
+def default_selections(countries,max_size=1,extra=()):
+	"""
+	Esta função monta a lista de seleções dos snapshots: todos os países, cada combinação de até 'max_size' países e as seleções extras informadas.
+
+	Input: lista de países, tamanho máximo das combinações, seleções extras (opcional)
+	Output: lista de seleções sem repetições
+	"""
+	selections=[list(countries)]
+	for size in range(1,max_size+1):
+		selections+=[list(combo) for combo in itertools.combinations(sorted(countries),size)]
+	selections+=[list(selection) for selection in extra]
+	unique={}
+	for selection in selections:
+		unique.setdefault(frozenset(selection),selection)
+	return list(unique.values())
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+if __name__=='__main__':
+	parser=argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('output',help='pasta onde os snapshots são gravados')
+	parser.add_argument('--max-size',type=int,default=1,help='tamanho máximo das combinações de países')
+	parser.add_argument('--selections',help='arquivo JSON com uma lista de seleções extras (listas de países)')
+	parser.add_argument('--top-number',type=int,default=10)
+	args=parser.parse_args()
+
+	extra=[]
+	if args.selections:
+		with open(args.selections,encoding='utf-8') as file:
+			extra=json.load(file)
+	countries=load_cube()['country_name'].unique()
+	total=write_snapshots(args.output,default_selections(countries,args.max_size,extra),args.top_number)
+	print(f'{total} seleções gravadas em {args.output}')
@@ -0,0 +1,214 @@
+"""
+Consultas de proximidade sobre as coordenadas dos restaurantes: restaurantes a até R km de um ponto, os k mais próximos (com ou sem
+entrega online), a cobertura de uma lista de pontos (centrais de entrega, por exemplo) e o centro de cada cidade.
+
+As consultas usam o mesmo índice em grade do mapa ('fome_zero.geo.GridIndex'), com células menores ('QUERY_CELL_SIZE'): a área de
+busca de um raio é a caixa de latitude/longitude que contém o círculo, lida apenas nas células que a cobrem, e a distância de
+haversine é calculada só para os pontos da caixa. Os k mais próximos são buscados em raios crescentes até haver k pontos dentro do
+círculo; como a busca de um raio é completa, os k primeiros dentro dele são os k mais próximos de todo o conjunto.
+"""
+# Importando as bibliotecas necessárias
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, load_data, dataset_version
+from fome_zero.geo import GEO_COLUMNS, GridIndex
+from fome_zero.profiling import profiled
+
+
+# Colunas do dataframe limpo usadas nas consultas
+NEARBY_COLUMNS=GEO_COLUMNS+['has_online_delivery']
+
+# Tamanho (em graus) das células do índice das consultas (cerca de 5.5 km de latitude)
+QUERY_CELL_SIZE=0.05
+
+# Primeiro raio (em km) da busca dos mais próximos, multiplicado por 'NEAREST_GROWTH' até haver pontos suficientes
+NEAREST_START_KM=0.5
+NEAREST_GROWTH=4
+
+# Raio médio da Terra, em km
+EARTH_RADIUS_KM=6371.0088
+
+# Maior distância possível entre dois pontos da superfície (meia circunferência), em km
+MAX_DISTANCE_KM=np.pi*EARTH_RADIUS_KM
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def haversine_km(latitude,longitude,latitudes,longitudes):
+	"""
+	Esta função calcula a distância de haversine entre um ponto e um conjunto de pontos.
+
+	Input: latitude e longitude do ponto (graus), arrays de latitude e longitude dos pontos (graus)
+	Output: array float64 com as distâncias em km
+	"""
+	lat1,lat2=np.radians(latitude),np.radians(latitudes)
+	dlat=lat2-lat1
+	dlon=np.radians(longitudes)-np.radians(longitude)
+	a=np.sin(dlat/2)**2+np.cos(lat1)*np.cos(lat2)*np.sin(dlon/2)**2
+	return 2*EARTH_RADIUS_KM*np.arcsin(np.sqrt(np.minimum(a,1)))
+
+def bounding_box(latitude,longitude,radius_km):
+	"""
+	Esta função retorna a menor caixa de latitude/longitude que contém o círculo de raio 'radius_km' em volta do ponto. Quando o círculo
+	contém um polo, a caixa cobre todas as longitudes; quando passa do antimeridiano, 'west' é maior que 'east' (como em 'GridIndex.query').
+
+	Input: latitude e longitude do ponto (graus), raio em km
+	Output: tupla (sul, oeste, norte, leste)
+	"""
+	angle=radius_km/EARTH_RADIUS_KM
+	dlat=np.degrees(angle)
+	south,north=latitude-dlat,latitude+dlat
+	if south<=-90 or north>=90 or angle>=np.pi/2:
+		return (max(south,-90.0),-180.0,min(north,90.0),180.0)
+	ratio=np.sin(angle)/np.cos(np.radians(latitude))
+	if ratio>=1:
+		return (south,-180.0,north,180.0)
+	dlon=np.degrees(np.arcsin(ratio))
+	west,east=longitude-dlon,longitude+dlon
+	if west<-180:
+		west+=360
+	if east>180:
+		east-=360
+	return (south,west,north,east)
+
+@profiled()
+def city_centers(df):
+	"""
+	Esta função calcula o centro de cada cidade: o centroide (média dos pontos sobre a esfera, correta também perto do antimeridiano)
+	e a mediana da latitude e da longitude (que não é afetada por coordenadas erradas).
+
+	Input: dataframe com 'country_name', 'city', 'latitude' e 'longitude'
+	Output: dataframe com 'country_name', 'city', 'restaurants', 'centroid_latitude', 'centroid_longitude', 'median_latitude' e
+		'median_longitude', em ordem crescente de país e cidade
+	"""
+	lat=np.radians(df['latitude'].to_numpy(dtype='float64'))
+	lon=np.radians(df['longitude'].to_numpy(dtype='float64'))
+	aux=pd.DataFrame({
+		'country_name':df['country_name'].to_numpy(),
+		'city':df['city'].to_numpy(),
+		'x':np.cos(lat)*np.cos(lon),'y':np.cos(lat)*np.sin(lon),'z':np.sin(lat),
+		'latitude':df['latitude'].to_numpy(),'longitude':df['longitude'].to_numpy(),
+	})
+	groups=aux.groupby(['country_name','city'],sort=True)
+	means=groups[['x','y','z']].mean()
+	medians=groups[['latitude','longitude']].median()
+	return pd.DataFrame({
+		'restaurants':groups.size(),
+		'centroid_latitude':np.degrees(np.arctan2(means['z'],np.hypot(means['x'],means['y']))),
+		'centroid_longitude':np.degrees(np.arctan2(means['y'],means['x'])),
+		'median_latitude':medians['latitude'],
+		'median_longitude':medians['longitude'],
+	}).reset_index()
+
+class GeoQueries:
+	"""
+	Consultas de proximidade: o dataframe com 'NEARBY_COLUMNS', o índice em grade das consultas, um segundo índice só com os
+	restaurantes com entrega online (as buscas com entrega não leem os demais pontos) e o centro de cada cidade.
+	"""
+
+	def __init__(self,df,cell_size=QUERY_CELL_SIZE):
+		self.df=df.reset_index(drop=True)
+		self.latitude=self.df['latitude'].to_numpy(dtype='float64')
+		self.longitude=self.df['longitude'].to_numpy(dtype='float64')
+		self.delivery=self.df['has_online_delivery'].to_numpy()==1
+		self.index=GridIndex(self.latitude,self.longitude,cell_size)
+		self.delivery_positions=np.flatnonzero(self.delivery)
+		self.delivery_index=GridIndex(self.latitude[self.delivery_positions],self.longitude[self.delivery_positions],cell_size)
+		self.cities=city_centers(self.df)
+		self._centers={(row.country_name,row.city):row._asdict() for row in self.cities.itertuples(index=False)}
+
+	def __len__(self):
+		return len(self.df)
+
+	def within(self,latitude,longitude,radius_km,delivery=False):
+		"""
+		Esta função retorna os restaurantes a até 'radius_km' km do ponto, do mais próximo ao mais distante (empates pela posição).
+
+		Input: latitude e longitude do ponto (graus), raio em km, apenas restaurantes com entrega online (opcional)
+		Output: tupla (array com as posições dos restaurantes, array com as distâncias em km)
+		"""
+		bounds=bounding_box(latitude,longitude,radius_km)
+		if delivery:
+			positions=self.delivery_positions[self.delivery_index.query(*bounds)]
+		else:
+			positions=self.index.query(*bounds)
+		distances=haversine_km(latitude,longitude,self.latitude[positions],self.longitude[positions])
+		inside=distances<=radius_km
+		positions,distances=positions[inside],distances[inside]
+		order=np.lexsort((positions,distances))
+		return positions[order],distances[order]
+
+	def nearest(self,latitude,longitude,k,delivery=False):
+		"""
+		Esta função retorna os 'k' restaurantes mais próximos do ponto, buscando em raios crescentes (a partir de 'NEAREST_START_KM').
+
+		Input: latitude e longitude do ponto (graus), quantidade de restaurantes, apenas restaurantes com entrega online (opcional)
+		Output: tupla (array com as posições dos restaurantes, array com as distâncias em km), do mais próximo ao mais distante
+		"""
+		radius=NEAREST_START_KM
+		while True:
+			positions,distances=self.within(latitude,longitude,radius,delivery)
+			if len(positions)>=k or radius>=MAX_DISTANCE_KM:
+				return positions[:k],distances[:k]
+			radius=min(radius*NEAREST_GROWTH,MAX_DISTANCE_KM)
+
+	@profiled()
+	def coverage(self,latitudes,longitudes,radius_km):
+		"""
+		Esta função conta, para cada ponto (uma central de entrega, por exemplo), os restaurantes e os restaurantes com entrega online a
+		até 'radius_km' km.
+
+		Input: arrays de latitude e longitude dos pontos (graus), raio em km
+		Output: dataframe com 'latitude', 'longitude', 'restaurants' e 'delivery', um ponto por linha
+		"""
+		latitudes=np.asarray(latitudes,dtype='float64')
+		longitudes=np.asarray(longitudes,dtype='float64')
+		restaurants=np.zeros(len(latitudes),dtype='int64')
+		delivery=np.zeros(len(latitudes),dtype='int64')
+		for i,(lat,lon) in enumerate(zip(latitudes,longitudes)):
+			positions,_=self.within(lat,lon,radius_km)
+			restaurants[i]=len(positions)
+			delivery[i]=np.count_nonzero(self.delivery[positions])
+		return pd.DataFrame({'latitude':latitudes,'longitude':longitudes,'restaurants':restaurants,'delivery':delivery})
+
+	def city_center(self,country,city):
+		"""
+		Esta função retorna o centro de uma cidade (veja 'city_centers').
+
+		Input: nome do país, nome da cidade
+		Output: dict com as colunas de 'city_centers' (None quando a cidade não existe)
+		"""
+		return self._centers.get((country,city))
+
+	def restaurants(self,positions,distances):
+		"""
+		Esta função monta a tabela dos restaurantes encontrados por uma consulta.
+
+		Input: array com as posições dos restaurantes, array com as distâncias em km
+		Output: dataframe com as colunas de 'NEARBY_COLUMNS' e 'distance_km'
+		"""
+		return self.df.iloc[positions].assign(distance_km=np.round(distances,3)).reset_index(drop=True)
+
+@st.cache_resource(max_entries=4,show_spinner=False)
+def _load_geo_queries(path,mtime,version):
+	"""
+	Esta função monta o índice das consultas de proximidade uma única vez por processo e por versão dos dados.
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza
+	Output: GeoQueries
+	"""
+	return GeoQueries(load_data(path,columns=NEARBY_COLUMNS))
+
+def load_geo_queries(path=DATASET_PATH):
+	"""
+	Esta função tem como objetivo carregar as consultas de proximidade, compartilhadas por todas as sessões.
+
+	Input: caminho do arquivo (opcional)
+	Output: GeoQueries
+	"""
+	mtime,version=dataset_version(path)
+	return _load_geo_queries(path,mtime,version)
@@ -0,0 +1,150 @@
+"""
+Cálculo em paralelo dos painéis independentes de uma página.
+
+Os indicadores, tabelas e gráficos de uma página não dependem uns dos outros, mas eram calculados um depois do outro. Com o
+'PanelScheduler', cada painel reserva o seu lugar no layout ('st.empty') e o seu cálculo é enviado a um pool de threads do processo
+assim que a página o declara; no fim da página ('run'), a thread da página mostra cada painel no seu lugar, na ordem em que os cálculos
+terminam. Assim os painéis rápidos aparecem sem esperar os lentos, e um painel que passa do tempo limite mostra um aviso no lugar do
+conteúdo, sem travar o resto da página.
+
+Apenas a thread da página escreve no Streamlit: as funções enviadas ao pool devem ser as funções sem interface de 'fome_zero.metrics'
+e 'fome_zero.charts' (ou o 'FigureCache'). Cada cálculo roda com uma cópia do contexto da página, para que as etapas apareçam no
+profiler da execução. O pandas libera o GIL em boa parte dos agrupamentos, então o ganho depende dos núcleos disponíveis.
+
+O pool é compartilhado por todas as sessões do processo. Quando um painel passa do tempo limite (ou a execução da página é
+interrompida), o seu cálculo é cancelado se ainda estiver na fila; um cálculo que já começou não pode ser interrompido e termina no
+pool (os caches guardam o resultado para a próxima execução). Para que cálculos lentos não se acumulem entre as sessões e ocupem as
+threads das próximas execuções, no máximo 'MAX_QUEUED_PER_WORKER' cálculos por thread ficam no pool ao mesmo tempo: acima disso, o
+painel é calculado na própria thread da página.
+
+O número de threads vem da variável de ambiente FOME_ZERO_PANEL_WORKERS (com 0 ou 1 os painéis são calculados na própria thread da
+página, um depois do outro) e o tempo limite de cada painel, em segundos, da variável FOME_ZERO_PANEL_TIMEOUT.
+"""
+# Importando as bibliotecas necessárias
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import streamlit as st
+
+from fome_zero.profiling import stage
+
+
+# Tempo limite padrão de cada painel, em segundos
+DEFAULT_TIMEOUT=30.0
+
+# Número padrão de threads do pool
+DEFAULT_WORKERS=min(4,os.cpu_count() or 1)
+
+# Cálculos por thread que podem estar no pool ao mesmo tempo (em andamento ou na fila), somando todas as sessões
+MAX_QUEUED_PER_WORKER=4
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+@st.cache_resource(show_spinner=False)
+def _panel_pool(max_workers):
+	"""
+	Esta função cria o pool de threads dos painéis, uma única vez por processo (compartilhado por todas as sessões).
+
+	Input: número de threads
+	Output: ThreadPoolExecutor
+	"""
+	return ThreadPoolExecutor(max_workers=max_workers,thread_name_prefix='fome_zero_panel')
+
+@st.cache_resource(show_spinner=False)
+def _panel_slots(max_workers):
+	"""
+	Esta função cria o limite de cálculos no pool dos painéis, uma única vez por processo (compartilhado por todas as sessões).
+
+	Input: número de threads
+	Output: threading.BoundedSemaphore
+	"""
+	return threading.BoundedSemaphore(max_workers*MAX_QUEUED_PER_WORKER)
+
+def _run_panel(name,func,args,kwargs):
+	with stage(f'painel: {name}'):
+		return func(*args,**kwargs)
+
+class PanelScheduler:
+	"""
+	Painéis de uma execução da página: o lugar de cada um no layout, o cálculo em andamento e a função que o mostra.
+	"""
+
+	def __init__(self,timeout=None,max_workers=None):
+		self.timeout=timeout if timeout is not None else float(os.environ.get('FOME_ZERO_PANEL_TIMEOUT',DEFAULT_TIMEOUT))
+		max_workers=max_workers if max_workers is not None else int(os.environ.get('FOME_ZERO_PANEL_WORKERS',DEFAULT_WORKERS))
+		self.pool=_panel_pool(max_workers) if max_workers>1 else None
+		self.slots=_panel_slots(max_workers) if max_workers>1 else None
+		self.panels=[]
+
+	def add(self,name,render,func,*args,**kwargs):
+		"""
+		Esta função reserva o lugar do painel no ponto atual do layout e começa o seu cálculo.
+
+		Input: nome do painel (aparece no profiler e nos avisos), função que mostra o resultado (chamada na thread da página, dentro do
+			lugar reservado), função que calcula o painel e seus argumentos
+		Output: None
+		"""
+		placeholder=st.empty()
+		# Com o pool cheio (cálculos lentos de outras sessões), o painel é calculado aqui mesmo, sem aumentar a fila
+		if self.pool is None or not self.slots.acquire(blocking=False):
+			future=Future()
+			try:
+				future.set_result(_run_panel(name,func,args,kwargs))
+			except Exception as error:
+				future.set_exception(error)
+		else:
+			# Cópia do contexto da página: o profiler ativo também mede o painel calculado na outra thread
+			context=contextvars.copy_context()
+			future=self.pool.submit(context.run,_run_panel,name,func,args,kwargs)
+			# A vaga é liberada quando o cálculo termina ou é cancelado
+			future.add_done_callback(lambda _: self.slots.release())
+		self.panels.append({'name':name,'placeholder':placeholder,'render':render,'future':future,'deadline':time.monotonic()+self.timeout})
+
+	def _show(self,panel):
+		"""
+		Esta função mostra o resultado do painel (ou o erro do cálculo) no lugar reservado para ele.
+		"""
+		with panel['placeholder'].container():
+			error=panel['future'].exception()
+			if error is not None:
+				st.exception(error)
+			else:
+				panel['render'](panel['future'].result())
+
+	def run(self):
+		"""
+		Esta função espera os cálculos e mostra cada painel assim que ele termina. Os painéis que passam do tempo limite mostram um aviso
+		e o seu cálculo é cancelado se ainda estiver na fila (um cálculo já em andamento termina no pool, e os caches de seleções e de
+		figuras guardam o resultado para a próxima execução). Se a execução for interrompida, os cálculos na fila também são cancelados.
+
+		Input: None
+		Output: lista com os nomes dos painéis que passaram do tempo limite
+		"""
+		pending={panel['future']:panel for panel in self.panels}
+		self.panels=[]
+		expired=[]
+		try:
+			while pending:
+				now=time.monotonic()
+				for future,panel in list(pending.items()):
+					if panel['deadline']<=now and not future.done():
+						del pending[future]
+						future.cancel()
+						expired.append(panel['name'])
+						panel['placeholder'].warning(f"O painel '{panel['name']}' demorou mais de {self.timeout:.0f} s e não foi mostrado. Atualize a página para tentar de novo.")
+				if not pending:
+					break
+				remaining=min(panel['deadline'] for panel in pending.values())-now
+				done,_=wait(list(pending),timeout=max(remaining,0),return_when=FIRST_COMPLETED)
+				for future in done:
+					self._show(pending.pop(future))
+		finally:
+			for future in pending:
+				future.cancel()
+		return expired
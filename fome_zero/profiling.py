@@ -0,0 +1,209 @@
+"""
+Medição do tempo de cada etapa de uma renderização das páginas.
+
+Cada execução de uma página cria um 'Profiler' ('start_profiling'). As funções decoradas com 'profiled' e os blocos 'with stage(...)'
+registram, enquanto ele estiver ativo, o tempo de execução, as linhas de entrada e saída e (opcionalmente) o pico de memória.
+Sem um profiler ativo (por exemplo em scripts e benchmarks) o decorador não faz nada além de chamar a função.
+
+Ao final da execução os registros podem ser mostrados no painel da barra lateral e gravados em um arquivo JSON lines,
+indicado pela variável de ambiente FOME_ZERO_PERF_LOG, para acompanhar regressões entre versões.
+"""
+# Importando as bibliotecas necessárias
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+
+# Profiler da execução atual. Cada execução de página roda na sua própria thread, então cada uma enxerga apenas o seu profiler.
+_current=contextvars.ContextVar('fome_zero_profiler',default=None)
+
+# Profundidade da etapa atual. Também fica no contexto, para que painéis calculados em paralelo ('fome_zero.panels') com uma cópia
+# do contexto registrem as suas etapas internas sem misturar a profundidade umas das outras.
+_depth=contextvars.ContextVar('fome_zero_profiler_depth',default=0)
+
+# Quantidade de profilers medindo memória no momento (o tracemalloc é global ao processo)
+_tracing_lock=threading.Lock()
+_tracing_users=0
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def count_rows(value):
+	"""
+	Esta função retorna a quantidade de linhas de um valor de entrada ou saída de uma etapa, quando isso faz sentido.
+
+	Input: valor (dataframe, série, recorte do cubo, etc.)
+	Output: int ou None
+	"""
+	if hasattr(value,'cube'):
+		value=value.cube
+	if hasattr(value,'shape') and hasattr(value,'__len__'):
+		return len(value)
+	return None
+
+class Profiler:
+	"""
+	Registros de tempo de uma execução de página. Use 'stage' para medir um bloco e 'finish' ao final da execução.
+	"""
+
+	def __init__(self,page,trace_memory=False):
+		self.page=page
+		self.trace_memory=trace_memory
+		self.records=[]
+		self.started=time.perf_counter()
+		self.total=None
+
+	@contextmanager
+	def stage(self,name,rows_in=None):
+		"""
+		Esta função mede o bloco 'with' como uma etapa. O dict retornado pode receber a chave 'rows_out' dentro do bloco.
+
+		Input: nome da etapa, linhas de entrada (opcional)
+		Output: dict com o registro da etapa
+		"""
+		depth=_depth.get()
+		record={'stage':name,'depth':depth,'rows_in':rows_in,'rows_out':None,'seconds':None,'peak_kb':None}
+		first_child=len(self.records)
+		self.records.append(record)
+		if self.trace_memory:
+			tracemalloc.reset_peak()
+			memory_start=tracemalloc.get_traced_memory()[0]
+		token=_depth.set(depth+1)
+		start=time.perf_counter()
+		try:
+			yield record
+		finally:
+			record['seconds']=round(time.perf_counter()-start,6)
+			_depth.reset(token)
+			if self.trace_memory:
+				peak=tracemalloc.get_traced_memory()[1]-memory_start
+				# As etapas internas zeram o pico, então o pico desta etapa também considera o delas
+				children=[child['peak_kb'] or 0 for child in self.records[first_child+1:]]
+				record['peak_kb']=round(max([peak/1024]+children),1)
+
+	def finish(self,log_path=None):
+		"""
+		Esta função encerra a medição da execução e, se houver um caminho de log (argumento ou variável FOME_ZERO_PERF_LOG), grava uma linha JSON com todas as etapas.
+
+		Input: caminho do arquivo de log (opcional)
+		Output: None
+		"""
+		if self.total is not None:
+			return
+		self.total=round(time.perf_counter()-self.started,6)
+		_current.set(None)
+		if self.trace_memory:
+			_release_tracemalloc()
+		log_path=log_path or os.environ.get('FOME_ZERO_PERF_LOG')
+		if log_path:
+			write_log(self,log_path)
+
+	def to_dict(self):
+		"""
+		Esta função retorna os registros da execução em um dict serializável em JSON.
+
+		Input: None
+		Output: dict
+		"""
+		return {
+			'timestamp':datetime.now(timezone.utc).isoformat(timespec='seconds'),
+			'release':os.environ.get('FOME_ZERO_RELEASE'),
+			'page':self.page,
+			'total_seconds':self.total,
+			'stages':self.records,
+		}
+
+def _acquire_tracemalloc():
+	global _tracing_users
+	with _tracing_lock:
+		if _tracing_users==0 and not tracemalloc.is_tracing():
+			tracemalloc.start()
+		_tracing_users+=1
+
+def _release_tracemalloc():
+	global _tracing_users
+	with _tracing_lock:
+		_tracing_users-=1
+		if _tracing_users==0 and tracemalloc.is_tracing():
+			tracemalloc.stop()
+
+def start_profiling(page,trace_memory=False):
+	"""
+	Esta função cria o profiler da execução atual da página e o torna ativo para as funções decoradas com 'profiled'.
+	A medição de memória usa o tracemalloc, que deixa o processo mais lento e é compartilhado entre as sessões: ative-a apenas para investigar.
+
+	Input: nome da página, medir o pico de memória (opcional)
+	Output: Profiler
+	"""
+	if trace_memory:
+		_acquire_tracemalloc()
+	profiler=Profiler(page,trace_memory)
+	_current.set(profiler)
+	_depth.set(0)
+	return profiler
+
+def current_profiler():
+	"""
+	Esta função retorna o profiler ativo na execução atual, ou None.
+
+	Input: None
+	Output: Profiler ou None
+	"""
+	return _current.get()
+
+def stage(name,rows_in=None):
+	"""
+	Esta função mede um bloco 'with' no profiler ativo. Sem profiler ativo o bloco é executado normalmente.
+
+	Input: nome da etapa, linhas de entrada (opcional)
+	Output: gerenciador de contexto (retorna o dict do registro, ou None)
+	"""
+	profiler=_current.get()
+	if profiler is None:
+		return nullcontext()
+	return profiler.stage(name,rows_in)
+
+def profiled(name=None):
+	"""
+	Decorador que registra cada chamada da função como uma etapa do profiler ativo, com as linhas do primeiro argumento como entrada e as linhas do resultado como saída.
+
+	Input: nome da etapa (opcional, padrão: nome da função)
+	Output: decorador
+	"""
+	def decorator(func):
+		stage_name=name or func.__name__
+
+		@functools.wraps(func)
+		def wrapper(*args,**kwargs):
+			profiler=_current.get()
+			if profiler is None:
+				return func(*args,**kwargs)
+			rows_in=count_rows(args[0]) if args else None
+			with profiler.stage(stage_name,rows_in) as record:
+				result=func(*args,**kwargs)
+				record['rows_out']=count_rows(result)
+			return result
+		return wrapper
+	return decorator
+
+def write_log(profiler,path):
+	"""
+	Esta função acrescenta os registros de uma execução ao arquivo JSON lines informado, criando a pasta se necessário.
+
+	Input: Profiler, caminho do arquivo
+	Output: None
+	"""
+	folder=os.path.dirname(path)
+	if folder:
+		os.makedirs(folder,exist_ok=True)
+	line=json.dumps(profiler.to_dict(),ensure_ascii=False)
+	with _tracing_lock, open(path,'a',encoding='utf-8') as file:
+		file.write(line+'\n')
@@ -0,0 +1,55 @@
+"""
+Seleção dos melhores e piores registros sem ordenar o dataframe inteiro.
+
+'top_k' usa seleção parcial ('nlargest'/'nsmallest') e só ordena os candidatos, e 'best_worst' encontra o melhor e o pior registro de
+cada grupo em uma única passada. As duas funções também aceitam uma seleção de linhas do dataframe compartilhado ('SharedRows', de
+'fome_zero.shared'), sem copiar as linhas selecionadas. Os empates são sempre desfeitos pela coluna 'tie' em ordem crescente (por padrão 'restaurant_id',
+ou seja, o restaurante mais antigo vence), de modo que o resultado não depende da ordem das linhas.
+"""
+# Importando as bibliotecas necessárias
+from fome_zero.profiling import profiled
+from fome_zero.shared import SharedRows
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+@profiled()
+def top_k(df,k,by,ascending=False,tie='restaurant_id'):
+	"""
+	Esta função retorna as 'k' linhas com os maiores (ou menores, com ascending=True) valores da coluna 'by', desempatando pela coluna 'tie' em ordem crescente.
+	Equivale a 'df.sort_values([by,tie],ascending=[ascending,True]).head(k)', mas só ordena as linhas que podem entrar no resultado.
+
+	Input: dataframe (ou SharedRows), quantidade de linhas, coluna de ordenação, ordem crescente (opcional), coluna de desempate (opcional)
+	Output: dataframe com até 'k' linhas, já ordenado
+	"""
+	if isinstance(df,SharedRows):
+		return df.top_k(k,by,ascending,tie)
+	if k<=0 or df.empty:
+		return df.iloc[:0]
+	if ascending:
+		candidates=df.nsmallest(k,by,keep='all')
+	else:
+		candidates=df.nlargest(k,by,keep='all')
+	return candidates.sort_values([by,tie],ascending=[ascending,True],kind='mergesort').head(k)
+
+@profiled()
+def best_worst(df,group,groups=None,value='aggregate_rating',tie='restaurant_id'):
+	"""
+	Esta função encontra, em uma única passada, a linha com o maior e a linha com o menor valor de 'value' em cada grupo, desempatando pela coluna 'tie' em ordem crescente.
+
+	Input: dataframe (ou SharedRows), coluna do grupo (por exemplo 'cuisines'), lista de grupos desejados (opcional, None para todos), coluna do valor (opcional), coluna de desempate (opcional)
+	Output: dict com as chaves 'maior' e 'menor', cada uma com um dataframe indexado pelo grupo
+	"""
+	if isinstance(df,SharedRows):
+		return df.best_worst(group,groups,value,tie)
+	if groups is not None:
+		df=df.loc[df[group].isin(groups)]
+	values=df.groupby(group,observed=True,sort=False)[value]
+	result={}
+	for parameter,agg in (('maior','max'),('menor','min')):
+		candidates=df.loc[df[value]==values.transform(agg)]
+		rows=candidates.groupby(group,observed=True)[tie].idxmin()
+		result[parameter]=df.loc[rows.to_numpy()].set_index(group)
+	return result
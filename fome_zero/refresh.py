@@ -0,0 +1,181 @@
+"""
+Atualização incremental dos dados a partir de um arquivo de alterações (delta), sem limpar o CSV inteiro novamente.
+
+O delta é um CSV com as colunas do zomato.csv mais a coluna 'Operation', com um dos valores:
+	- 'insert': restaurante novo;
+	- 'update': restaurante já existente, com todas as colunas atualizadas (notas, votos, serviços...);
+	- 'delete': restaurante removido (basta a coluna 'Restaurant ID').
+As linhas são identificadas pelo ID do restaurante ('restaurant_id'); um 'insert' de um ID existente é tratado como 'update' e, quando
+o mesmo ID aparece mais de uma vez no delta, vale a última linha.
+
+Apenas as linhas do delta passam pela limpeza ('clean_data'). O dataframe limpo é atualizado trocando as linhas dos IDs alterados, e o
+cubo de agregados ('fome_zero.cube') é atualizado só nos grupos afetados ('update_cube'); os demais grupos são mantidos como estão.
+Os objetos originais não são modificados, porque o dataframe e o cubo do cache são compartilhados por todas as sessões: as funções
+retornam novos objetos, que substituem os anteriores.
+
+Pela linha de comando, o delta é aplicado ao CSV (as linhas dos IDs alterados são trocadas, sem reprocessar as demais) e o snapshot
+do dataframe limpo é regravado a partir da versão atualizada, de modo que as páginas recarregam os dados sem limpar o CSV:
+
+Uso: python -m fome_zero.refresh delta.csv [--path dataset/zomato.csv]
+"""
+# Importando as bibliotecas necessárias
+import argparse
+import io
+import os
+import time
+
+import pandas as pd
+
+from fome_zero.data import DATASET_PATH, CLEAN_VERSION, rename_columns, derive_columns, clean_data
+from fome_zero.snapshot import read_snapshot, write_snapshot
+from fome_zero.cube import update_cube
+from fome_zero.profiling import profiled
+
+
+# Coluna do delta com a operação de cada linha, e os valores aceitos
+OPERATION_COLUMN='Operation'
+OPERATIONS=['insert','update','delete']
+
+# Coluna de ID no CSV bruto (a primeira coluna do zomato.csv)
+ID_COLUMN='Restaurant ID'
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def read_delta(path):
+	"""
+	Esta função lê o arquivo de alterações e o separa em linhas novas ou atualizadas e IDs removidos.
+
+	Input: caminho do delta
+	Output: tupla (dataframe bruto com as linhas 'insert' e 'update', sem a coluna 'Operation'; array com os IDs das linhas 'delete')
+	"""
+	# O delta é lido como texto: as linhas 'delete' só têm o ID, e os tipos das demais colunas são inferidos depois, apenas nas linhas
+	# novas ou atualizadas (como na leitura do CSV completo)
+	delta=pd.read_csv(path,dtype=str,keep_default_na=False)
+	operation=delta.pop(OPERATION_COLUMN).str.strip().str.lower()
+	invalid=~operation.isin(OPERATIONS)
+	if invalid.any():
+		raise ValueError(f"operações inválidas no delta: {sorted(operation[invalid].unique())} (use {', '.join(OPERATIONS)})")
+	upserts=delta.loc[operation!='delete'].drop_duplicates(ID_COLUMN,keep='last')
+	upserts=pd.read_csv(io.StringIO(upserts.to_csv(index=False)))
+	deleted=delta.loc[operation=='delete',ID_COLUMN].astype('int64').to_numpy()
+	return upserts,deleted
+
+def clean_delta(upserts,columns=None):
+	"""
+	Esta função limpa as linhas novas ou atualizadas do delta com as mesmas regras de 'clean_data'. As linhas com valores nulos são
+	descartadas, como na limpeza completa (um 'update' com valores nulos equivale, portanto, a um 'delete').
+
+	Input: dataframe bruto do delta, lista de colunas do dataframe limpo (opcional, para manter a mesma ordem)
+	Output: dataframe limpo
+	"""
+	df=rename_columns(upserts).dropna().reset_index(drop=True)
+	df=derive_columns(df)
+	if columns is not None:
+		df=df.loc[:,columns]
+	return df
+
+@profiled()
+def apply_delta(df,upserts,deleted):
+	"""
+	Esta função aplica o delta ao dataframe limpo: as linhas dos IDs alterados ou removidos saem e as linhas limpas do delta entram,
+	mantendo a ordem por 'restaurant_id' (como em 'clean_data').
+
+	Input: dataframe limpo, dataframe bruto com as linhas novas ou atualizadas, array com os IDs removidos
+	Output: tupla (dataframe atualizado, linhas removidas, linhas adicionadas), as duas últimas no formato do dataframe limpo
+	"""
+	added=clean_delta(upserts,list(df.columns)).astype(df.dtypes.to_dict()) if len(upserts) else df.iloc[:0]
+	touched=df['restaurant_id'].isin(upserts[ID_COLUMN]) | df['restaurant_id'].isin(deleted)
+	removed=df.loc[touched]
+	df=pd.concat([df.loc[~touched],added],ignore_index=True)
+	df=df.sort_values('restaurant_id',ascending=1).reset_index(drop=True)
+	return df,removed,added
+
+def refresh(df,cube,upserts,deleted):
+	"""
+	Esta função atualiza o dataframe limpo e o cubo com um delta, recalculando apenas os grupos do cubo que tiveram restaurantes alterados.
+
+	Input: dataframe limpo, cubo, dataframe bruto com as linhas novas ou atualizadas, array com os IDs removidos
+	Output: tupla (dataframe atualizado, cubo atualizado)
+	"""
+	df,removed,added=apply_delta(df,upserts,deleted)
+	return df,update_cube(cube,removed,added,df)
+
+def _raw_records(file):
+	"""
+	Esta função lê os registros de um CSV sem interpretá-los, juntando as linhas de um mesmo registro quando um campo entre aspas
+	contém uma quebra de linha (o registro termina quando o número de aspas é par).
+
+	Input: arquivo aberto
+	Output: gerador de strings (o texto de cada registro, com a quebra de linha final)
+	"""
+	record=''
+	for line in file:
+		record+=line
+		if record.count('"')%2==0:
+			yield record
+			record=''
+	if record:
+		yield record
+
+def rewrite_csv(path,upserts,deleted):
+	"""
+	Esta função aplica o delta ao CSV bruto: os registros dos IDs alterados ou removidos são retirados e as linhas novas ou atualizadas
+	são acrescentadas no fim. Os demais registros são copiados sem alteração. O arquivo é escrito em um arquivo temporário e depois
+	renomeado, como o snapshot.
+
+	Input: caminho do CSV, dataframe bruto com as linhas novas ou atualizadas, array com os IDs removidos
+	Output: quantidade de registros retirados
+	"""
+	touched={str(value) for value in upserts[ID_COLUMN]}|{str(value) for value in deleted}
+	tmp_path=path+'.tmp'
+	dropped=0
+	with open(path,encoding='utf-8',newline='') as source, open(tmp_path,'w',encoding='utf-8',newline='') as target:
+		records=_raw_records(source)
+		header=next(records)
+		columns=header.rstrip('\r\n').split(',')
+		if columns[0]!=ID_COLUMN:
+			raise ValueError(f"a primeira coluna do CSV deve ser '{ID_COLUMN}'")
+		target.write(header)
+		for record in records:
+			if record.split(',',1)[0] in touched:
+				dropped+=1
+				continue
+			if not record.endswith('\n'):
+				record+='\n'
+			target.write(record)
+		upserts.reindex(columns=columns).to_csv(target,header=False,index=False,lineterminator='\n')
+	os.replace(tmp_path,path)
+	return dropped
+
+def refresh_files(delta_path,path=DATASET_PATH):
+	"""
+	Esta função aplica um delta ao CSV e ao snapshot do dataframe limpo. O dataframe limpo atual vem do snapshot (ou, se ele não estiver
+	atualizado, da limpeza completa do CSV, uma única vez); o snapshot novo é gravado a partir da versão atualizada por 'apply_delta'.
+
+	Input: caminho do delta, caminho do CSV (opcional)
+	Output: tupla (dataframe atualizado, linhas removidas, linhas adicionadas)
+	"""
+	upserts,deleted=read_delta(delta_path)
+	df=read_snapshot(path,CLEAN_VERSION)
+	if df is None:
+		df=clean_data(pd.read_csv(path))
+	df,removed,added=apply_delta(df,upserts,deleted)
+	rewrite_csv(path,upserts,deleted)
+	write_snapshot(df,path,CLEAN_VERSION)
+	return df,removed,added
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+if __name__=='__main__':
+	parser=argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('delta')
+	parser.add_argument('--path',default=DATASET_PATH)
+	args=parser.parse_args()
+
+	start=time.perf_counter()
+	df,removed,added=refresh_files(args.delta,args.path)
+	print(f'{len(removed)} restaurantes retirados, {len(added)} adicionados, {len(df)} no total ({time.perf_counter()-start:.2f} s)')
@@ -0,0 +1,276 @@
+"""
+Busca textual de restaurantes por nome, endereço e localidade, com um índice invertido montado uma única vez por processo.
+
+O texto é normalizado ('fold': minúsculas, sem acentos, 'Kızılkayalar' vira 'kizilkayalar') e separado em palavras. Como as colunas
+de texto do 'SharedFrame' já vêm codificadas, cada valor distinto é separado uma única vez, e não cada restaurante. O índice guarda:
+	- o vocabulário em ordem alfabética e, para cada palavra, as posições dos restaurantes que a contêm (formato CSR, como o
+	  'CuisineIndex') e o peso do campo onde ela aparece ('SEARCH_FIELDS': o nome vale mais que o endereço);
+	- os trigramas de cada palavra do vocabulário, também em CSR.
+
+Cada termo da consulta encontra as palavras iguais a ele, as que começam com ele (uma faixa do vocabulário, com busca binária) e as
+parecidas (trigramas em comum, o que tolera erros de digitação e acha o termo no meio da palavra). Os restaurantes precisam ter todos
+os termos; a relevância é a soma, por termo, do peso do campo vezes a qualidade da correspondência (exata, prefixo ou parecida), e os
+empates são ordenados pela nota ('aggregate_rating'), pelo número de avaliações ('votes') e pelo ID. Nenhuma consulta percorre o
+texto do dataframe.
+"""
+# Importando as bibliotecas necessárias
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, dataset_version
+from fome_zero.shared import SharedRows, load_shared
+from fome_zero.profiling import profiled
+
+
+# Colunas do 'SharedFrame' usadas pela busca
+SEARCH_COLUMNS=['restaurant_id','restaurant_name','country_name','city','address','locality','locality_verbose','cuisine_list','aggregate_rating','votes']
+
+# Campos pesquisados e o peso de cada um na relevância
+SEARCH_FIELDS={'restaurant_name':3,'locality':2,'locality_verbose':1,'address':1}
+
+# Qualidade de cada tipo de correspondência (multiplica o peso do campo)
+EXACT_SCORE=1.0
+PREFIX_SCORE=0.8
+FUZZY_SCORE=0.6
+
+# Termos mais curtos que isso só correspondem a palavras iguais (um prefixo de uma letra traria quase todo o vocabulário)
+MIN_PREFIX_LENGTH=2
+
+# Semelhança mínima (trigramas em comum / trigramas distintos das duas palavras) e tamanho mínimo do termo para a busca por trigramas
+FUZZY_THRESHOLD=0.4
+MIN_FUZZY_LENGTH=3
+
+# Letras sem decomposição Unicode que também são normalizadas
+FOLD_TABLE=str.maketrans({'ı':'i','ł':'l','ø':'o','đ':'d','æ':'ae','œ':'oe'})
+
+TOKEN_PATTERN=re.compile(r'[^\W_]+')
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def fold(text):
+	"""
+	Esta função normaliza o texto para a busca: minúsculas e sem acentos.
+
+	Input: texto
+	Output: texto normalizado
+	"""
+	if text.isascii():
+		return text.lower()
+	text=unicodedata.normalize('NFKD',text.casefold().translate(FOLD_TABLE))
+	return ''.join(char for char in text if not unicodedata.combining(char))
+
+def tokenize(text):
+	"""
+	Esta função separa o texto normalizado em palavras (sequências de letras e números).
+
+	Input: texto
+	Output: lista de palavras
+	"""
+	return TOKEN_PATTERN.findall(fold(text)) if isinstance(text,str) else []
+
+def trigrams(word):
+	"""
+	Esta função retorna os trigramas distintos da palavra, com um espaço antes e depois (' pizza ' tem ' pi', 'piz', ..., 'za ').
+
+	Input: palavra normalizada
+	Output: lista de trigramas
+	"""
+	padded=f' {word} '
+	return list(dict.fromkeys(padded[i:i+3] for i in range(len(padded)-2)))
+
+def _expand(starts,lengths):
+	"""
+	Esta função concatena os intervalos [start, start+length) sem laço em Python.
+
+	Input: array de inícios, array de tamanhos
+	Output: array com as posições de todos os intervalos
+	"""
+	total=int(lengths.sum())
+	return np.arange(total)+np.repeat(starts-(np.cumsum(lengths)-lengths),lengths)
+
+class SearchIndex:
+	"""
+	Índice invertido da busca: 'vocabulary' (palavras em ordem alfabética), 'rows' e 'weights' (posição do restaurante no 'SharedFrame' e
+	peso do campo, agrupados pela palavra, com o início de cada palavra em 'offsets') e os trigramas do vocabulário ('grams', com as
+	palavras de cada trigrama em 'gram_words' a partir de 'gram_offsets', e o número de trigramas de cada palavra em 'word_grams').
+	"""
+
+	def __init__(self,vocabulary,rows,weights,offsets,grams,gram_words,gram_offsets,word_grams,n_rows):
+		self.vocabulary=vocabulary
+		self.rows=rows
+		self.weights=weights
+		self.offsets=offsets
+		self.grams=grams
+		self.gram_words=gram_words
+		self.gram_offsets=gram_offsets
+		self.word_grams=word_grams
+		self.n_rows=n_rows
+
+	@classmethod
+	@profiled()
+	def from_frame(cls,frame):
+		"""
+		Esta função monta o índice a partir das colunas de texto do dataframe compartilhado, separando cada valor distinto uma única vez.
+
+		Input: SharedFrame com as colunas de 'SEARCH_FIELDS'
+		Output: SearchIndex
+		"""
+		fields=[]
+		for field,weight in SEARCH_FIELDS.items():
+			split=[tokenize(value) for value in frame.categories[field]]
+			lengths=np.array([len(words) for words in split],dtype='int64')
+			fields.append((frame.arrays[field],weight,lengths,np.array([word for words in split for word in words],dtype=object)))
+		flat_ids,vocabulary=pd.factorize(np.concatenate([flat for *_,flat in fields]),sort=True)
+		vocabulary=np.asarray(vocabulary,dtype=object)
+		flat_ids=np.split(flat_ids,np.cumsum([len(flat) for *_,flat in fields])[:-1])
+		words,rows,weights=[],[],[]
+		for (codes,weight,lengths,_),flat_ids in zip(fields,flat_ids):
+			# Cada linha é repetida pelo número de palavras do seu valor (como no 'CuisineIndex')
+			counts=lengths[codes]
+			words.append(flat_ids[_expand((np.cumsum(lengths)-lengths)[codes],counts)])
+			rows.append(np.repeat(np.arange(len(codes)),counts))
+			weights.append(np.full(counts.sum(),weight,dtype='int8'))
+		words,rows,weights=np.concatenate(words),np.concatenate(rows),np.concatenate(weights)
+		# Um par (palavra, restaurante) por palavra, com o maior peso entre os campos onde ela aparece
+		keys=words.astype('int64')*frame.n_rows+rows
+		order=np.lexsort((-weights,keys))
+		keys,weights=keys[order],weights[order]
+		first=np.r_[True,keys[1:]!=keys[:-1]]
+		keys,weights=keys[first],weights[first]
+		offsets=np.r_[0,np.cumsum(np.bincount(keys//frame.n_rows,minlength=len(vocabulary)))]
+		# Trigramas do vocabulário
+		split=[trigrams(word) for word in vocabulary]
+		word_grams=np.array([len(grams) for grams in split],dtype='int32')
+		gram_codes,grams=pd.factorize(np.array([gram for grams in split for gram in grams],dtype=object),sort=True)
+		grams=np.asarray(grams,dtype=object)
+		gram_words=np.repeat(np.arange(len(vocabulary)),word_grams)[np.argsort(gram_codes,kind='stable')]
+		gram_offsets=np.r_[0,np.cumsum(np.bincount(gram_codes,minlength=len(grams)))]
+		return cls(vocabulary,(keys%frame.n_rows).astype('int32'),weights,offsets,grams,gram_words.astype('int32'),gram_offsets,word_grams,frame.n_rows)
+
+	@property
+	def nbytes(self):
+		return sum(array.nbytes for array in (self.rows,self.weights,self.offsets,self.gram_words,self.gram_offsets,self.word_grams))
+
+	def matches(self,term):
+		"""
+		Esta função retorna as palavras do vocabulário que correspondem ao termo e a qualidade de cada correspondência (a maior, quando
+		a palavra corresponde de mais de uma forma).
+
+		Input: termo normalizado
+		Output: tupla (array com os códigos das palavras em ordem crescente, array com a qualidade de cada uma)
+		"""
+		start=np.searchsorted(self.vocabulary,term)
+		end=np.searchsorted(self.vocabulary,term+'\U0010ffff') if len(term)>=MIN_PREFIX_LENGTH else start
+		words=[np.arange(start,end)]
+		quality=[np.full(end-start,PREFIX_SCORE)]
+		if start<len(self.vocabulary) and self.vocabulary[start]==term:
+			words.append(np.array([start]))
+			quality.append(np.array([EXACT_SCORE]))
+		if len(term)>=MIN_FUZZY_LENGTH:
+			grams=trigrams(term)
+			codes=np.searchsorted(self.grams,grams)
+			codes=codes[(codes<len(self.grams))&(self.grams[np.minimum(codes,len(self.grams)-1)]==np.array(grams,dtype=object))]
+			candidates,shared=np.unique(self.gram_words[_expand(self.gram_offsets[codes],np.diff(self.gram_offsets)[codes])],return_counts=True)
+			similarity=shared/(len(grams)+self.word_grams[candidates]-shared)
+			similar=similarity>=FUZZY_THRESHOLD
+			words.append(candidates[similar])
+			quality.append(FUZZY_SCORE*similarity[similar])
+		words,quality=np.concatenate(words),np.concatenate(quality)
+		order=np.lexsort((quality,words))
+		words,quality=words[order],quality[order]
+		last=np.r_[words[1:]!=words[:-1],True] if len(words) else np.empty(0,dtype=bool)
+		return words[last],quality[last]
+
+	def _term_scores(self,words,quality,mask=None):
+		"""
+		Esta função retorna os restaurantes que têm alguma das palavras do termo, com a maior pontuação de cada um.
+
+		Input: códigos das palavras e qualidade de cada uma ('matches'), array booleano com os restaurantes aceitos (opcional, None para todos)
+		Output: tupla (array de posições em ordem crescente, array de pontuações)
+		"""
+		lengths=self.offsets[words+1]-self.offsets[words]
+		entries=_expand(self.offsets[words],lengths)
+		rows=self.rows[entries]
+		scores=self.weights[entries]*np.repeat(quality,lengths)
+		if mask is not None:
+			keep=mask[rows]
+			rows,scores=rows[keep],scores[keep]
+		if len(words)==1 or len(rows)==0:
+			# Uma única palavra: as posições já estão em ordem crescente e sem repetição
+			return rows,scores
+		order=np.argsort(rows,kind='stable')
+		rows,scores=rows[order],scores[order]
+		starts=np.flatnonzero(np.r_[True,rows[1:]!=rows[:-1]])
+		return rows[starts],np.maximum.reduceat(scores,starts)
+
+	@profiled()
+	def search(self,selection,query,limit=None):
+		"""
+		Esta função busca os restaurantes da seleção que correspondem a todos os termos da consulta, do mais relevante ao menos relevante
+		(empates pela maior nota, pelo maior número de avaliações e pelo menor ID). Os termos são processados do mais raro ao mais comum,
+		e cada termo só lê as entradas dos restaurantes que ainda podem corresponder à consulta.
+
+		Input: SharedRows (com 'aggregate_rating', 'votes' e 'restaurant_id'), texto da consulta, quantidade máxima de resultados (opcional)
+		Output: tupla (array com as posições dos restaurantes no 'SharedFrame', array com a relevância de cada um, total de restaurantes encontrados)
+		"""
+		if selection.frame.n_rows!=self.n_rows:
+			raise ValueError('o índice de busca e a seleção vêm de versões diferentes dos dados')
+		terms=[self.matches(term) for term in dict.fromkeys(tokenize(query))]
+		if not terms:
+			return np.empty(0,dtype='int32'),np.empty(0),0
+		terms.sort(key=lambda term: int((self.offsets[term[0]+1]-self.offsets[term[0]]).sum()))
+		mask=None
+		if len(selection)<self.n_rows:
+			mask=np.zeros(self.n_rows,dtype=bool)
+			mask[selection.positions]=True
+		rows,scores=self._term_scores(*terms[0],mask)
+		for words,quality in terms[1:]:
+			if len(rows)==0:
+				break
+			mask=np.zeros(self.n_rows,dtype=bool)
+			mask[rows]=True
+			other_rows,other_scores=self._term_scores(words,quality,mask)
+			rows,first,second=np.intersect1d(rows,other_rows,assume_unique=True,return_indices=True)
+			scores=scores[first]+other_scores[second]
+		arrays=selection.frame.arrays
+		order=np.lexsort((arrays['restaurant_id'][rows],-arrays['votes'][rows],-arrays['aggregate_rating'][rows],-scores))
+		if limit is not None:
+			order=order[:limit]
+		return rows[order],scores[order],len(rows)
+
+	def results(self,selection,query,limit=None):
+		"""
+		Esta função retorna a tabela dos restaurantes encontrados por 'search', na ordem da relevância.
+
+		Input: SharedRows, texto da consulta, quantidade máxima de resultados (opcional)
+		Output: tupla (dataframe com as colunas da seleção e a coluna 'score', total de restaurantes encontrados)
+		"""
+		rows,scores,total=self.search(selection,query,limit)
+		return SharedRows(selection.frame,rows,selection.columns).take().assign(score=np.round(scores,2)),total
+
+@st.cache_resource(max_entries=2,show_spinner=False)
+def _load_search_index(path,mtime,version):
+	"""
+	Esta função monta o índice uma única vez por processo e por versão dos dados, a partir do 'SharedFrame' compartilhado.
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza
+	Output: SearchIndex
+	"""
+	return SearchIndex.from_frame(load_shared(path,SEARCH_COLUMNS))
+
+def load_search_index(path=DATASET_PATH):
+	"""
+	Esta função tem como objetivo carregar o índice de busca compartilhado por todas as sessões.
+
+	Input: caminho do arquivo (opcional)
+	Output: SearchIndex
+	"""
+	mtime,version=dataset_version(path)
+	return _load_search_index(path,mtime,version)
@@ -0,0 +1,310 @@
+"""
+Dataframe limpo compartilhado, somente leitura, com filtros por vetores de posições.
+
+O snapshot Feather ('fome_zero.snapshot') é mapeado em memória: as colunas numéricas são arrays do NumPy que apontam diretamente para
+o arquivo, de modo que todas as sessões do processo usam o mesmo objeto ('load_shared') e todos os processos da máquina (réplicas,
+workers) compartilham as mesmas páginas do arquivo no cache do sistema operacional, sem cópias. As colunas de texto viram códigos
+inteiros (um array de int32 por coluna) e a lista ordenada dos valores distintos; só os poucos valores exibidos voltam a ser texto.
+
+Um filtro ('SharedFrame.select') não copia as linhas: retorna um 'SharedRows', que guarda apenas as posições das linhas selecionadas.
+As funções de ranking ('fome_zero.ranking') e as tabelas de restaurantes ('fome_zero.metrics') aceitam um 'SharedRows' no lugar do
+dataframe e só materializam as linhas do resultado.
+
+O 'SharedFrame' é montado uma única vez por versão dos dados, com a união das colunas usadas pelas páginas ('SHARED_COLUMNS'): cada
+página escolhe as suas colunas com 'load_shared(columns=...)', que retorna uma visão com os mesmos arrays, sem copiar nem codificar
+os textos de novo.
+
+Sem snapshot atualizado (ou sem pyarrow), o 'SharedFrame' é montado a partir do dataframe de 'load_data': continua compartilhado
+pelas sessões do processo, mas não entre processos.
+"""
+# Importando as bibliotecas necessárias
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from fome_zero.data import DATASET_PATH, load_data, dataset_version
+from fome_zero.snapshot import is_snapshot_fresh, snapshot_path
+
+try:
+	import pyarrow as pa
+	from pyarrow import feather
+except ImportError:  # pyarrow é opcional: sem ele o 'SharedFrame' é montado a partir do dataframe
+	pa=None
+	feather=None
+
+
+# Colunas do dataframe compartilhado: a união das colunas usadas pelas páginas
+SHARED_COLUMNS=['restaurant_id','restaurant_name','country_name','city','address','locality','locality_verbose','cuisines','cuisine_list','aggregate_rating','votes']
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def _encode(values):
+	"""
+	Esta função converte uma coluna de texto em códigos inteiros. Os valores distintos ficam em ordem alfabética, para que a ordem dos
+	códigos seja a mesma ordem dos textos (usada nos desempates).
+
+	Input: array de textos
+	Output: tupla (array de códigos int32, array com os valores distintos)
+	"""
+	codes,categories=pd.factorize(values,sort=True)
+	return codes.astype('int32'),np.asarray(categories,dtype=object)
+
+def _sort_key(values,ascending):
+	"""
+	Esta função retorna a chave de ordenação crescente de uma coluna numérica (os valores negados para a ordem decrescente).
+
+	Input: array numérico, ordem crescente
+	Output: array
+	"""
+	if ascending:
+		return values
+	if np.issubdtype(values.dtype,np.unsignedinteger):
+		values=values.astype('int64')
+	return -values
+
+def group_extremes(codes,values,ties,n_groups):
+	"""
+	Esta função encontra, para cada código de grupo, a posição do maior e a do menor valor, desempatando pelo menor valor de 'ties'.
+
+	Input: array de códigos dos grupos (de 0 a 'n_groups'-1), array de valores, array de desempate, número de grupos
+	Output: dict com as chaves 'maior' e 'menor', cada uma com as posições escolhidas (uma por grupo presente, em ordem de código)
+	"""
+	# As posições ficam agrupadas pelo código do grupo (ordenação estável de inteiros) e o menor valor da chave de cada grupo sai de
+	# um único 'reduceat'; só as posições empatadas com esse valor são ordenadas pelo desempate
+	grouped=np.argsort(codes,kind='stable')
+	starts=np.flatnonzero(np.r_[True,codes[grouped][1:]!=codes[grouped][:-1]]) if len(codes) else np.empty(0,dtype='int64')
+	result={}
+	for parameter,key in (('maior',_sort_key(values,False)),('menor',values)):
+		best=np.zeros(n_groups,dtype=key.dtype)
+		if len(codes):
+			best[codes[grouped[starts]]]=np.minimum.reduceat(key[grouped],starts)
+		candidates=np.flatnonzero(key==best[codes])
+		order=candidates[np.lexsort((ties[candidates],codes[candidates]))]
+		result[parameter]=order[np.r_[True,codes[order][1:]!=codes[order][:-1]]] if len(order) else order
+	return result
+
+class SharedFrame:
+	"""
+	Colunas somente leitura do dataframe limpo: arrays numéricos (sem cópia quando vêm do snapshot mapeado em memória) e colunas de
+	texto codificadas ('codes' e 'categories').
+	"""
+
+	def __init__(self,arrays,categories,n_rows):
+		self.arrays=arrays
+		self.categories=categories
+		self.n_rows=n_rows
+		self.columns=list(arrays)
+
+	@classmethod
+	def from_table(cls,table):
+		"""
+		Esta função monta o 'SharedFrame' a partir de uma tabela do Arrow. As colunas numéricas com um único bloco e sem nulos são
+		usadas sem cópia.
+
+		Input: pyarrow.Table
+		Output: SharedFrame
+		"""
+		arrays={}
+		categories={}
+		for name in table.column_names:
+			column=table.column(name)
+			if (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)) and column.null_count==0:
+				arrays[name]=column.to_numpy()
+			else:
+				arrays[name],categories[name]=_encode(column.to_numpy(zero_copy_only=False))
+		return cls(arrays,categories,table.num_rows)
+
+	@classmethod
+	def from_frame(cls,df):
+		"""
+		Esta função monta o 'SharedFrame' a partir de um dataframe (as colunas numéricas são as do próprio dataframe).
+
+		Input: dataframe limpo
+		Output: SharedFrame
+		"""
+		arrays={}
+		categories={}
+		for name in df.columns:
+			if pd.api.types.is_numeric_dtype(df[name]) and not pd.api.types.is_bool_dtype(df[name]):
+				arrays[name]=df[name].to_numpy()
+			else:
+				arrays[name],categories[name]=_encode(df[name].to_numpy())
+		return cls(arrays,categories,len(df))
+
+	@property
+	def nbytes(self):
+		return sum(array.nbytes for array in self.arrays.values())
+
+	def view(self,columns):
+		"""
+		Esta função retorna um 'SharedFrame' com apenas as colunas informadas, sobre os mesmos arrays (sem cópia).
+
+		Input: lista de colunas
+		Output: SharedFrame
+		"""
+		return SharedFrame({name:self.arrays[name] for name in columns},{name:self.categories[name] for name in columns if name in self.categories},self.n_rows)
+
+	def unique(self,name):
+		"""
+		Esta função retorna os valores distintos de uma coluna de texto na ordem em que aparecem (como 'Series.unique').
+
+		Input: nome da coluna
+		Output: array de valores
+		"""
+		_,first=np.unique(self.arrays[name],return_index=True)
+		return self.categories[name][self.arrays[name][np.sort(first)]]
+
+	def decode(self,name,positions):
+		"""
+		Esta função retorna os valores de uma coluna nas posições informadas (as colunas de texto voltam a ser texto).
+
+		Input: nome da coluna, array de posições
+		Output: array de valores
+		"""
+		values=self.arrays[name][positions]
+		if name in self.categories:
+			return self.categories[name][values]
+		return values
+
+	def select(self,name,values):
+		"""
+		Esta função filtra as linhas em que a coluna de texto 'name' tem um dos valores informados, sem copiar as linhas.
+
+		Input: nome da coluna (por exemplo 'country_name'), lista de valores
+		Output: SharedRows com as posições em ordem crescente
+		"""
+		# Tabela dos códigos selecionados: o filtro é uma única consulta por linha, sem comparar textos
+		wanted=np.isin(self.categories[name],list(values))
+		return SharedRows(self,np.flatnonzero(wanted[self.arrays[name]]),self.columns)
+
+	def all_rows(self):
+		"""
+		Esta função retorna a seleção com todas as linhas.
+		"""
+		return SharedRows(self,np.arange(self.n_rows),self.columns)
+
+class SharedRows:
+	"""
+	Seleção de linhas de um 'SharedFrame', guardada apenas como o vetor das posições (e a lista de colunas visíveis).
+	"""
+
+	def __init__(self,frame,positions,columns):
+		self.frame=frame
+		self.positions=positions
+		self.columns=list(columns)
+
+	def __len__(self):
+		return len(self.positions)
+
+	def __getitem__(self,columns):
+		return SharedRows(self.frame,self.positions,columns)
+
+	@property
+	def empty(self):
+		return len(self.positions)==0
+
+	@property
+	def shape(self):
+		return (len(self.positions),len(self.columns))
+
+	@property
+	def nbytes(self):
+		return self.positions.nbytes
+
+	def values(self,name):
+		"""
+		Esta função retorna a coluna nas linhas selecionadas (as colunas de texto como códigos, que seguem a ordem alfabética).
+
+		Input: nome da coluna
+		Output: array
+		"""
+		return self.frame.arrays[name][self.positions]
+
+	def take(self,rows=None):
+		"""
+		Esta função materializa as linhas informadas (posições relativas à seleção) em um dataframe, indexado pela posição original.
+
+		Input: array de posições na seleção (opcional, None para todas)
+		Output: dataframe com as colunas visíveis
+		"""
+		positions=self.positions if rows is None else self.positions[rows]
+		return pd.DataFrame({name:self.frame.decode(name,positions) for name in self.columns},index=positions)
+
+	def top_k(self,k,by,ascending=False,tie='restaurant_id'):
+		"""
+		Esta função é o 'top_k' do 'fome_zero.ranking' sobre a seleção: seleção parcial com 'np.partition' e ordenação apenas dos candidatos.
+
+		Input: quantidade de linhas, coluna de ordenação, ordem crescente (opcional), coluna de desempate (opcional)
+		Output: dataframe com até 'k' linhas, já ordenado
+		"""
+		if k<=0 or self.empty:
+			return self.take(np.empty(0,dtype='int64'))
+		key=_sort_key(self.values(by),ascending)
+		if k<len(key):
+			# Candidatos: todas as linhas empatadas com a k-ésima, como em 'nlargest(keep='all')'
+			kth=np.partition(key,k-1)[k-1]
+			candidates=np.flatnonzero(key<=kth)
+		else:
+			candidates=np.arange(len(key))
+		order=np.lexsort((self.values(tie)[candidates],key[candidates]))
+		return self.take(candidates[order[:k]])
+
+	def group_sum(self,group,value):
+		"""
+		Esta função soma a coluna 'value' por valor da coluna de texto 'group' (como 'groupby(group)[value].sum().reset_index()').
+
+		Input: coluna do grupo, coluna somada
+		Output: dataframe com as colunas 'group' e 'value', em ordem alfabética do grupo
+		"""
+		codes=self.values(group)
+		size=len(self.frame.categories[group])
+		values=self.values(value)
+		sums=np.bincount(codes,weights=values,minlength=size)
+		present=np.bincount(codes,minlength=size)>0
+		if np.issubdtype(values.dtype,np.integer):
+			sums=np.rint(sums).astype(values.dtype)
+		return pd.DataFrame({group:self.frame.categories[group][present],value:sums[present]})
+
+	def best_worst(self,group,groups=None,value='aggregate_rating',tie='restaurant_id'):
+		"""
+		Esta função é o 'best_worst' do 'fome_zero.ranking' sobre a seleção: a linha com o maior e a com o menor valor de cada grupo,
+		desempatando pela coluna 'tie' em ordem crescente.
+
+		Input: coluna do grupo, lista de grupos desejados (opcional), coluna do valor (opcional), coluna de desempate (opcional)
+		Output: dict com as chaves 'maior' e 'menor', cada uma com um dataframe indexado pelo grupo
+		"""
+		rows=np.arange(len(self.positions))
+		codes=self.values(group)
+		if groups is not None:
+			wanted=np.isin(self.frame.categories[group],list(groups))
+			rows=rows[wanted[codes]]
+		extremes=group_extremes(codes[rows],self.values(value)[rows],self.values(tie)[rows],len(self.frame.categories[group]))
+		return {parameter:self.take(rows[first]).set_index(group) for parameter,first in extremes.items()}
+
+@st.cache_resource(max_entries=2,show_spinner=False)
+def _load_shared(path,mtime,version):
+	"""
+	Esta função abre o snapshot mapeado em memória (ou, sem snapshot atualizado, converte o dataframe de 'load_data') com as colunas de
+	'SHARED_COLUMNS', uma única vez por processo e por versão dos dados.
+
+	Input: caminho do arquivo, data de modificação do arquivo, versão da limpeza
+	Output: SharedFrame
+	"""
+	if feather is not None and is_snapshot_fresh(path,version):
+		return SharedFrame.from_table(feather.read_table(snapshot_path(path),columns=SHARED_COLUMNS,memory_map=True))
+	return SharedFrame.from_frame(load_data(path,columns=SHARED_COLUMNS))
+
+def load_shared(path=DATASET_PATH,columns=None):
+	"""
+	Esta função tem como objetivo carregar o dataframe limpo compartilhado, somente leitura, para ser filtrado por posições.
+	Todas as páginas usam o mesmo 'SharedFrame'; 'columns' (um subconjunto de 'SHARED_COLUMNS') escolhe as colunas visíveis, sem cópia.
+
+	Input: caminho do arquivo (opcional), lista de colunas (opcional)
+	Output: SharedFrame
+	"""
+	mtime,version=dataset_version(path)
+	frame=_load_shared(path,mtime,version)
+	return frame if columns is None else frame.view(columns)
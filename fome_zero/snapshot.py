@@ -0,0 +1,112 @@
+"""
+Leitura e escrita do snapshot colunar (Arrow IPC / Feather) do dataframe limpo.
+
+O snapshot fica ao lado do arquivo CSV e guarda, nos metadados do esquema, o hash SHA-256 do CSV de origem e a versão da limpeza.
+Ele só é usado quando os dois conferem; caso contrário o carregamento volta a ler o CSV.
+
+Para gerar o snapshot: python -m fome_zero.snapshot
+"""
+# Importando as bibliotecas necessárias
+import hashlib
+import os
+
+try:
+	import pyarrow as pa
+	from pyarrow import feather
+except ImportError:  # pyarrow é opcional: sem ele o dashboard lê sempre o CSV
+	pa=None
+	feather=None
+
+
+# Chaves usadas nos metadados do snapshot
+HASH_KEY=b'fome_zero.source_sha256'
+VERSION_KEY=b'fome_zero.clean_version'
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def snapshot_path(csv_path):
+	"""
+	Esta função retorna o caminho do snapshot correspondente a um arquivo CSV (mesmo nome, extensão '.feather').
+
+	Input: caminho do CSV
+	Output: str (caminho do snapshot)
+	"""
+	return os.path.splitext(csv_path)[0]+'.feather'
+
+def file_hash(path,block_size=1<<20):
+	"""
+	Esta função calcula o hash SHA-256 do conteúdo de um arquivo, lendo-o em blocos.
+
+	Input: caminho do arquivo, tamanho do bloco em bytes (opcional)
+	Output: str (hash em hexadecimal)
+	"""
+	digest=hashlib.sha256()
+	with open(path,'rb') as file:
+		for block in iter(lambda: file.read(block_size),b''):
+			digest.update(block)
+	return digest.hexdigest()
+
+def write_snapshot(df,csv_path,version):
+	"""
+	Esta função grava o dataframe limpo em um snapshot Feather não comprimido (para que possa ser mapeado em memória), junto com o hash do CSV de origem e a versão da limpeza.
+	O arquivo é escrito em um arquivo temporário e depois renomeado, para que leitores nunca vejam um snapshot pela metade.
+
+	Input: dataframe limpo, caminho do CSV de origem, versão da limpeza
+	Output: str (caminho do snapshot)
+	"""
+	if pa is None:
+		raise ImportError('pyarrow é necessário para gerar o snapshot')
+	path=snapshot_path(csv_path)
+	table=pa.Table.from_pandas(df,preserve_index=False)
+	metadata=dict(table.schema.metadata or {})
+	metadata[HASH_KEY]=file_hash(csv_path).encode()
+	metadata[VERSION_KEY]=str(version).encode()
+	table=table.replace_schema_metadata(metadata)
+	tmp_path=path+'.tmp'
+	# Um único bloco por coluna, para que cada coluna numérica possa ser lida como um array contínuo sem cópia ('fome_zero.shared')
+	feather.write_feather(table,tmp_path,compression='uncompressed',chunksize=max(table.num_rows,1))
+	os.replace(tmp_path,path)
+	return path
+
+def is_snapshot_fresh(csv_path,version):
+	"""
+	Esta função verifica se existe um snapshot atualizado para o CSV: o hash do CSV e a versão da limpeza devem ser iguais aos gravados no snapshot.
+	Apenas o esquema do snapshot é lido, não os dados.
+
+	Input: caminho do CSV, versão da limpeza
+	Output: bool
+	"""
+	path=snapshot_path(csv_path)
+	if pa is None or not os.path.exists(path):
+		return False
+	try:
+		with pa.memory_map(path) as source:
+			metadata=pa.ipc.open_file(source).schema.metadata or {}
+	except (OSError,pa.ArrowInvalid):
+		return False
+	return (metadata.get(VERSION_KEY)==str(version).encode()
+			and metadata.get(HASH_KEY)==file_hash(csv_path).encode())
+
+def read_snapshot(csv_path,version,columns=None):
+	"""
+	Esta função lê o snapshot do CSV, mapeado em memória, apenas com as colunas pedidas.
+	As colunas numéricas apontam diretamente para o arquivo mapeado (sem cópia) e, por isso, são somente leitura.
+
+	Input: caminho do CSV, versão da limpeza, lista de colunas (opcional, None para todas)
+	Output: dataframe limpo, ou None quando o snapshot não existe ou está desatualizado
+	"""
+	if not is_snapshot_fresh(csv_path,version):
+		return None
+	table=feather.read_table(snapshot_path(csv_path),columns=columns,memory_map=True)
+	return table.to_pandas(split_blocks=True)
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+if __name__=='__main__':
+	from fome_zero.data import build_snapshot
+
+	print(build_snapshot())
@@ -0,0 +1,146 @@
+"""
+Leitura do CSV em blocos, para exportações maiores que a memória disponível.
+
+Cada bloco de 'CHUNK_ROWS' linhas é limpo com as mesmas regras de 'clean_data' (renomear, remover nulos, remover duplicados e criar as
+colunas derivadas) e alimenta agregados incrementais: o cubo ('fome_zero.cube') e os restaurantes candidatos das tabelas
+('fome_zero.metrics'), que são combinados a cada bloco. As linhas duplicadas são removidas entre blocos por um conjunto ordenado com o
+hash de cada linha (8 bytes por linha distinta). Assim a memória usada é limitada pelo tamanho do bloco mais o estado dos agregados,
+e nunca pelo tamanho do arquivo.
+
+O resultado é um 'SharedAggregates', que responde a todas as métricas das páginas ('dashboard_metrics') e pode gerar os snapshots:
+
+Uso: python -m fome_zero.stream dataset/exportacao.csv [--chunksize 100000] [--snapshots dataset/metrics --max-size 2]
+"""
+# Importando as bibliotecas necessárias
+import argparse
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.data import DATASET_PATH, rename_columns, derive_columns
+from fome_zero.cube import build_cube, merge_cubes
+from fome_zero.metrics import SharedAggregates, restaurant_candidates, merge_candidates, default_selections, write_snapshots
+from fome_zero.profiling import profiled
+
+
+# Linhas lidas do CSV em cada bloco
+CHUNK_ROWS=100_000
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+class DigestSet:
+	"""
+	Conjunto dos hashes (uint64) das linhas já vistas, guardado como um array ordenado: a busca é binária e cada hash ocupa 8 bytes.
+	"""
+
+	def __init__(self):
+		self.digests=np.empty(0,dtype='uint64')
+
+	def __len__(self):
+		return len(self.digests)
+
+	def add(self,digests):
+		"""
+		Esta função adiciona os hashes de um bloco ao conjunto e indica quais linhas são novas: as que não foram vistas em blocos
+		anteriores e a primeira ocorrência de cada hash dentro do bloco (como em 'drop_duplicates').
+
+		Input: array de hashes do bloco
+		Output: array booleano (True para as linhas novas)
+		"""
+		digests=np.asarray(digests,dtype='uint64')
+		_,first=np.unique(digests,return_index=True)
+		new=np.zeros(len(digests),dtype=bool)
+		new[first]=True
+		if len(self.digests):
+			positions=np.minimum(np.searchsorted(self.digests,digests),len(self.digests)-1)
+			new&=self.digests[positions]!=digests
+		self.digests=np.union1d(self.digests,digests[new])
+		return new
+
+def row_digests(df):
+	"""
+	Esta função calcula um hash de 64 bits do conteúdo de cada linha. As colunas numéricas são convertidas para float64 antes,
+	para que a mesma linha tenha o mesmo hash em blocos em que a coluna foi lida como int ou como float.
+
+	Input: dataframe
+	Output: array de hashes (uint64)
+	"""
+	numeric=df.select_dtypes('number').columns
+	return pd.util.hash_pandas_object(df.astype({col:'float64' for col in numeric}),index=False).to_numpy()
+
+@profiled()
+def clean_chunk(chunk,seen):
+	"""
+	Esta função limpa um bloco do CSV com as regras de 'clean_data', removendo também as linhas iguais a linhas de blocos anteriores.
+	Ao contrário de 'clean_data', o bloco não é ordenado pelo ID dos restaurantes.
+
+	Input: bloco do CSV (dataframe bruto), conjunto dos hashes já vistos (DigestSet)
+	Output: bloco limpo
+	"""
+	chunk=rename_columns(chunk)
+	chunk=chunk.dropna()
+	chunk=chunk.loc[seen.add(row_digests(chunk))].reset_index(drop=True)
+	return derive_columns(chunk)
+
+def iter_clean_chunks(path=DATASET_PATH,chunksize=CHUNK_ROWS):
+	"""
+	Esta função lê o CSV em blocos e retorna, um a um, os blocos limpos e sem linhas repetidas entre eles.
+
+	Input: caminho do CSV (opcional), linhas por bloco (opcional)
+	Output: gerador de dataframes limpos
+	"""
+	seen=DigestSet()
+	for chunk in pd.read_csv(path,chunksize=chunksize):
+		chunk=clean_chunk(chunk,seen)
+		if len(chunk):
+			yield chunk
+
+@profiled()
+def stream_aggregates(path=DATASET_PATH,chunksize=CHUNK_ROWS):
+	"""
+	Esta função monta os agregados das páginas lendo o CSV em blocos: o cubo e os candidatos das tabelas de cada bloco são combinados
+	com os dos blocos anteriores, e as linhas do bloco são descartadas em seguida.
+
+	Input: caminho do CSV (opcional), linhas por bloco (opcional)
+	Output: SharedAggregates (com o atributo 'rows', a quantidade de linhas limpas)
+	"""
+	# O primeiro item de cada lista é o estado já combinado e os demais são os blocos pendentes. Os pendentes só são combinados quando
+	# passam do tamanho do estado, de modo que cada grupo é recombinado poucas vezes (e a memória fica limitada a cerca do dobro do estado)
+	cubes=[]
+	candidates=[]
+	rows=0
+	for chunk in iter_clean_chunks(path,chunksize):
+		rows+=len(chunk)
+		cubes.append(build_cube(chunk))
+		candidates.append(restaurant_candidates(chunk))
+		if len(cubes)>1 and sum(len(cube) for cube in cubes[1:])>=len(cubes[0]):
+			cubes=[merge_cubes(cubes)]
+			candidates=[merge_candidates(candidates)]
+	shared=SharedAggregates(merge_cubes(cubes),candidates=merge_candidates(candidates))
+	shared.rows=rows
+	return shared
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+if __name__=='__main__':
+	parser=argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('path',nargs='?',default=DATASET_PATH)
+	parser.add_argument('--chunksize',type=int,default=CHUNK_ROWS)
+	parser.add_argument('--snapshots',help='pasta onde os snapshots das métricas são gravados (opcional)')
+	parser.add_argument('--max-size',type=int,default=1,help='tamanho máximo das combinações de países nos snapshots')
+	args=parser.parse_args()
+
+	start=time.perf_counter()
+	shared=stream_aggregates(args.path,args.chunksize)
+	print(f'{shared.rows} linhas limpas, {len(shared.cube)} grupos no cubo em {time.perf_counter()-start:.1f} s')
+	if args.snapshots:
+		total=write_snapshots(args.snapshots,default_selections(shared.countries,args.max_size),path=args.path,shared=shared)
+		print(f'{total} seleções gravadas em {args.snapshots}')
+	# ru_maxrss é informado em KB no Linux
+	print(f'pico de memória do processo: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024:.0f} MB')
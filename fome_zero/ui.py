@@ -0,0 +1,61 @@
+"""
+Componentes de interface compartilhados pelas páginas do dashboard.
+"""
+# Importando as bibliotecas necessárias
+import pandas as pd
+import streamlit as st
+
+
+# Chaves do st.session_state usadas pelo painel de depuração
+DEBUG_KEY='painel_depuracao'
+MEMORY_KEY='painel_depuracao_memoria'
+
+
+# =====================================================
+# FUNÇÕES
+# =====================================================
+
+def trace_memory_enabled():
+	"""
+	Esta função indica se o usuário pediu a medição de memória no painel de depuração. Deve ser lida no início da página, antes de 'start_profiling'.
+
+	Input: None
+	Output: bool
+	"""
+	return bool(st.session_state.get(DEBUG_KEY,False) and st.session_state.get(MEMORY_KEY,False))
+
+def debug_panel(memo=None,figures=None):
+	"""
+	Esta função mostra, na barra lateral e apenas quando o usuário ativa a opção, os contadores do cache de seleções e do cache de figuras
+	(acertos, falhas, memória ocupada) e reserva o espaço onde os tempos de cada etapa serão mostrados ao final da página (veja 'profiling_panel').
+
+	Input: cache de seleções (SelectionCache, opcional), cache de figuras (FigureCache, opcional)
+	Output: container da barra lateral para os tempos, ou None quando o painel está desativado
+	"""
+	if not st.sidebar.checkbox('Mostrar painel de depuração',value=False,key=DEBUG_KEY):
+		return None
+	for title,cache in (('Cache de seleções',memo),('Cache de figuras',figures)):
+		if cache is not None:
+			with st.sidebar.expander(title,expanded=True):
+				stats=pd.Series(cache.stats(),name='valor')
+				st.dataframe(stats)
+	st.sidebar.checkbox('Medir pico de memória (mais lento)',value=False,key=MEMORY_KEY)
+	return st.sidebar.container()
+
+def profiling_panel(profiler,panel):
+	"""
+	Esta função encerra a medição da execução da página e, se o painel de depuração estiver ativo, mostra o tempo, as linhas e o pico de memória de cada etapa.
+	Deve ser chamada no final da página, depois de todas as etapas.
+
+	Input: Profiler, container retornado por 'debug_panel' (ou None)
+	Output: None
+	"""
+	profiler.finish()
+	if panel is None:
+		return
+	with panel.expander('Tempos de execução',expanded=True):
+		st.caption(f'Total: {profiler.total*1000:.1f} ms')
+		records=pd.DataFrame(profiler.records,columns=['stage','depth','seconds','rows_in','rows_out','peak_kb'])
+		records['stage']=['· '*depth+name for depth,name in zip(records['depth'],records['stage'])]
+		records['ms']=(records['seconds']*1000).round(2)
+		st.dataframe(records.loc[:,['stage','ms','rows_in','rows_out','peak_kb']],hide_index=True)
@@ -1,143 +1,37 @@
 # Importando as bibliotecas necessárias
-import pandas as pd
 import streamlit as st
 import folium
-from streamlit_folium import folium_static
-import inflection
+from streamlit_folium import st_folium
+
+from fome_zero.shared import load_shared
+from fome_zero.header import HEADER_COLUMNS, load_header_totals, approx_enabled
+from fome_zero.geo import load_geo, central_spot, normalize_bounds, WORLD_BOUNDS
+from fome_zero.coverage import load_coverage_grid, coverage_layer
+from fome_zero.ui import debug_panel, profiling_panel, trace_memory_enabled
+from fome_zero.profiling import start_profiling, stage
 
 
 st.set_page_config(page_title='Visão Geral', page_icon='👍',layout='wide')
 
+# Medição do tempo de cada etapa desta execução (mostrada no painel de depuração)
+profiler=start_profiling('Visão Geral',trace_memory=trace_memory_enabled())
 
-# =====================================================
-# FUNÇÕES
-# =====================================================
 
-def rename_columns(df):
-    """
-    Esta função tem como objetivo renomear as colunas do dataframe, modificando elas para o modo Snake Case, ou seja, com letras minúsculas, separadas por '_'.
-    
-    Input: dataframe a modificar(df)
-    Output: dataframe modificado (dataframe) 
-    """
-    dataframe=df.copy()
-    cols_old=dataframe.columns
-    spaces= lambda x: x.replace(" ","")
-    snakecase= lambda x: inflection.underscore(x)
-    title=lambda x: inflection.titleize(x)
-    cols_old=list(map(title,cols_old))
-    cols_old=list(map(spaces,cols_old))
-    cols_new=list(map(snakecase,cols_old))
-    dataframe.columns=cols_new
-    return dataframe
-
-def country_name(country_id):
-    COUNTRIES={
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America",
-    }
-
-    return COUNTRIES[country_id]
-
-def create_price_type (price_range):
-	"""
-	Esta função tem como objetivo classificar os restaurantes a partir do valor do preço dos pratos.
-	
-	Input: valor numérico
-	Output: string com a classificação
-	"""
-	if price_range==1:
-		return 'cheap'
-	elif price_range==2:
-		return 'normal'
-	elif price_range==3:
-		return 'expensive'
-	else:
-		return 'gourmet'
-	
-def color_name(color_code):
-    COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-    }
-    return COLORS[color_code]
-
-def clean_data(df):
-	""" 
-	Esta função tem como objetivo limpar o dataframe para que ele fique mais fácil de ser manipulado. 
-	
-	As seguintes etapas são realizadas:
-	1. Renomear todas as colunas a partir da função 'rename_columns'
-	2. Limpar os valores nulos 
-	3. Remover os valores duplicados
-	4. Criar uma nova coluna com o nome dos países usando a função 'country_name'
-	5. Criar uma categoria de preço usando a função 'create_price_type'
-	6. Trocar os códigos das cores pelos nomes delas utilizando a função 'color_name'
-	7. Categorizar todos os restaurantes por apenas um tipo de culinária
-	8. Ordenar o dataframe pelo número do ID dos restaurantes, para que o primeiro seja sempre o mais antigo (menor ID)
-	
-	Input: dataframe
-	Output: dataframe modificado
-	"""
-	df=rename_columns(df)
-	df=df.dropna()
-	df=df.drop_duplicates(ignore_index=True)
-	df['country_name']=list(map(country_name,df['country_code']))
-	df['price_type']=list(map(create_price_type,df['price_range']))
-	df['rating_color']=list(map(color_name,df['rating_color']))
-	df['cuisines']=df.loc[:,'cuisines'].apply(lambda x: x.split(',')[0])
-	df=df.sort_values('restaurant_id',ascending=1).reset_index(drop=True)
-	return df
-
-def central_spot(df):
-    """ Esta função retorna um mapa da localização central dos pedidos feitos em cada cidade por cada tipo de tráfego.
-    A função agrupa o dataframe por cidade e tipo de tráfego e faz a mediana da latitude e da longitude dos restaurantes em cada condição. Esses dados são plotados e é criado um mapa com os pontos.
-    Input: dataframe
-    Output: mapa
-    """
-    df_aux1=(df
-             .loc[:,['latitude','city','country_name','restaurant_id']]
-             .groupby(['country_name','city','restaurant_id'])
-             .median()
-             .reset_index()) 
-    df_aux2=(df
-             .loc[:,['longitude','city','country_name','restaurant_id']]
-             .groupby(['country_name','city','restaurant_id'])
-             .median()
-             .reset_index())
-    df_aux=pd.merge(df_aux1,df_aux2,how='inner')
-    map=folium.Map()
-    for i in range(len(df_aux)):
-             folium.Marker(
-                 [df_aux.loc[i,'latitude'],df_aux.loc[i,'longitude']],
-                 popup=df_aux.loc[i,['city','country_name','restaurant_id']]).add_to(map)
-    return map
 # -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
 
 
-# Carregando o meu arquivo
-df_raw=pd.read_csv('dataset/zomato.csv')
+# Carregando os dados compartilhados (mapeados em memória uma única vez por máquina) e os totais de cada país dos indicadores do cabeçalho
+df=load_shared(columns=HEADER_COLUMNS)
+header=load_header_totals()
+
+# Carregando as coordenadas dos restaurantes e o índice espacial do mapa (montado uma única vez por processo)
+geo_df,geo_index=load_geo()
 
-# Limpando os dados
-df=clean_data(df_raw)
+# Carregando a grade de cobertura de entrega de cada nível de zoom (montada uma única vez por processo)
+coverage=load_coverage_grid()
+
+# Camadas do mapa: os restaurantes agrupados ou a cobertura de um indicador de entrega
+MAP_LAYERS={'Restaurantes':None,'Cobertura de entrega online':'has_online_delivery','Restaurantes entregando agora':'is_delivering_now'}
 
 
 # VISÃO GERAL
@@ -150,11 +44,14 @@ df=clean_data(df_raw)
 
 # Filtros
 
-countries=df['country_name'].unique()
+countries=df.unique('country_name')
 st.sidebar.subheader('Filtros')
 data_selected=st.sidebar.multiselect('Por quais países você deseja navegar?',countries,countries)
+map_layer=st.sidebar.radio('O que você quer ver no mapa?',list(MAP_LAYERS))
 st.sidebar.markdown('---')
 
+panel=debug_panel()
+
 st.sidebar.caption('Developed by Camila Duarte')
 
 # =====================================================
@@ -171,20 +68,40 @@ with st.container():
 
 with st.container():
 	st.markdown('Conheça os nossos números:')
+	# Indicadores dos países selecionados, combinando os totais de cada país
+	with stage('header_totals'):
+		totals=header.totals(data_selected,approx_enabled())
 	col1,col2,col3,col4,col5=st.columns(5)
 	with col1:
-		st.metric('Restaurantes',df['restaurant_id'].nunique())
+		st.metric('Restaurantes',totals['restaurantes'])
 	with col2:
-		st.metric('Países',df['country_code'].nunique())
+		st.metric('Países',totals['paises'])
 	with col3:
-		st.metric('Cidades',df['city'].nunique())
+		st.metric('Cidades',totals['cidades'])
 	with col4:
-		st.metric('Total de avaliações',df['votes'].nunique())		
+		st.metric('Total de avaliações',totals['avaliacoes'])
 	with col5:
-		st.metric('Tipos de culinária',df['cuisines'].nunique())
+		st.metric('Tipos de culinária',totals['culinarias'])
 	
 	st.markdown('Restaurantes onde o nosso serviço está disponível:')
-	#fig=central_spot(df)
-	fig=folium.Map()
-	folium_static(fig)
-	
\ No newline at end of file
+	# Área visível e zoom da última interação com o mapa. O mapa base é sempre o mesmo e apenas a camada de restaurantes é trocada.
+	view=st.session_state.get('mapa_geral_view',(WORLD_BOUNDS,2))
+	metric=MAP_LAYERS[map_layer]
+	if metric is None:
+		layer=central_spot(geo_df,geo_index,data_selected,*view)
+	else:
+		layer=coverage_layer(coverage.cells(data_selected,*view),metric,map_layer)
+		st.caption('Cada quadrado agrupa os restaurantes da região: a cor vai de vermelho (nenhum restaurante com o serviço) a verde (todos), '
+					'e quanto mais restaurantes, mais forte a cor.')
+	base=folium.Map(location=[20,0],zoom_start=2,min_zoom=2)
+	with stage('st_folium'):
+		value=st_folium(base,key='mapa_geral',width=1200,height=550,returned_objects=['bounds','zoom'],feature_group_to_add=layer)
+	profiling_panel(profiler,panel)
+	if value:
+		new_view=(normalize_bounds(value.get('bounds')),value.get('zoom') or 2)
+		if new_view!=view:
+			st.session_state['mapa_geral_view']=new_view
+			# A camada do mundo inteiro já contém qualquer área no mesmo zoom (como a primeira área informada pelo mapa, ainda sem
+			# interação): só recalcula a camada quando o usuário mudou o zoom ou moveu o mapa a partir de uma área menor
+			if view[0]!=WORLD_BOUNDS or new_view[1]!=view[1]:
+				st.experimental_rerun()
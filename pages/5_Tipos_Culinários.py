@@ -1,123 +1,36 @@
 # Importando as bibliotecas necessárias
-import pandas as pd
 import streamlit as st
-import inflection
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.express as px
 
+from fome_zero.shared import load_shared
+from fome_zero.cuisines import load_cuisine_index, load_cuisine_ranking
+from fome_zero.cube import load_cube, CubeView
+from fome_zero.memo import get_selection_cache, selection_key
+from fome_zero.ui import debug_panel, profiling_panel, trace_memory_enabled
+from fome_zero.profiling import start_profiling
+from fome_zero.panels import PanelScheduler
+from fome_zero.metrics import CUISINES, LEADERBOARD_MIN_VOTES, cuisine_leaderboard, top_rated_cuisine, top_delivering_cuisine
 
-st.set_page_config(page_title='Visão Tipos Culinários', page_icon='🛎',layout='wide')
-
-
-# =====================================================
-# FUNÇÕES
-# =====================================================
 
-def rename_columns(df):
-    """
-    Esta função tem como objetivo renomear as colunas do dataframe, modificando elas para o modo Snake Case, ou seja, com letras minúsculas, separadas por '_'.
-    
-    Input: dataframe a modificar(df)
-    Output: dataframe modificado (dataframe) 
-    """
-    dataframe=df.copy()
-    cols_old=dataframe.columns
-    spaces= lambda x: x.replace(" ","")
-    snakecase= lambda x: inflection.underscore(x)
-    title=lambda x: inflection.titleize(x)
-    cols_old=list(map(title,cols_old))
-    cols_old=list(map(spaces,cols_old))
-    cols_new=list(map(snakecase,cols_old))
-    dataframe.columns=cols_new
-    return dataframe
-
-def country_name(country_id):
-    COUNTRIES={
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America",
-    }
-
-    return COUNTRIES[country_id]
-
-def create_price_type (price_range):
-	"""
-	Esta função tem como objetivo classificar os restaurantes a partir do valor do preço dos pratos.
-	
-	Input: valor numérico
-	Output: string com a classificação
-	"""
-	if price_range==1:
-		return 'cheap'
-	elif price_range==2:
-		return 'normal'
-	elif price_range==3:
-		return 'expensive'
-	else:
-		return 'gourmet'
-	
-def color_name(color_code):
-    COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-    }
-    return COLORS[color_code]
-
-def clean_data(df):
-	""" 
-	Esta função tem como objetivo limpar o dataframe para que ele fique mais fácil de ser manipulado. 
-	
-	As seguintes etapas são realizadas:
-	1. Renomear todas as colunas a partir da função 'rename_columns'
-	2. Limpar os valores nulos 
-	3. Remover os valores duplicados
-	4. Criar uma nova coluna com o nome dos países usando a função 'country_name'
-	5. Criar uma categoria de preço usando a função 'create_price_type'
-	6. Trocar os códigos das cores pelos nomes delas utilizando a função 'color_name'
-	7. Categorizar todos os restaurantes por apenas um tipo de culinária
-	8. Ordenar o dataframe pelo número do ID dos restaurantes, para que o primeiro seja sempre o mais antigo (menor ID)
-	
-	Input: dataframe
-	Output: dataframe modificado
-	"""
-	df=rename_columns(df)
-	df=df.dropna()
-	df=df.drop_duplicates(ignore_index=True)
-	df['country_name']=list(map(country_name,df['country_code']))
-	df['price_type']=list(map(create_price_type,df['price_range']))
-	df['rating_color']=list(map(color_name,df['rating_color']))
-	df['cuisines']=df.loc[:,'cuisines'].apply(lambda x: x.split(',')[0])
-	df=df.sort_values('restaurant_id',ascending=1).reset_index(drop=True)
-	return df
+st.set_page_config(page_title='Visão Tipos Culinários', page_icon='🛎',layout='wide')
 
+# Medição do tempo de cada etapa desta execução (mostrada no painel de depuração)
+profiler=start_profiling('Visão Tipos Culinários',trace_memory=trace_memory_enabled())
 
 
 # -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
 
 
-# Carregando o meu arquivo
-df_raw=pd.read_csv('dataset/zomato.csv')
+# Carregando os dados já limpos (mapeados em memória uma única vez por máquina), apenas com as colunas usadas nesta página
+COLUMNS=['restaurant_id','restaurant_name','country_name','cuisines','cuisine_list','aggregate_rating','votes']
+df=load_shared(columns=COLUMNS)
 
-# Limpando os dados
-df=clean_data(df_raw)
+# Carregando o índice com todas as culinárias de cada restaurante (montado uma única vez por processo, sobre o mesmo dataframe)
+cuisine_index=load_cuisine_index()
+# e o ranking de cada culinária (ordenado uma única vez por processo): mostrar N culinárias são N consultas, sem filtrar e ordenar
+ranking=load_cuisine_ranking()
+
+# Carregando o cubo de agregados (montado uma única vez por processo)
+cube=load_cube()
 
 
 # VISÃO GERAL
@@ -131,13 +44,24 @@ df=clean_data(df_raw)
 
 # Filtros
 
-countries=df['country_name'].unique()
+countries=df.unique('country_name')
 st.sidebar.subheader('Filtros')
 data_selected=st.sidebar.multiselect('Por quais países você deseja navegar?',countries,default=countries)
-data_selected=df['country_name'].isin(data_selected)
-df=df.loc[data_selected,:]
+# O recorte e os agregados ficam memorizados pela seleção de países
+memo=get_selection_cache()
+view=CubeView(cube,data_selected,memo)
+# O filtro guarda apenas as posições das linhas selecionadas, sem copiar o dataframe compartilhado
+df=memo.get_or_compute(selection_key(data_selected,'rows',tuple(COLUMNS)),df.select,'country_name',data_selected)
 
 #Filtro de tipo de culinária
+if st.sidebar.checkbox('Ver todos os tipos de culinária'):
+	cuisines_selected=list(cuisine_index.cuisines)
+else:
+	cuisines_selected=st.sidebar.multiselect('Quais tipos de culinária você quer ver?',cuisine_index.cuisines,default=CUISINES)
+top_number=st.sidebar.slider('Quantos restaurantes de cada culinária você quer ver?',min_value=1,max_value=10,value=1)
+min_votes=st.sidebar.number_input('Número mínimo de avaliações de cada restaurante',min_value=0,value=LEADERBOARD_MIN_VOTES,step=5)
+
+panel=debug_panel(memo)
 
 st.sidebar.markdown('---')
 st.sidebar.caption('Developed by Camila Duarte')
@@ -150,54 +74,28 @@ st.sidebar.caption('Developed by Camila Duarte')
 st.title('Visão Tipos Culinários')
 
 
-def best_worse_restaurant(df,cuisine,parameter):
-	"""
-	Esta função tem como objetivo retornar o nome do restaurante que possui a maior nota média ou a pior nota média de acordo com o tipo de culinária desejado.
-	
-	Input: 
-		df = dataframe
-		cuisine = tipo de culinária ('Italian','Japanese', 'American', 'Brazilian',etc)
-		parameter = 'maior' ou 'menor' de acordo com a maior nota ou menor nota
-	Output: str (nome do restaurante)
-	"""
-	aux=df.loc[df['cuisines']==cuisine]
-	if parameter == 'maior':
-		aux=aux.sort_values('aggregate_rating',ascending=0).reset_index(drop=True)
-		restaurant=aux.loc[0,'restaurant_name']
-		return(restaurant)
-	elif parameter == 'menor':
-		aux=aux.sort_values('aggregate_rating',ascending=1).reset_index(drop=True)
-		restaurant=aux.loc[0,'restaurant_name']
-		return(restaurant)
-
-	
-	
-	
+# Os painéis são calculados em paralelo e mostrados no seu lugar assim que cada um fica pronto
+panels=PanelScheduler()
+
 with st.container():
+	# Melhores e piores restaurantes de cada culinária escolhida (entre todos os restaurantes com a culinária na lista)
 	col1,col2=st.columns(2)
 	with col1:
 		st.markdown('### **Melhores restaurantes**')
-		st.metric('Melhor Italiano:',best_worse_restaurant(df,'Italian','maior'))
-		st.metric('Melhor Americano:',best_worse_restaurant(df,'American','maior'))
-		st.metric('Melhor Árabe:',best_worse_restaurant(df,'Arabian','maior'))
-		st.metric('Melhor Japonês:',best_worse_restaurant(df,'Japanese','maior'))
-		st.metric('Melhor Caseiro:',best_worse_restaurant(df,'Home-made','maior'))	
+		panels.add('cuisine_leaderboard maior',st.dataframe,cuisine_leaderboard,ranking,df,cuisines_selected,top_number,min_votes,'maior')
 	with col2:
 		st.markdown('### **Piores restaurantes**')
-		st.metric('Pior Italiano:',best_worse_restaurant(df,'Italian','menor'))
-		st.metric('Pior Americano:',best_worse_restaurant(df,'American','menor'))
-		st.metric('Pior Árabe:',best_worse_restaurant(df,'Arabian','menor'))
-		st.metric('Pior Japonês:',best_worse_restaurant(df,'Japanese','menor'))
-		st.metric('Pior Caseiro:',best_worse_restaurant(df,'Home-made','menor'))	
+		panels.add('cuisine_leaderboard menor',st.dataframe,cuisine_leaderboard,ranking,df,cuisines_selected,top_number,min_votes,'menor')
 	st.divider()
 	st.markdown('## **Outras métricas**')
 	col1,col2=st.columns(2)
 	with col1:
-		aux=df.sort_values(['aggregate_rating','restaurant_id'],ascending=[0,1]).reset_index(drop=True)
-		st.metric('Tipo de culinária mais bem avaliado:',aux.loc[0,'cuisines'])
+		panels.add('top_rated_cuisine',lambda cuisine: st.metric('Tipo de culinária mais bem avaliado:',cuisine),top_rated_cuisine,df)
 
 	with col2:
-		aux=df.loc[(df['is_delivering_now']==1)&(df['has_online_delivery']==1)]
-		aux=aux.loc[:,['cuisines','has_online_delivery']].groupby('cuisines').count().reset_index()
-		aux=aux.sort_values('has_online_delivery',ascending=0).reset_index(drop=True).loc[0,'cuisines']
-		st.metric('Tipo de culinária que mais aceita pedido online e está fazendo entregas:',aux)
\ No newline at end of file
+		panels.add('top_delivering_cuisine',lambda cuisine: st.metric('Tipo de culinária que mais aceita pedido online e está fazendo entregas:',cuisine),
+					top_delivering_cuisine,view)
+
+panels.run()
+
+profiling_panel(profiler,panel)
@@ -0,0 +1,107 @@
+# Importando as bibliotecas necessárias
+import streamlit as st
+
+from fome_zero.costs import load_cost_tables
+from fome_zero.memo import get_selection_cache, selection_key
+from fome_zero.figures import get_figure_cache
+from fome_zero.ui import debug_panel, profiling_panel, trace_memory_enabled
+from fome_zero.profiling import start_profiling
+from fome_zero.panels import PanelScheduler
+from fome_zero.metrics import cost_ranking, cost_summary
+from fome_zero.charts import cost_boxes
+
+
+st.set_page_config(page_title='Visão Custos', page_icon='💰',layout='wide')
+
+# Medição do tempo de cada etapa desta execução (mostrada no painel de depuração)
+profiler=start_profiling('Visão Custos',trace_memory=trace_memory_enabled())
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+
+# Carregando as distribuições do custo convertido para uma única moeda (calculadas uma única vez por processo)
+costs=load_cost_tables()
+
+
+# VISÃO GERAL
+
+# =============================
+# BARRA LATERAL
+# =============================
+
+#st.sidebar.title('Fome Zero')
+#st.sidebar.divider()
+
+# Filtros
+
+countries=list(costs.countries)
+st.sidebar.subheader('Filtros')
+data_selected=st.sidebar.multiselect('Por quais países você deseja navegar?',countries,default=countries)
+currency=st.sidebar.selectbox('Em qual moeda você quer ver os custos?',costs.currencies)
+top_number=st.sidebar.slider('Quantos grupos você quer ver no ranking?',min_value=1,max_value=100,value=10)
+# As tabelas ficam memorizadas pela seleção de países, pela moeda e pela versão da tabela de câmbio
+memo=get_selection_cache()
+
+# As figuras já montadas ficam guardadas pelo gráfico e pela seleção de países
+figures=get_figure_cache()
+
+panel=debug_panel(memo,figures)
+
+st.sidebar.markdown('---')
+st.sidebar.caption('Developed by Camila Duarte')
+
+# =====================================================
+# Layout Streamlit
+# =====================================================
+
+
+st.title('Visão Custos')
+st.caption(f'Custo médio para dois em {currency}, convertido pela tabela de câmbio de {costs.version}. Restaurantes sem custo informado ficam de fora.')
+
+def show_summary(summary):
+	"""
+	Esta função mostra os indicadores de custo da seleção (ou um aviso, quando a seleção não tem custos).
+	"""
+	if summary['restaurants']==0:
+		st.warning('Nenhum restaurante com custo informado nos países selecionados.')
+		return
+	col1,col2,col3,col4=st.columns(4)
+	col1.metric('Restaurantes com custo',f"{summary['restaurants']:,}".replace(',','.'))
+	col2.metric('Mediana',f"{summary['p50']:,.2f} {currency}")
+	col3.metric('P25 - P75',f"{summary['p25']:,.0f} - {summary['p75']:,.0f}")
+	col4.metric('P10 - P90',f"{summary['p10']:,.0f} - {summary['p90']:,.0f}")
+
+# Os painéis são calculados em paralelo e mostrados no seu lugar assim que cada um fica pronto
+panels=PanelScheduler()
+
+with st.container():
+	panels.add('cost_summary',show_summary,
+				memo.get_or_compute,selection_key(data_selected,'cost_summary',currency,costs.version),cost_summary,costs,data_selected,currency)
+
+	st.divider()
+	# Gráficos de caixas do custo por país e por categoria de preço
+	panels.add('cost_boxes country_name',lambda fig: st.plotly_chart(fig,use_container_width=True),
+				figures.get_or_render,('cost_boxes','country_name',currency,costs.version),data_selected,cost_boxes,costs,'country_name',data_selected,currency)
+
+	panels.add('cost_boxes price_type',lambda fig: st.plotly_chart(fig,use_container_width=True),
+				figures.get_or_render,('cost_boxes','price_type',currency,costs.version),data_selected,cost_boxes,costs,'price_type',data_selected,currency)
+
+	st.divider()
+	st.header(f'TOP {top_number} (maior mediana):')
+	col1,col2=st.columns(2)
+	with col1:
+		st.markdown('Tipos de culinária com o maior custo para dois:')
+		panels.add('cost_ranking cuisines',st.dataframe,
+					memo.get_or_compute,selection_key(data_selected,'cost_ranking','cuisines',currency,top_number,costs.version),
+					cost_ranking,costs,'cuisines',data_selected,currency,top_number)
+
+	with col2:
+		st.markdown('Cidades com o maior custo para dois:')
+		panels.add('cost_ranking city',st.dataframe,
+					memo.get_or_compute,selection_key(data_selected,'cost_ranking','city',currency,top_number,costs.version),
+					cost_ranking,costs,'city',data_selected,currency,top_number)
+
+panels.run()
+
+profiling_panel(profiler,panel)
@@ -0,0 +1,111 @@
+# Importando as bibliotecas necessárias
+import pandas as pd
+import streamlit as st
+import folium
+from streamlit_folium import folium_static
+
+from fome_zero.nearby import load_geo_queries
+from fome_zero.ui import debug_panel, profiling_panel, trace_memory_enabled
+from fome_zero.profiling import start_profiling, stage
+
+
+st.set_page_config(page_title='Visão Proximidade', page_icon='📍',layout='wide')
+
+# Medição do tempo de cada etapa desta execução (mostrada no painel de depuração)
+profiler=start_profiling('Visão Proximidade',trace_memory=trace_memory_enabled())
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+
+# Carregando as coordenadas e os índices das consultas de proximidade (montados uma única vez por processo)
+geo=load_geo_queries()
+
+# Colunas da tabela de restaurantes encontrados
+TABLE_COLUMNS={'restaurant_name':'Restaurante','city':'Cidade','country_name':'País','distance_km':'Distância (km)','has_online_delivery':'Entrega online'}
+
+
+# VISÃO GERAL
+
+# =============================
+# BARRA LATERAL
+# =============================
+
+#st.sidebar.title('Fome Zero')
+#st.sidebar.divider()
+
+# Ponto de partida: o centro (mediana das coordenadas) da cidade escolhida, que pode ser ajustado
+
+st.sidebar.subheader('Ponto de partida')
+countries=geo.cities['country_name'].unique()
+country=st.sidebar.selectbox('País',countries)
+city=st.sidebar.selectbox('Cidade',geo.cities.loc[geo.cities['country_name']==country,'city'])
+center=geo.city_center(country,city)
+latitude=st.sidebar.number_input('Latitude',-90.0,90.0,float(center['median_latitude']),format='%.6f',key=f'latitude {country} {city}')
+longitude=st.sidebar.number_input('Longitude',-180.0,180.0,float(center['median_longitude']),format='%.6f',key=f'longitude {country} {city}')
+
+st.sidebar.subheader('Consulta')
+radius=st.sidebar.slider('Raio da busca (km)',min_value=0.5,max_value=50.0,value=5.0,step=0.5)
+k=st.sidebar.slider('Quantos restaurantes mais próximos você quer ver?',min_value=1,max_value=50,value=10)
+delivery=st.sidebar.checkbox('Apenas restaurantes com entrega online')
+
+panel=debug_panel()
+
+st.sidebar.markdown('---')
+st.sidebar.caption('Developed by Camila Duarte')
+
+# =====================================================
+# Layout Streamlit
+# =====================================================
+
+
+st.title('Visão Proximidade')
+
+with st.container():
+	with stage('within'):
+		positions,distances=geo.within(latitude,longitude,radius)
+	col1,col2,col3=st.columns(3)
+	with col1:
+		st.metric(f'Restaurantes a até {radius:g} km',len(positions))
+	with col2:
+		st.metric('Com entrega online',int(geo.delivery[positions].sum()))
+	with col3:
+		st.metric(f'Restaurantes em {city}',int(center['restaurants']))
+
+	st.divider()
+	with stage('nearest'):
+		nearest,nearest_distances=geo.nearest(latitude,longitude,k,delivery)
+	table=geo.restaurants(nearest,nearest_distances)
+	col1,col2=st.columns(2)
+	with col1:
+		st.markdown(f'Os {k} restaurantes mais próximos{" com entrega online" if delivery else ""}:')
+		st.dataframe(table[list(TABLE_COLUMNS)].rename(columns=TABLE_COLUMNS))
+
+	with col2:
+		# Mapa com o ponto de partida, o círculo da busca e os restaurantes mais próximos
+		with stage('folium'):
+			base=folium.Map(location=[latitude,longitude],zoom_start=12)
+			folium.Circle([latitude,longitude],radius=radius*1000,color='darkred',fill=True,fill_opacity=0.05).add_to(base)
+			folium.Marker([latitude,longitude],tooltip='Ponto de partida',icon=folium.Icon(color='red')).add_to(base)
+			for row in table.itertuples(index=False):
+				folium.CircleMarker([row.latitude,row.longitude],radius=6,fill=True,fill_opacity=0.8,
+									color='green' if row.has_online_delivery==1 else 'blue',
+									tooltip=f'{row.restaurant_name} ({row.distance_km:.2f} km)').add_to(base)
+			folium_static(base,width=600,height=450)
+
+	st.divider()
+	# Cobertura de uma lista de pontos (centrais de entrega, por exemplo): restaurantes a até o raio da busca de cada ponto
+	st.markdown(f'Cobertura de pontos de entrega (restaurantes a até {radius:g} km de cada ponto):')
+	hubs=st.file_uploader('Arquivo CSV com as colunas latitude e longitude',type='csv')
+	if hubs is not None:
+		hubs=pd.read_csv(hubs)
+		if not {'latitude','longitude'}<=set(hubs.columns):
+			st.warning('O arquivo deve ter as colunas latitude e longitude.')
+		else:
+			coverage=geo.coverage(hubs['latitude'],hubs['longitude'],radius)
+			st.dataframe(coverage.rename(columns={'restaurants':'Restaurantes','delivery':'Com entrega online'}))
+
+	with st.expander('Centro de cada cidade'):
+		st.dataframe(geo.cities.round(6).rename(columns={'country_name':'País','city':'Cidade','restaurants':'Restaurantes'}))
+
+profiling_panel(profiler,panel)
@@ -0,0 +1,73 @@
+# Importando as bibliotecas necessárias
+import streamlit as st
+
+from fome_zero.shared import load_shared
+from fome_zero.search import SEARCH_COLUMNS, load_search_index
+from fome_zero.memo import get_selection_cache, selection_key
+from fome_zero.ui import debug_panel, profiling_panel, trace_memory_enabled
+from fome_zero.profiling import start_profiling
+
+
+st.set_page_config(page_title='Busca', page_icon='🔎',layout='wide')
+
+# Medição do tempo de cada etapa desta execução (mostrada no painel de depuração)
+profiler=start_profiling('Busca',trace_memory=trace_memory_enabled())
+
+
+# -------------------------------------- Início da Estrutura Lógica do código --------------------------------------
+
+
+# Carregando os dados compartilhados e o índice de busca (montado uma única vez por processo)
+df=load_shared(columns=SEARCH_COLUMNS)
+search_index=load_search_index()
+
+# Colunas da tabela de resultados
+RESULT_COLUMNS={
+	'restaurant_name':'Restaurante','city':'Cidade','country_name':'País','locality_verbose':'Localidade','address':'Endereço',
+	'cuisine_list':'Tipos de culinária','aggregate_rating':'Nota média','votes':'Avaliações','score':'Relevância',
+}
+
+
+# VISÃO GERAL
+
+# =============================
+# BARRA LATERAL
+# =============================
+
+#st.sidebar.title('Fome Zero')
+#st.sidebar.divider()
+
+# Filtros
+
+countries=df.unique('country_name')
+st.sidebar.subheader('Filtros')
+data_selected=st.sidebar.multiselect('Em quais países você deseja buscar?',countries,default=countries)
+limit=st.sidebar.slider('Quantos resultados você quer ver?',min_value=10,max_value=200,value=50,step=10)
+# As posições das linhas selecionadas ficam memorizadas pela seleção de países
+memo=get_selection_cache()
+rows=memo.get_or_compute(selection_key(data_selected,'rows',tuple(SEARCH_COLUMNS)),df.select,'country_name',data_selected)
+
+panel=debug_panel(memo)
+
+st.sidebar.markdown('---')
+st.sidebar.caption('Developed by Camila Duarte')
+
+# =====================================================
+# Layout Streamlit
+# =====================================================
+
+
+st.title('Busca')
+
+with st.container():
+	query=st.text_input('Busque restaurantes pelo nome, endereço ou localidade',placeholder='Ex.: pizza hut, connaught place')
+	st.caption('A busca ignora acentos e maiúsculas, aceita o começo das palavras e tolera pequenos erros de digitação.')
+	if query.strip():
+		results,total=search_index.results(rows,query,limit)
+		if total==0:
+			st.warning('Nenhum restaurante encontrado.')
+		else:
+			st.markdown(f'{total} restaurantes encontrados' if total<=limit else f'{total} restaurantes encontrados (mostrando os {limit} mais relevantes)')
+			st.dataframe(results[list(RESULT_COLUMNS)].rename(columns=RESULT_COLUMNS),use_container_width=True)
+
+profiling_panel(profiler,panel)